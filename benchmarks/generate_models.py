@@ -0,0 +1,236 @@
+"""
+Deterministic generator of IFC model pairs for the benchmarks, needs nothing but ifcopenshell.
+
+The old model holds element_count building elements, each with an extruded rectangle as body, a placement and a
+property set with single values and a cadwork-like complex property "Local coordinate system". The new model is a
+copy in which fractions of the elements are moved, re-attributed, re-meshed or deleted and new elements are added.
+reference.json holds the complex properties of the old model in the format read by JsonReader, the property
+validator compares it with the new model.
+"""
+import argparse
+import dataclasses
+import json
+import os
+import random
+import uuid
+from typing import Dict, List, Tuple
+
+import ifcopenshell
+import ifcopenshell.guid
+
+ELEMENT_TYPES = ("IfcWall", "IfcBeam", "IfcColumn", "IfcSlab")
+# fixed header time stamp, the same arguments give byte-identical files
+TIME_STAMP = "2024-01-01T00:00:00"
+# every element gets a fixed block of STEP ids, deleting or adding elements does not renumber the others
+FIRST_ELEMENT_ID = 100
+IDS_PER_ELEMENT = 32
+
+
+@dataclasses.dataclass
+class ChangeFractions:
+    """Fractions of the element count changed in the new model, the remaining elements are unchanged"""
+    moved: float = 0.05
+    reattributed: float = 0.05
+    remeshed: float = 0.05
+    added: float = 0.02
+    deleted: float = 0.02
+
+    def __post_init__(self):
+        changed = self.moved + self.reattributed + self.remeshed + self.deleted
+        if min(dataclasses.astuple(self)) < 0 or changed > 1:
+            raise ValueError(f"Invalid change fractions {self}")
+
+
+@dataclasses.dataclass
+class ElementSpec:
+    index: int
+    guid: str
+    entity_type: str
+    name: str
+    location: Tuple[float, float, float]
+    # width and height of the profile and extrusion depth
+    dimensions: Tuple[float, float, float]
+    length: float
+    label: str
+    # GUIDs of the property set and of its relationship, equal in both models like the element GUID
+    pset_guid: str
+    rel_guid: str
+
+
+@dataclasses.dataclass
+class ModelPair:
+    old_path: str
+    new_path: str
+    reference_path: str
+    # GUIDs per kind of change: unchanged, moved, reattributed, remeshed, added and deleted
+    changes: Dict[str, List[str]]
+
+
+def _new_guid(rng: random.Random) -> str:
+    return ifcopenshell.guid.compress(uuid.UUID(int=rng.getrandbits(128)).hex)
+
+
+def _random_element(rng: random.Random, index: int) -> ElementSpec:
+    return ElementSpec(index=index,
+                       guid=_new_guid(rng),
+                       entity_type=ELEMENT_TYPES[index % len(ELEMENT_TYPES)],
+                       name=f"Element {index}",
+                       location=(round(rng.uniform(0, 500), 3), round(rng.uniform(0, 500), 3),
+                                 round(rng.uniform(0, 30), 3)),
+                       dimensions=(round(rng.uniform(0.1, 0.5), 3), round(rng.uniform(0.1, 0.8), 3),
+                                   round(rng.uniform(1, 8), 3)),
+                       length=round(rng.uniform(1, 8), 3),
+                       label=rng.choice(("C24", "GL24h", "GL28h", "S355")),
+                       pset_guid=_new_guid(rng),
+                       rel_guid=_new_guid(rng))
+
+
+class _ModelWriter:
+    """Creates the elements of one model in a new IFC4 file, placements and directions are shared like in exports"""
+
+    def __init__(self, rng: random.Random):
+        self.file = ifcopenshell.file(schema="IFC4")
+        self.rng = rng
+        create = self.file.create_entity
+        self.origin = create("IfcCartesianPoint", Coordinates=(0.0, 0.0, 0.0))
+        self.z_axis = create("IfcDirection", DirectionRatios=(0.0, 0.0, 1.0))
+        self.x_axis = create("IfcDirection", DirectionRatios=(1.0, 0.0, 0.0))
+        self.profile_position = create("IfcAxis2Placement2D",
+                                       Location=create("IfcCartesianPoint", Coordinates=(0.0, 0.0)))
+        world = create("IfcAxis2Placement3D", Location=self.origin, Axis=self.z_axis, RefDirection=self.x_axis)
+        self.context = create("IfcGeometricRepresentationContext", ContextType="Model", CoordinateSpaceDimension=3,
+                              Precision=1e-5, WorldCoordinateSystem=world)
+        units = create("IfcUnitAssignment", Units=[create("IfcSIUnit", UnitType="LENGTHUNIT", Name="METRE")])
+        project = create("IfcProject", GlobalId=_new_guid(rng), Name="Benchmark",
+                         RepresentationContexts=[self.context], UnitsInContext=units)
+        self.storey_placement = create("IfcLocalPlacement", RelativePlacement=world)
+        self.storey = create("IfcBuildingStorey", GlobalId=_new_guid(rng), Name="Storey",
+                             ObjectPlacement=self.storey_placement)
+        create("IfcRelAggregates", GlobalId=_new_guid(rng), RelatingObject=project, RelatedObjects=[self.storey])
+        self.elements = []
+
+    def add_element(self, spec: ElementSpec):
+        create = self.file.create_entity
+        # the entities of the element follow the first one without gaps
+        location = create("IfcCartesianPoint", id=FIRST_ELEMENT_ID + spec.index * IDS_PER_ELEMENT,
+                          Coordinates=spec.location)
+        placement = create("IfcLocalPlacement", PlacementRelTo=self.storey_placement,
+                           RelativePlacement=create("IfcAxis2Placement3D", Location=location,
+                                                    Axis=self.z_axis, RefDirection=self.x_axis))
+        width, height, depth = spec.dimensions
+        profile = create("IfcRectangleProfileDef", ProfileType="AREA", Position=self.profile_position,
+                         XDim=width, YDim=height)
+        solid = create("IfcExtrudedAreaSolid", SweptArea=profile,
+                       Position=create("IfcAxis2Placement3D", Location=self.origin),
+                       ExtrudedDirection=self.z_axis, Depth=depth)
+        body = create("IfcShapeRepresentation", ContextOfItems=self.context, RepresentationIdentifier="Body",
+                      RepresentationType="SweptSolid", Items=[solid])
+        element = create(spec.entity_type, GlobalId=spec.guid, Name=spec.name, ObjectPlacement=placement,
+                         Representation=create("IfcProductDefinitionShape", Representations=[body]))
+
+        properties = [
+            create("IfcPropertySingleValue", Name="Length", NominalValue=self.file.createIfcLengthMeasure(spec.length)),
+            create("IfcPropertySingleValue", Name="Grade", NominalValue=self.file.createIfcLabel(spec.label)),
+            create("IfcComplexProperty", Name="Local coordinate system", UsageName="cadwork",
+                   HasProperties=[self._point("Location", spec.location), self._point("Axis", (0.0, 0.0, 1.0))]),
+        ]
+        pset = create("IfcPropertySet", GlobalId=spec.pset_guid, Name="Pset_Benchmark", HasProperties=properties)
+        create("IfcRelDefinesByProperties", GlobalId=spec.rel_guid, RelatedObjects=[element],
+               RelatingPropertyDefinition=pset)
+        self.elements.append(element)
+
+    def _point(self, name: str, coordinates) -> ifcopenshell.entity_instance:
+        values = [self.file.create_entity("IfcPropertySingleValue", Name=axis,
+                                          NominalValue=self.file.createIfcLengthMeasure(value))
+                  for axis, value in zip("XYZ", coordinates)]
+        return self.file.create_entity("IfcComplexProperty", Name=name, UsageName="cadwork", HasProperties=values)
+
+    def write(self, path: str):
+        self.file.create_entity("IfcRelContainedInSpatialStructure", GlobalId=_new_guid(self.rng),
+                                RelatedElements=self.elements, RelatingStructure=self.storey)
+        self.file.header.file_name.time_stamp = TIME_STAMP
+        self.file.write(path)
+
+
+def _reference_entry(spec: ElementSpec) -> dict:
+    def point(coordinates):
+        return {"type": "complex", "properties": {axis: {"value": value} for axis, value in zip("XYZ", coordinates)}}
+
+    return {"Pset_Benchmark": {"properties": {"Local coordinate system": {
+        "type": "complex",
+        "properties": {"Location": point(spec.location), "Axis": point((0.0, 0.0, 1.0))}
+    }}}}
+
+
+def generate_model_pair(output_dir: str, element_count: int, fractions: ChangeFractions = ChangeFractions(),
+                        seed: int = 0) -> ModelPair:
+    """Write old.ifc, new.ifc and reference.json to output_dir, the same arguments always give the same files"""
+    rng = random.Random(seed)
+    old_specs = [_random_element(rng, i) for i in range(element_count)]
+
+    # every element gets at most one kind of change, the counts are exact
+    order = list(range(element_count))
+    rng.shuffle(order)
+    changes: Dict[str, List[str]] = {}
+    start = 0
+    change_of = {}
+    for kind in ("moved", "reattributed", "remeshed", "deleted"):
+        count = round(getattr(fractions, kind) * element_count)
+        for index in order[start:start + count]:
+            change_of[index] = kind
+        start += count
+
+    new_specs = []
+    for index, spec in enumerate(old_specs):
+        kind = change_of.get(index, "unchanged")
+        changes.setdefault(kind, []).append(spec.guid)
+        if kind == "moved":
+            x, y, z = spec.location
+            spec = dataclasses.replace(spec, location=(round(x + rng.uniform(0.1, 2), 3), y, z))
+        elif kind == "reattributed":
+            spec = dataclasses.replace(spec, name=f"{spec.name} (revised)", length=round(spec.length + 0.25, 3))
+        elif kind == "remeshed":
+            width, height, depth = spec.dimensions
+            spec = dataclasses.replace(spec, dimensions=(round(width + 0.02, 3), height, depth))
+        elif kind == "deleted":
+            continue
+        new_specs.append(spec)
+    added = [_random_element(rng, element_count + i) for i in range(round(fractions.added * element_count))]
+    changes["added"] = [spec.guid for spec in added]
+    new_specs.extend(added)
+
+    os.makedirs(output_dir, exist_ok=True)
+    pair = ModelPair(os.path.join(output_dir, "old.ifc"), os.path.join(output_dir, "new.ifc"),
+                     os.path.join(output_dir, "reference.json"), changes)
+    for specs, path in ((old_specs, pair.old_path), (new_specs, pair.new_path)):
+        # the project, storey and their relationships get the same GUIDs in both models
+        writer = _ModelWriter(random.Random(f"{seed}-structure"))
+        for spec in specs:
+            writer.add_element(spec)
+        writer.write(path)
+
+    with open(pair.reference_path, 'w', encoding='utf-8') as f:
+        json.dump({spec.guid: _reference_entry(spec) for spec in old_specs}, f)
+    with open(os.path.join(output_dir, "changes.json"), 'w', encoding='utf-8') as f:
+        json.dump(changes, f, indent=2)
+    return pair
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a pair of IFC models with known differences")
+    parser.add_argument("output_dir", help="Directory of old.ifc, new.ifc, reference.json and changes.json")
+    parser.add_argument("-n", "--elements", type=int, default=1000, help="Number of elements of the old model")
+    parser.add_argument("--seed", type=int, default=0)
+    for field in dataclasses.fields(ChangeFractions):
+        parser.add_argument(f"--{field.name}", type=float, default=field.default,
+                            help=f"Fraction of the elements {field.name} in the new model")
+    args = parser.parse_args()
+
+    fractions = ChangeFractions(**{field.name: getattr(args, field.name) for field in dataclasses.fields(ChangeFractions)})
+    pair = generate_model_pair(args.output_dir, args.elements, fractions, args.seed)
+    print(f"Wrote {pair.old_path} and {pair.new_path}: " +
+          ", ".join(f"{len(guids)} {kind}" for kind, guids in pair.changes.items()))
+
+
+if __name__ == "__main__":
+    main()
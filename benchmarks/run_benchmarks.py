@@ -0,0 +1,219 @@
+"""
+End-to-end benchmarks of IFCComparator.compare_files, the entity existence report and the property validator on
+generated model pairs of growing size. Every entry point runs in a fresh process, so its peak RSS is its own.
+
+    python -m benchmarks.run_benchmarks --sizes 1000 10000 100000 --report benchmark.json
+"""
+import argparse
+import contextlib
+import dataclasses
+import io
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.generate_models import ChangeFractions, ModelPair, generate_model_pair
+from src.compare_entity_existance import (FileEntities, compare_entity_counts, compare_entity_ids,
+                                          scan_ifc_entities_by_type)
+from src.concurrent_loading import load_concurrently
+from src.ifc_comparator import IFCComparator
+from src.list_differences_collector import ListDifferencesCollector
+from src.property_validator.models.comparison_result import ComparisonSummary
+from src.property_validator.services.comparator import PropertyComparator
+from src.property_validator.services.ifc_reader import IfcReader
+from src.property_validator.services.json_reader import JsonReader
+from src.property_validator.services.parallel_validation import compare_chunk, compare_chunks_in_parallel
+from src.property_validator.services.result_writer import OutputFormat, create_result_writer
+
+try:
+    import resource
+except ImportError:
+    # not available on Windows, peak RSS is not reported there
+    resource = None
+
+ENTRY_POINTS = ("compare_files", "existence", "property_validator")
+
+
+@dataclasses.dataclass
+class PhaseResult:
+    entry_point: str
+    elements: int
+    phase: str
+    seconds: float
+    # high-water mark of the process when the phase ended, phases before it are included
+    peak_rss_mb: Optional[float]
+
+    @property
+    def elements_per_second(self) -> Optional[float]:
+        return self.elements / self.seconds if self.seconds > 0 else None
+
+
+def peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class _PhaseTimer:
+    def __init__(self, entry_point: str, elements: int):
+        self.entry_point = entry_point
+        self.elements = elements
+        self.results: List[PhaseResult] = []
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        yield
+        self.add(name, time.perf_counter() - start)
+
+    def add(self, name: str, seconds: float):
+        self.results.append(PhaseResult(self.entry_point, self.elements, name, seconds, peak_rss_mb()))
+
+
+class TimedComparator(IFCComparator):
+    """Adds up the time spent in tessellation and in the comparison of the shared elements"""
+
+    def __init__(self, file1_path, file2_path, collector=None):
+        self.seconds = {"tessellation": 0.0, "element comparison": 0.0}
+        super().__init__(file1_path, file2_path, collector)
+
+    def prepare_geometries(self, guids):
+        start = time.perf_counter()
+        super().prepare_geometries(guids)
+        self.seconds["tessellation"] += time.perf_counter() - start
+
+    def compare_elements(self, entity_lhs, entity_rhs):
+        start = time.perf_counter()
+        equal = super().compare_elements(entity_lhs, entity_rhs)
+        self.seconds["element comparison"] += time.perf_counter() - start
+        return equal
+
+
+def benchmark_compare_files(pair: ModelPair, elements: int, jobs: int = 1) -> List[PhaseResult]:
+    timer = _PhaseTimer("compare_files", elements)
+    collector = ListDifferencesCollector()
+    with timer.phase("open files"):
+        comparator = TimedComparator(pair.old_path, pair.new_path, collector)
+    comparator.set_jobs(jobs)
+    start = time.perf_counter()
+    comparator.compare_files()
+    total = time.perf_counter() - start
+    # with jobs > 1 both happen in the workers, the time is reported as the rest of compare_files
+    for name, seconds in comparator.seconds.items():
+        timer.add(name, seconds)
+    timer.add("other", total - sum(comparator.seconds.values()))
+    timer.add("compare_files total", total)
+    with timer.phase("write report"), tempfile.TemporaryFile('w') as f:
+        json.dump({"errors": list(collector.get_differences())}, f, indent=4)
+    return timer.results
+
+
+def benchmark_existence(pair: ModelPair, elements: int, jobs: int = 1) -> List[PhaseResult]:
+    timer = _PhaseTimer("existence", elements)
+    with timer.phase("scan files"):
+        entities1 = scan_ifc_entities_by_type(pair.old_path)
+        entities2 = scan_ifc_entities_by_type(pair.new_path)
+    with timer.phase("compare counts"):
+        compare_entity_counts(entities1, entities2)
+    with timer.phase("compare GlobalIds"), contextlib.redirect_stdout(io.StringIO()):
+        compare_entity_ids(FileEntities(pair.old_path, entities1), FileEntities(pair.new_path, entities2))
+    return timer.results
+
+
+def benchmark_property_validator(pair: ModelPair, elements: int, jobs: int = 1) -> List[PhaseResult]:
+    timer = _PhaseTimer("property_validator", elements)
+    with timer.phase("load files"):
+        ifc_load, json_load = load_concurrently([(pair.new_path, lambda: IfcReader(pair.new_path)),
+                                                 (pair.reference_path, lambda: JsonReader(pair.reference_path))])
+        ifc_reader, json_reader = ifc_load.value, json_load.value
+    with timer.phase("collect GUIDs"):
+        guids = sorted({guid for guid, _ in ifc_reader.get_entities_with_complex_properties()} |
+                       set(json_reader.get_entities()))
+    with timer.phase("compare"):
+        if jobs > 1:
+            entity_results = compare_chunks_in_parallel(pair.new_path, pair.reference_path, guids, jobs,
+                                                        compact=True)
+        else:
+            entity_results = compare_chunk(ifc_reader, json_reader, PropertyComparator(compact=True), guids)
+        summary = ComparisonSummary()
+        for entity_result in entity_results:
+            summary.add_entity_result(entity_result)
+    with timer.phase("write report"), tempfile.TemporaryDirectory() as temp_dir:
+        writer = create_result_writer(OutputFormat.JSON, os.path.join(temp_dir, "output.json"))
+        for entity_result in summary.entity_results.values():
+            writer.write(entity_result)
+        writer.finish()
+    return timer.results
+
+
+BENCHMARKS: Dict[str, Callable[[ModelPair, int, int], List[PhaseResult]]] = {
+    "compare_files": benchmark_compare_files,
+    "existence": benchmark_existence,
+    "property_validator": benchmark_property_validator,
+}
+
+
+def _run_in_process(entry_point: str, pair: ModelPair, elements: int, jobs: int) -> List[PhaseResult]:
+    logging.disable(logging.WARNING)
+    return BENCHMARKS[entry_point](pair, elements, jobs)
+
+
+def run_benchmarks(sizes: List[int], entry_points: List[str], data_dir: str, jobs: int = 1, seed: int = 0,
+                   fractions: ChangeFractions = ChangeFractions()) -> List[PhaseResult]:
+    results = []
+    for size in sizes:
+        timer = _PhaseTimer("generate", size)
+        with timer.phase("generate model pair"):
+            pair = generate_model_pair(os.path.join(data_dir, str(size)), size, fractions, seed)
+        results.extend(timer.results)
+        print(format_result(timer.results[0]), flush=True)
+        for entry_point in entry_points:
+            # a new process per entry point and size, the peak RSS of one run does not carry over to the next
+            with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+                phase_results = executor.submit(_run_in_process, entry_point, pair, size, jobs).result()
+            results.extend(phase_results)
+            for phase_result in phase_results:
+                print(format_result(phase_result), flush=True)
+    return results
+
+
+def format_result(result: PhaseResult) -> str:
+    rate = f"{result.elements_per_second:12.0f}" if result.elements_per_second else f"{'-':>12}"
+    rss = f"{result.peak_rss_mb:10.1f}" if result.peak_rss_mb is not None else f"{'-':>10}"
+    return f"{result.entry_point:<20}{result.elements:>9}  {result.phase:<22}{result.seconds:10.3f}{rate}{rss}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the comparison entry points on generated IFC models")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000],
+                        help="Element counts of the generated old models, e.g. 1000 10000 100000 200000")
+    parser.add_argument("--entry-points", nargs="+", choices=ENTRY_POINTS, default=list(ENTRY_POINTS))
+    parser.add_argument("--data-dir", help="Directory of the generated models, kept after the run. "
+                                           "A temporary directory by default")
+    parser.add_argument("--report", help="Path of a JSON file with all phase results")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="Worker processes of compare_files and the "
+                                                                   "property validator")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the model generator")
+    args = parser.parse_args()
+
+    print(f"{'entry point':<20}{'elements':>9}  {'phase':<22}{'seconds':>10}{'elements/s':>12}{'peak MB':>10}")
+    with contextlib.ExitStack() as stack:
+        data_dir = args.data_dir or stack.enter_context(tempfile.TemporaryDirectory())
+        results = run_benchmarks(args.sizes, args.entry_points, data_dir, args.jobs, args.seed)
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump([{**dataclasses.asdict(result), "elements_per_second": result.elements_per_second}
+                       for result in results], f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
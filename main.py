@@ -1,14 +1,33 @@
 import argparse
 import json
+import os
 import sys
+import tempfile
 from typing import TextIO
 
+from src.baseline_snapshot import create_snapshot, write_snapshot
+from src.batch_comparison import compare_candidates, format_summary, write_summary
 from src.differences_collector_factory import DifferencesCollectorFactory, CollectionType
 from src.file_comparator_factory_impl import IfcFileComparatorFactoryImpl
+from src.geometry_cache import GeometryCache
+from src.geometry_extraction import default_geometry_threads
+from src.mesh_comparison import GeometryComparisonMode
+from src.profiling import Profiler
+from src.streaming_differences_collector import StreamingDifferencesCollector
 from src.interfaces.file_comparator import FileComparator
 from src.interfaces.file_comparator_factory import FileType
 
 
+IGNORE_CHOICES = ['CoordIndex', 'CoordList', 'Representation', 'ObjectPlacement', 'Coordinates']
+
+COLLECTION_TYPES = {
+    "list": (CollectionType.LIST, "differences.json"),
+    "set": (CollectionType.SET, "differences.json"),
+    "jsonl": (CollectionType.JSONL, "differences.jsonl"),
+    "jsonl.gz": (CollectionType.JSONL_GZIP, "differences.jsonl.gz"),
+}
+
+
 # os.environ['PYTHONPATH'] = os.pathsep.join([
 #     os.path.join(os.path.dirname(__file__), '.venv', 'Lib', 'site-packages'),
 #     os.path.join(os.path.dirname(__file__), 'src'),
@@ -20,28 +39,75 @@ from src.interfaces.file_comparator_factory import FileType
 
 
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "snapshot":
+        return snapshot_main(sys.argv[2:])
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        return batch_main(sys.argv[2:])
+
     parser = set_up_arg_parser()
     args = parser.parse_args()
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if args.max_differences is not None and args.max_differences < 1:
+        parser.error("--max-differences must be at least 1")
 
-    output_path = f"{args.output_dir}/differences.json"
+    collection_type, output_file_name = COLLECTION_TYPES[args.collector]
+    output_path = f"{args.output_dir}/{output_file_name}"
 
-    factory = IfcFileComparatorFactoryImpl(args.file1_path, args.file2_path)
-    differences_collector = DifferencesCollectorFactory.create(CollectionType.LIST)
-    comparator: FileComparator = factory.create(FileType.IFC, differences_collector)
+    if args.baseline_snapshot:
+        factory = IfcFileComparatorFactoryImpl(args.baseline_snapshot, args.file2_path)
+        file_type = FileType.SNAPSHOT
+    else:
+        factory = IfcFileComparatorFactoryImpl(args.file1_path, args.file2_path)
+        file_type = FileType.IFC
+    differences_collector = DifferencesCollectorFactory.create(collection_type, output_path)
+    comparator: FileComparator = factory.create(file_type, differences_collector)
 
     if args.ignore:
         comparator.set_keys_to_ignore(args.ignore)
+    comparator.set_jobs(args.jobs)
+    if args.geometry_threads:
+        comparator.set_geometry_threads(args.geometry_threads)
+    if args.geometry_cache:
+        comparator.set_geometry_cache(GeometryCache(args.geometry_cache, args.geometry_cache_size * 1024 * 1024))
+    comparator.set_geometry_mode(GeometryComparisonMode(args.geometry_mode))
+    comparator.set_fingerprint_mode(args.fingerprint)
+    comparator.set_max_differences(1 if args.fail_fast else args.max_differences)
+    if args.profile_report:
+        comparator.set_profiler(Profiler(args.profile_slowest))
     result = comparator.compare_files()
 
+    if args.profile_report:
+        profile_path = f"{args.output_dir}/profile.json"
+        comparator.profiler.write(profile_path)
+        print(f"Profile written to {profile_path}")
+
+    if isinstance(differences_collector, StreamingDifferencesCollector):
+        if comparator.truncated:
+            differences_collector.write_trailer({"truncated": True})
+        differences_collector.close()
+        if result:
+            print("No differences found.")
+            return sys.exit(0)
+        print(f"{differences_collector.difference_count} differences written to {output_path}")
+        if comparator.truncated:
+            print("Stopped after reaching the difference budget, the report is truncated.")
+        return sys.exit(1)
+    differences_collector.close()
+
     if not result:
         differences = list(differences_collector.get_differences())
         if not differences:
             print("No differences found.")
             return sys.exit(0)
         output_data = {"errors": differences}
+        if comparator.truncated:
+            output_data["truncated"] = True
         with open(output_path, 'w') as json_file:  # type: TextIO
             json.dump(output_data, json_file, indent=4)
         print(f"Differences written to {output_path}")
+        if comparator.truncated:
+            print("Stopped after reaching the difference budget, the report is truncated.")
         return sys.exit(1)
     else:
         print("No differences found.")
@@ -50,16 +116,131 @@ def main():
     return sys.exit(0)
 
 
+def snapshot_main(argv):
+    args = set_up_snapshot_arg_parser().parse_args(argv)
+    snapshot = create_snapshot(args.file_path, args.ignore or [], args.geometry_threads or default_geometry_threads())
+    write_snapshot(snapshot, args.output)
+    print(f"Snapshot of {len(snapshot.elements)} elements written to {args.output}")
+    return sys.exit(0)
+
+
+def batch_main(argv):
+    parser = set_up_batch_arg_parser()
+    args = parser.parse_args(argv)
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if args.max_differences is not None and args.max_differences < 1:
+        parser.error("--max-differences must be at least 1")
+    geometry_threads = args.geometry_threads or default_geometry_threads()
+    settings = {
+        "keys_to_ignore": args.ignore or [],
+        "geometry_threads": max(1, geometry_threads // args.jobs),
+        "geometry_cache": (GeometryCache(args.geometry_cache, args.geometry_cache_size * 1024 * 1024)
+                           if args.geometry_cache else None),
+        "geometry_mode": GeometryComparisonMode(args.geometry_mode),
+        "fingerprint_mode": args.fingerprint,
+    }
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        snapshot_path = args.baseline_snapshot
+        if not snapshot_path:
+            # the baseline is extracted once, every candidate is compared with the snapshot
+            snapshot_path = os.path.join(temp_dir, "baseline.snap")
+            write_snapshot(create_snapshot(args.baseline, args.ignore or [], geometry_threads), snapshot_path)
+        results = compare_candidates(snapshot_path, args.candidates, args.output_dir, settings, args.jobs,
+                                     1 if args.fail_fast else args.max_differences)
+
+    summary_path = os.path.join(args.output_dir, "summary.json")
+    write_summary(args.baseline or args.baseline_snapshot, results, summary_path)
+    print(format_summary(results))
+    print(f"Summary written to {summary_path}")
+    return sys.exit(0 if all(result.equal for result in results) else 1)
+
+
 def set_up_arg_parser():
-    parser = argparse.ArgumentParser(description="Compare two IFC files.")
-    parser.add_argument("-f1", "--file1_path", type=str, required=True, help="Path to the first IFC file")
+    parser = argparse.ArgumentParser(description="Compare two IFC files.",
+                                     epilog="Run 'main.py snapshot -h' to create a baseline snapshot and "
+                                            "'main.py batch -h' to compare one baseline with many files.")
+    first_file = parser.add_mutually_exclusive_group(required=True)
+    first_file.add_argument("-f1", "--file1_path", type=str, help="Path to the first IFC file")
+    first_file.add_argument("--baseline-snapshot", type=str,
+                            help="Snapshot of the first IFC file created with the snapshot command, "
+                                 "used instead of --file1_path")
     parser.add_argument("-f2", "--file2_path", type=str, required=True, help="Path to the second IFC file")
     parser.add_argument("-dir", "--output_dir", type=str, required=True, help="Directory to save the output JSON file")
     parser.add_argument("-i", "--ignore", type=str,
-                        choices=['CoordIndex', 'CoordList', 'Representation', 'ObjectPlacement',
-                                 'Coordinates'], nargs='+',
+                        choices=IGNORE_CHOICES, nargs='+',
                         required=False,
                         help="Keys to ignore during comparison")
+    parser.add_argument("-c", "--collector", type=str, default="list", choices=list(COLLECTION_TYPES),
+                        help="How differences are collected: in memory and written at the end (list, set) "
+                             "or streamed to a JSON Lines file while comparing (jsonl, jsonl.gz)")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="Number of worker processes comparing shards of the shared GUIDs")
+    parser.add_argument("--geometry-threads", type=int, required=False,
+                        help="Number of threads used to tessellate the elements, defaults to the CPU count")
+    parser.add_argument("--geometry-cache", type=str, required=False,
+                        help="Directory of the persistent tessellation cache")
+    parser.add_argument("--geometry-cache-size", type=int, default=1024,
+                        help="Maximum size of the tessellation cache in MB")
+    parser.add_argument("--geometry-mode", type=str, default=GeometryComparisonMode.STRICT.value,
+                        choices=[mode.value for mode in GeometryComparisonMode],
+                        help="Compare geometry by bounding box, centroid, volume and area only (invariants) "
+                             "or additionally vertex by vertex (strict)")
+    parser.add_argument("--fingerprint", action="store_true",
+                        help="Accept elements with equal quantized fingerprints without the detailed comparison")
+    parser.add_argument("--max-differences", type=int, required=False,
+                        help="Stop the comparison as soon as this many differences were found")
+    parser.add_argument("--fail-fast", action="store_true",
+                        help="Stop the comparison at the first difference, same as --max-differences 1")
+    parser.add_argument("--profile-report", action="store_true",
+                        help="Time the phases of the comparison and write them to profile.json in the output directory")
+    parser.add_argument("--profile-slowest", type=int, default=20,
+                        help="Number of the slowest elements listed in profile.json")
+    return parser
+
+
+def set_up_snapshot_arg_parser():
+    parser = argparse.ArgumentParser(prog="main.py snapshot",
+                                     description="Extract an IFC file into a snapshot for --baseline-snapshot.")
+    parser.add_argument("-f", "--file_path", type=str, required=True, help="Path to the baseline IFC file")
+    parser.add_argument("-o", "--output", type=str, required=True, help="Path of the snapshot file to write")
+    parser.add_argument("-i", "--ignore", type=str, choices=IGNORE_CHOICES, nargs='+', required=False,
+                        help="Keys left out of the snapshot, comparisons against it must ignore them as well")
+    parser.add_argument("--geometry-threads", type=int, required=False,
+                        help="Number of threads used to tessellate the elements, defaults to the CPU count")
+    return parser
+
+
+def set_up_batch_arg_parser():
+    parser = argparse.ArgumentParser(prog="main.py batch",
+                                     description="Compare one baseline IFC file with many candidate IFC files.")
+    baseline = parser.add_mutually_exclusive_group(required=True)
+    baseline.add_argument("-b", "--baseline", type=str, help="Path to the baseline IFC file")
+    baseline.add_argument("--baseline-snapshot", type=str, help="Snapshot of the baseline IFC file")
+    parser.add_argument("-c", "--candidates", type=str, nargs='+', required=True,
+                        help="Paths to the IFC files compared with the baseline")
+    parser.add_argument("-dir", "--output_dir", type=str, required=True,
+                        help="Directory of the reports, one subdirectory per candidate, and summary.json")
+    parser.add_argument("-i", "--ignore", type=str, choices=IGNORE_CHOICES, nargs='+', required=False,
+                        help="Keys to ignore during comparison")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="Number of candidates compared at the same time, in worker processes")
+    parser.add_argument("--geometry-threads", type=int, required=False,
+                        help="Number of threads used to tessellate the elements, defaults to the CPU count")
+    parser.add_argument("--geometry-cache", type=str, required=False,
+                        help="Directory of the persistent tessellation cache")
+    parser.add_argument("--geometry-cache-size", type=int, default=1024,
+                        help="Maximum size of the tessellation cache in MB")
+    parser.add_argument("--geometry-mode", type=str, default=GeometryComparisonMode.STRICT.value,
+                        choices=[mode.value for mode in GeometryComparisonMode],
+                        help="Compare geometry by its invariants only or additionally vertex by vertex")
+    parser.add_argument("--fingerprint", action="store_true",
+                        help="Accept elements with equal quantized fingerprints without the detailed comparison")
+    parser.add_argument("--max-differences", type=int, required=False,
+                        help="Stop comparing a candidate as soon as this many differences were found")
+    parser.add_argument("--fail-fast", action="store_true",
+                        help="Stop comparing a candidate at its first difference")
     return parser
 
 
@@ -7,9 +7,13 @@ import sys
 from typing import Dict, List, Optional, Set
 
 # Import our modules
+from src.concurrent_loading import load_concurrently
 from src.property_validator.services.ifc_reader import IfcReader
 from src.property_validator.services.json_reader import JsonReader
+from src.property_validator.services.streaming_json_reader import StreamingJsonReader
 from src.property_validator.services.comparator import PropertyComparator
+from src.property_validator.services.parallel_validation import BATCH_SIZE, compare_chunk, compare_chunks_in_parallel
+from src.property_validator.services.result_writer import OutputFormat, create_result_writer
 from src.property_validator.models.comparison_result import ComparisonSummary
 from src.property_validator.utils.logger import setup_logger
 
@@ -22,12 +26,26 @@ def parse_args():
     parser.add_argument("--ifc", required=True, help="Path to IFC file")
     parser.add_argument("--json", required=True, help="Path to reference JSON file")
     parser.add_argument("--output", help="Path to output JSON file with results")
+    parser.add_argument("--output-format", choices=[f.value for f in OutputFormat], default=OutputFormat.JSON.value,
+                        help="json: indented, written at the end; jsonl: one line per entity and a totals line; "
+                             "compact-json: written entity by entity with the totals at the end")
     parser.add_argument("--tolerance", type=float, default=0.0001,
                         help="Tolerance for floating-point comparisons")
     parser.add_argument("--filter", help="Filter by specific entity GUID(s), comma-separated")
     parser.add_argument("--verbose", "-v", action="store_true", help="Enable verbose output")
     parser.add_argument("--show-matches", action="store_true", help="Show details for matched properties as well")
-    return parser.parse_args()
+    parser.add_argument("--stream-json", action="store_true",
+                        help="Index the reference JSON file and parse entities only when they are compared")
+    parser.add_argument("--batch", action="store_true",
+                        help=f"Compare the values of {BATCH_SIZE} entities at a time, matches are only counted")
+    parser.add_argument("--jobs", "-j", type=int, default=1,
+                        help="Number of worker processes comparing entities, each reads both files itself")
+    args = parser.parse_args()
+    if args.batch and args.show_matches:
+        parser.error("--show-matches cannot be combined with --batch, matches are not kept in batch mode")
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    return args
 
 
 def main():
@@ -50,10 +68,14 @@ def main():
     if args.filter:
         filter_guids = set(args.filter.split(','))
 
-    # Initialize readers and comparator
-    ifc_reader = IfcReader(args.ifc)
-    json_reader = JsonReader(args.json)
-    comparator = PropertyComparator(float_tolerance=args.tolerance)
+    # Initialize readers and comparator, the JSON file is read while the IFC file is parsed
+    json_reader_type = StreamingJsonReader if args.stream_json else JsonReader
+    ifc_load, json_load = load_concurrently([(args.ifc, lambda: IfcReader(args.ifc)),
+                                             (args.json, lambda: json_reader_type(args.json))])
+    ifc_reader, json_reader = ifc_load.value, json_load.value
+    logger.info(f"Loaded IFC file in {ifc_load.seconds:.2f} s and JSON file in {json_load.seconds:.2f} s")
+    # results of matching properties are only kept when they are shown
+    comparator = PropertyComparator(float_tolerance=args.tolerance, compact=not args.show_matches)
 
     # Get entities with complex properties from IFC
     ifc_entities = ifc_reader.get_entities_with_complex_properties()
@@ -72,56 +94,41 @@ def main():
         all_guids &= filter_guids
         logger.info(f"Filtered to {len(all_guids)} entities")
 
-    # Create comparison summary
-    summary = ComparisonSummary()
-
-    # Compare entities
-    for guid in all_guids:
-        logger.info(f"Comparing entity {guid}")
-
-        ifc_properties = ifc_reader.get_complex_properties_by_guid(guid)
-        json_properties = json_reader.get_complex_properties_by_guid(guid)
-
-        entity_result = comparator.compare_entities(guid, ifc_properties, json_properties)
-        summary.add_entity_result(entity_result)
+    # Results are written while comparing, the summary then only keeps the entities with mismatches
+    output_format = OutputFormat(args.output_format)
+    streaming_output = args.output and output_format != OutputFormat.JSON
+    summary = ComparisonSummary(compact=bool(streaming_output))
+    writer = create_result_writer(output_format, args.output, args.show_matches) if args.output else None
+
+    # Compare entities, in GUID order whatever the number of jobs
+    all_guids = sorted(all_guids)
+    if args.jobs > 1:
+        entity_results = compare_chunks_in_parallel(args.ifc, args.json, all_guids, args.jobs,
+                                                    json_reader_type=json_reader_type,
+                                                    tolerance=args.tolerance,
+                                                    compact=not args.show_matches,
+                                                    batch=args.batch)
+    else:
+        entity_results = compare_chunk(ifc_reader, json_reader, comparator, all_guids, batch=args.batch)
+
+    try:
+        for entity_result in entity_results:
+            logger.info(f"Comparing entity {entity_result.guid}")
+            summary.add_entity_result(entity_result)
+            if writer:
+                writer.write(entity_result)
+        if writer:
+            writer.finish()
+    finally:
+        json_reader.close()
+        if writer:
+            # without the totals if the comparison failed, the entities written so far are kept
+            writer.close()
 
     # Print summary
     print(summary)
 
-    # Write output if requested
-    if args.output:
-        # Create a serializable summary
-        output_data = {
-            "entity_count": summary.entity_count,
-            "matched_entities": summary.matched_entity_count,
-            "mismatched_entities": summary.mismatched_entity_count,
-            "entities": {}
-        }
-
-        for guid, entity_result in summary.entity_results.items():
-            entity_data = {
-                "match_count": entity_result.match_count,
-                "mismatch_count": entity_result.mismatch_count,
-                "missing_ifc_count": entity_result.missing_ifc_count,
-                "missing_json_count": entity_result.missing_json_count,
-                "property_results": []
-            }
-
-            for prop_result in entity_result.property_results:
-                if args.show_matches or prop_result.status.name != "MATCH":
-                    entity_data["property_results"].append({
-                        "property_path": prop_result.property_path,
-                        "status": prop_result.status.value,
-                        "ifc_value": str(prop_result.ifc_value) if prop_result.ifc_value is not None else None,
-                        "json_value": str(prop_result.json_value) if prop_result.json_value is not None else None,
-                        "tolerance": prop_result.tolerance
-                    })
-
-            output_data["entities"][guid] = entity_data
-
-        with open(args.output, 'w', encoding='utf-8') as f:
-            json.dump(output_data, f, indent=2)
-
+    if writer:
         logger.info(f"Output written to {args.output}")
 
     return 0
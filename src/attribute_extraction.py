@@ -0,0 +1,87 @@
+from typing import Dict, Iterable, Set, Tuple
+
+import ifcopenshell
+
+
+class AttributeExtractor:
+    """
+    Plain-data form of the instances of one IFC file, equal to
+    get_info(recursive=True, include_identifier=False, ignore=ignore).
+
+    Nested instances referenced more than once, like placements, representation contexts, type objects or
+    material sets, are converted once and the same dictionary is used wherever they are referenced.
+    Only the top-level dictionary returned by get_info may be modified, nested ones are shared.
+    """
+
+    def __init__(self, ifc_file, ignore: Iterable[str] = ()):
+        self.ifc_file = ifc_file
+        self.ignore = frozenset(ignore)
+        self._shared: Dict[int, dict] = {}
+        # ids of the shared dictionaries, they stay alive as long as the extractor
+        self._shared_ids: Set[int] = set()
+
+    def get_info(self, instance) -> dict:
+        shared = self._shared.get(instance.id())
+        if shared is not None:
+            return dict(shared)
+        return self._build_info(instance)
+
+    def _nested_info(self, instance) -> dict:
+        step_id = instance.id()
+        # instances without a STEP id are inline values, e.g. IfcLabel
+        if not step_id:
+            return self._build_info(instance)
+        info = self._shared.get(step_id)
+        if info is not None:
+            return info
+
+        info = self._build_info(instance)
+        if self.ifc_file.get_total_inverses(instance) > 1:
+            self._shared[step_id] = info
+            self._shared_ids.add(id(info))
+        return info
+
+    def _build_info(self, instance) -> dict:
+        info = {"type": instance.is_a()}
+        attribute_names = instance.get_attribute_names()
+        for i in range(len(instance)):
+            if attribute_names[i] in self.ignore:
+                continue
+            info[attribute_names[i]] = self._convert(instance[i])
+        return info
+
+    def _convert(self, value):
+        if isinstance(value, ifcopenshell.entity_instance):
+            return self._nested_info(value)
+        if isinstance(value, (tuple, list)):
+            return tuple(self._convert(item) for item in value)
+        return value
+
+    def is_shared(self, info: dict) -> bool:
+        return id(info) in self._shared_ids
+
+    @property
+    def shared_count(self) -> int:
+        return len(self._shared)
+
+
+class SharedSubgraphMemo:
+    """
+    Pairs of shared subgraphs of two files, one from each extractor, that were already shown to be equal.
+    Only shared dictionaries are recorded, their ids cannot be reused while the extractors are alive.
+    """
+
+    def __init__(self, lhs_extractor: AttributeExtractor, rhs_extractor: AttributeExtractor):
+        self.lhs_extractor = lhs_extractor
+        self.rhs_extractor = rhs_extractor
+        self._equal_pairs: Set[Tuple[int, int]] = set()
+
+    def is_known_equal(self, lhs: dict, rhs: dict) -> bool:
+        return (id(lhs), id(rhs)) in self._equal_pairs
+
+    def record_equal(self, lhs: dict, rhs: dict):
+        if self.lhs_extractor.is_shared(lhs) and self.rhs_extractor.is_shared(rhs):
+            self._equal_pairs.add((id(lhs), id(rhs)))
+
+    def __len__(self):
+        return len(self._equal_pairs)
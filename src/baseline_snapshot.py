@@ -0,0 +1,319 @@
+import dataclasses
+import io
+import json
+import logging
+import mmap
+import os
+import struct
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import ifcopenshell
+import ifcopenshell.ifcopenshell_wrapper
+import numpy as np
+
+from src.entity_fingerprint import EntityFingerprint, fingerprint_entity
+from src.geometry_cache import hash_file_content
+from src.geometry_extraction import extract_geometries
+from src.ifc_comparator import IFCComparator, EntityExtractors, get_entities_dict_from_file, get_entity_attributes
+from src.mesh_comparison import Mesh, MeshInvariants
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_MAGIC = b"IFCSNAP\n"
+# bump when the layout of the snapshot or of SnapshotElement changes
+SNAPSHOT_FORMAT_VERSION = 2
+# magic, format version, length of the JSON metadata that follows
+_HEADER = struct.Struct("<8sII")
+# length of the JSON document of the elements that follows the metadata, the meshes follow it as npz
+_ELEMENTS_HEADER = struct.Struct("<Q")
+# tags of the JSON objects standing for values JSON has no type for, lists stand for tuples
+_REF, _LIST, _SET, _FROZENSET = "$ref", "$list", "$set", "$frozenset"
+
+
+@dataclasses.dataclass
+class SnapshotElement:
+    """
+    Everything the comparator reads from one element of the baseline file.
+    Stands in for the ifcopenshell entity: GlobalId, Name and is_a are named like theirs.
+    """
+    GlobalId: str
+    Name: Optional[str]
+    # the entity type followed by its supertypes
+    entity_types: Tuple[str, ...]
+    fingerprint: EntityFingerprint
+    # get_info of the element, without the psets, materials and geometry
+    attributes: dict
+    properties: dict
+    materials: Optional[dict]
+    geometry: Optional[Mesh]
+    # False if the geometry is missing altogether, because the element is no building element or tessellation failed
+    has_geometry: bool
+
+    def is_a(self, entity_type: Optional[str] = None):
+        if entity_type is None:
+            return self.entity_types[0]
+        return entity_type.lower() in (name.lower() for name in self.entity_types)
+
+
+@dataclasses.dataclass
+class BaselineSnapshot:
+    metadata: dict
+    # in the order of the baseline file, like IFCComparator.old_file_entities
+    elements: Dict[str, SnapshotElement]
+
+    @property
+    def ignore(self) -> frozenset:
+        return frozenset(self.metadata["ignore"])
+
+    @property
+    def tolerance(self) -> float:
+        return self.metadata["tolerance"]
+
+
+def entity_types_of(element, schema_name: str) -> Tuple[str, ...]:
+    declaration = ifcopenshell.ifcopenshell_wrapper.schema_by_name(schema_name).declaration_by_name(element.is_a())
+    names = []
+    while declaration:
+        names.append(declaration.name())
+        declaration = declaration.supertype()
+    return tuple(names)
+
+
+def create_snapshot(ifc_path: str, keys_to_ignore: Iterable[str] = (), geometry_threads: int = 1,
+                    tolerance: float = IFCComparator.TOLERANCE) -> BaselineSnapshot:
+    """Extract the elements IFCComparator compares from an IFC file, attributes to ignore are left out"""
+    ifc_file = ifcopenshell.open(ifc_path)
+    entities = get_entities_dict_from_file(ifc_file, IFCComparator.ENTITY_TYPES)
+    ignore = {"OwnerHistory", *keys_to_ignore}
+    extractors = EntityExtractors(ifc_file, ignore)
+    geometries = extract_geometries(ifc_file, [e for e in entities.values() if e.is_a("IfcBuildingElement")],
+                                    geometry_threads, tolerance=tolerance)
+
+    elements = {}
+    for guid, entity in entities.items():
+        attributes = get_entity_attributes(entity, ignore, geometries, extractors, tolerance=tolerance)
+        has_geometry = "Geometry" in attributes
+        geometry = attributes.pop("Geometry", None)
+        if geometry is not None:
+            # computed once here, the invariants are stored with the mesh
+            geometry.invariants
+        fingerprint = fingerprint_entity(attributes, tolerance)
+        properties = attributes.pop("Properties")
+        materials = attributes.pop("Materials", None)
+        elements[guid] = SnapshotElement(guid, entity.Name, entity_types_of(entity, ifc_file.schema), fingerprint,
+                                         attributes, properties, materials, geometry, has_geometry)
+
+    metadata = {
+        "source": os.path.abspath(ifc_path),
+        "content_hash": hash_file_content(ifc_path),
+        "schema": ifc_file.schema,
+        "ignore": sorted(ignore),
+        "tolerance": tolerance,
+        "ifcopenshell_version": ifcopenshell.version,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "element_count": len(elements),
+    }
+    logger.info(f"Extracted {len(elements)} elements of {ifc_path} into a snapshot")
+    return BaselineSnapshot(metadata, elements)
+
+
+def _escape_key(key) -> str:
+    if not isinstance(key, str):
+        raise TypeError(f"Cannot store the key {key!r} in a snapshot, only strings are supported")
+    # keys starting with $ get a second one, a single $ marks the tags
+    return f"${key}" if key.startswith("$") else key
+
+
+def _unescape_key(key: str) -> str:
+    return key[1:] if key.startswith("$") else key
+
+
+class _TreeEncoder:
+    """
+    JSON form of attribute trees of dictionaries, tuples, lists, sets and scalars. Dictionaries referenced more
+    than once are written once to a table of nodes, children before their parents, and referenced by index.
+    """
+
+    def __init__(self):
+        self._reference_counts: Dict[int, int] = {}
+        self._node_indices: Dict[int, int] = {}
+        self.nodes: List = []
+
+    def count_references(self, value):
+        if isinstance(value, dict):
+            count = self._reference_counts.get(id(value), 0)
+            self._reference_counts[id(value)] = count + 1
+            if count:
+                return
+            for item in value.values():
+                self.count_references(item)
+        elif isinstance(value, (tuple, list, set, frozenset)):
+            for item in value:
+                self.count_references(item)
+
+    def encode(self, value):
+        if isinstance(value, dict):
+            index = self._node_indices.get(id(value))
+            if index is not None:
+                return {_REF: index}
+            encoded = {_escape_key(key): self.encode(item) for key, item in value.items()}
+            if self._reference_counts.get(id(value), 0) < 2:
+                return encoded
+            self._node_indices[id(value)] = len(self.nodes)
+            self.nodes.append(encoded)
+            return {_REF: len(self.nodes) - 1}
+        if isinstance(value, tuple):
+            return [self.encode(item) for item in value]
+        if isinstance(value, list):
+            return {_LIST: [self.encode(item) for item in value]}
+        if isinstance(value, (set, frozenset)):
+            items = [self.encode(item) for item in sorted(value, key=repr)]
+            return {_FROZENSET if isinstance(value, frozenset) else _SET: items}
+        if value is None or isinstance(value, (str, int, float)):
+            return value
+        raise TypeError(f"Cannot store a value of type {type(value).__name__} in a snapshot")
+
+
+def _decode_tree(value, nodes: List[dict]):
+    if isinstance(value, list):
+        return tuple(_decode_tree(item, nodes) for item in value)
+    if not isinstance(value, dict):
+        return value
+    if len(value) == 1:
+        tag, item = next(iter(value.items()))
+        if tag == _REF:
+            return nodes[item]
+        if tag == _LIST:
+            return [_decode_tree(element, nodes) for element in item]
+        if tag == _SET:
+            return {_decode_tree(element, nodes) for element in item}
+        if tag == _FROZENSET:
+            return frozenset(_decode_tree(element, nodes) for element in item)
+    return {_unescape_key(key): _decode_tree(item, nodes) for key, item in value.items()}
+
+
+def _encode_meshes(meshes: List[Mesh]) -> bytes:
+    """All meshes in one npz, concatenated, with their counts and invariants"""
+    def stacked(arrays, dtype, width=3):
+        return np.concatenate(arrays).astype(dtype) if arrays else np.zeros((0, width), dtype=dtype)
+
+    invariants = [mesh.invariants for mesh in meshes]
+    buffer = io.BytesIO()
+    np.savez(buffer,
+             vertices=stacked([mesh.vertices for mesh in meshes], np.float64),
+             faces=stacked([mesh.faces for mesh in meshes], np.int64),
+             vertex_counts=np.array([mesh.vertex_count for mesh in meshes], dtype=np.int64),
+             face_counts=np.array([mesh.face_count for mesh in meshes], dtype=np.int64),
+             bbox_min=stacked([i.bbox_min.reshape(1, 3) for i in invariants], np.float64),
+             bbox_max=stacked([i.bbox_max.reshape(1, 3) for i in invariants], np.float64),
+             centroid=stacked([i.centroid.reshape(1, 3) for i in invariants], np.float64),
+             scalars=np.array([(i.volume, i.area, i.perimeter) for i in invariants], dtype=np.float64).reshape(-1, 3))
+    return buffer.getvalue()
+
+
+def _decode_meshes(data) -> List[Mesh]:
+    with np.load(io.BytesIO(data), allow_pickle=False) as arrays:
+        arrays = {name: arrays[name] for name in arrays.files}
+    vertex_ends = np.cumsum(arrays["vertex_counts"])
+    face_ends = np.cumsum(arrays["face_counts"])
+    meshes = []
+    for i in range(len(vertex_ends)):
+        vertex_start = vertex_ends[i - 1] if i else 0
+        face_start = face_ends[i - 1] if i else 0
+        mesh = Mesh(arrays["vertices"][vertex_start:vertex_ends[i]], arrays["faces"][face_start:face_ends[i]])
+        volume, area, perimeter = arrays["scalars"][i]
+        # stored with the mesh when the snapshot was taken, set like the cached property would
+        mesh.__dict__["invariants"] = MeshInvariants(mesh.vertex_count, mesh.face_count, arrays["bbox_min"][i],
+                                                     arrays["bbox_max"][i], arrays["centroid"][i], float(volume),
+                                                     float(area), float(perimeter))
+        meshes.append(mesh)
+    return meshes
+
+
+def _encode_elements(elements: Dict[str, SnapshotElement]) -> Tuple[bytes, bytes]:
+    encoder = _TreeEncoder()
+    for element in elements.values():
+        for tree in (element.attributes, element.properties, element.materials):
+            encoder.count_references(tree)
+    meshes = []
+    encoded_elements = []
+    for element in elements.values():
+        if element.geometry is not None:
+            meshes.append(element.geometry)
+        encoded_elements.append({
+            "guid": element.GlobalId,
+            "name": element.Name,
+            "entity_types": list(element.entity_types),
+            "fingerprint": [part.hex() for part in element.fingerprint],
+            "attributes": encoder.encode(element.attributes),
+            "properties": encoder.encode(element.properties),
+            "materials": encoder.encode(element.materials),
+            "geometry": len(meshes) - 1 if element.geometry is not None else None,
+            "has_geometry": element.has_geometry,
+        })
+    document = json.dumps({"nodes": encoder.nodes, "elements": encoded_elements}).encode()
+    return document, _encode_meshes(meshes)
+
+
+def _decode_elements(document: bytes, mesh_data) -> Dict[str, SnapshotElement]:
+    data = json.loads(document)
+    # a node only references nodes before it
+    nodes = []
+    for node in data["nodes"]:
+        nodes.append(_decode_tree(node, nodes))
+    meshes = _decode_meshes(mesh_data)
+    elements = {}
+    for element in data["elements"]:
+        elements[element["guid"]] = SnapshotElement(
+            element["guid"], element["name"], tuple(element["entity_types"]),
+            tuple(bytes.fromhex(part) for part in element["fingerprint"]),
+            _decode_tree(element["attributes"], nodes), _decode_tree(element["properties"], nodes),
+            _decode_tree(element["materials"], nodes),
+            meshes[element["geometry"]] if element["geometry"] is not None else None, element["has_geometry"])
+    return elements
+
+
+def write_snapshot(snapshot: BaselineSnapshot, path: str):
+    metadata = json.dumps(snapshot.metadata).encode()
+    # plain data only, JSON and npz without pickled objects, reading a snapshot cannot run code
+    document, mesh_data = _encode_elements(snapshot.elements)
+    # write to a temporary file first, a reader never sees a partial snapshot
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_FORMAT_VERSION, len(metadata)))
+        f.write(metadata)
+        f.write(_ELEMENTS_HEADER.pack(len(document)))
+        f.write(document)
+        f.write(mesh_data)
+    os.replace(tmp_path, path)
+
+
+def read_snapshot_metadata(path: str) -> dict:
+    with open(path, 'rb') as f:
+        header = f.read(_HEADER.size)
+        metadata_length = _check_header(path, header)
+        return json.loads(f.read(metadata_length))
+
+
+def read_snapshot(path: str) -> BaselineSnapshot:
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        metadata_length = _check_header(path, data[:_HEADER.size])
+        metadata_end = _HEADER.size + metadata_length
+        metadata = json.loads(data[_HEADER.size:metadata_end])
+        document_start = metadata_end + _ELEMENTS_HEADER.size
+        document_end = document_start + _ELEMENTS_HEADER.unpack(data[metadata_end:document_start])[0]
+        elements = _decode_elements(data[document_start:document_end], data[document_end:])
+    logger.info(f"Loaded a snapshot of {len(elements)} elements of {metadata['source']}")
+    return BaselineSnapshot(metadata, elements)
+
+
+def _check_header(path: str, header: bytes) -> int:
+    if len(header) < _HEADER.size:
+        raise ValueError(f"{path} is not a baseline snapshot")
+    magic, version, metadata_length = _HEADER.unpack(header)
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError(f"{path} is not a baseline snapshot")
+    if version != SNAPSHOT_FORMAT_VERSION:
+        raise ValueError(f"{path} has snapshot format version {version}, expected {SNAPSHOT_FORMAT_VERSION}")
+    return metadata_length
@@ -0,0 +1,118 @@
+import dataclasses
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Sequence
+
+from src.list_differences_collector import ListDifferencesCollector
+from src.snapshot_comparator import SnapshotComparator
+
+logger = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass
+class CandidateResult:
+    """Outcome of comparing one candidate file with the baseline, one row of the summary matrix"""
+    candidate_path: str
+    report_path: Optional[str]
+    equal: bool = False
+    difference_count: int = 0
+    differing_elements: int = 0
+    # compared elements of the baseline missing in the candidate and the other way round
+    missing_elements: int = 0
+    added_elements: int = 0
+    truncated: bool = False
+    error: Optional[str] = None
+
+
+def report_paths(candidate_paths: Sequence[str], output_dir: str) -> List[str]:
+    """One differences.json per candidate in a directory named after the candidate file, made unique if needed"""
+    paths = []
+    used_names = set()
+    for i, candidate_path in enumerate(candidate_paths):
+        base_name = name = os.path.splitext(os.path.basename(candidate_path))[0]
+        suffix = i + 1
+        # a suffixed name can be the name of another candidate, e.g. m_3.ifc
+        while name in used_names:
+            name = f"{base_name}_{suffix}"
+            suffix += 1
+        used_names.add(name)
+        paths.append(os.path.join(output_dir, name, "differences.json"))
+    return paths
+
+
+def compare_candidate(snapshot_path: str, candidate_path: str, report_path: str, settings: dict,
+                      max_differences: Optional[int] = None) -> CandidateResult:
+    """Compare one candidate with the baseline snapshot and write its report, errors are part of the result"""
+    result = CandidateResult(candidate_path, report_path)
+    try:
+        collector = ListDifferencesCollector()
+        comparator = SnapshotComparator(snapshot_path, candidate_path, collector)
+        comparator.apply_settings(settings)
+        comparator.set_max_differences(max_differences)
+        result.equal = comparator.compare_files()
+    except Exception as e:
+        logger.error(f"Failed to compare {candidate_path}: {e}")
+        result.report_path = None
+        result.error = str(e)
+        return result
+
+    differences = collector.get_differences()
+    result.difference_count = len(differences)
+    result.differing_elements = comparator.differing_elements
+    result.missing_elements = len(comparator.guid_index.removed.compared_guids())
+    result.added_elements = len(comparator.guid_index.added.compared_guids())
+    result.truncated = comparator.truncated
+
+    output_data = {"errors": differences}
+    if comparator.truncated:
+        output_data["truncated"] = True
+    os.makedirs(os.path.dirname(report_path), exist_ok=True)
+    with open(report_path, 'w') as json_file:
+        json.dump(output_data, json_file, indent=4)
+    return result
+
+
+def compare_candidates(snapshot_path: str, candidate_paths: Sequence[str], output_dir: str, settings: dict,
+                       jobs: int = 1, max_differences: Optional[int] = None) -> List[CandidateResult]:
+    """
+    Compare every candidate with the baseline snapshot, in up to jobs worker processes.
+    Every worker reads the snapshot instead of extracting the baseline again.
+    Returns the results in the order of candidate_paths.
+    """
+    paths = report_paths(candidate_paths, output_dir)
+    if jobs == 1:
+        return [compare_candidate(snapshot_path, candidate, path, settings, max_differences)
+                for candidate, path in zip(candidate_paths, paths)]
+
+    logger.info(f"Comparing {len(candidate_paths)} candidates with {jobs} processes")
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [executor.submit(compare_candidate, snapshot_path, candidate, path, settings, max_differences)
+                   for candidate, path in zip(candidate_paths, paths)]
+        return [future.result() for future in futures]
+
+
+def write_summary(baseline_path: str, results: Sequence[CandidateResult], path: str):
+    summary = {
+        "baseline": baseline_path,
+        "candidates": [dataclasses.asdict(result) for result in results],
+    }
+    with open(path, 'w') as json_file:
+        json.dump(summary, json_file, indent=4)
+
+
+def format_summary(results: Sequence[CandidateResult]) -> str:
+    """Summary matrix as a text table, one row per candidate"""
+    header = ("candidate", "equal", "differences", "differing", "missing", "added")
+    rows = [header]
+    for result in results:
+        name = os.path.basename(result.candidate_path)
+        if result.error:
+            rows.append((name, "error", "-", "-", "-", "-"))
+            continue
+        differences = f"{result.difference_count}+" if result.truncated else str(result.difference_count)
+        rows.append((name, "yes" if result.equal else "no", differences, str(result.differing_elements),
+                     str(result.missing_elements), str(result.added_elements)))
+    widths = [max(len(row[i]) for row in rows) for i in range(len(header))]
+    return "\n".join("  ".join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip() for row in rows)
@@ -0,0 +1,35 @@
+from src.interfaces.differences_collector import DifferencesCollector
+
+
+class DifferenceBudgetExhausted(Exception):
+    """Raised by BudgetedDifferencesCollector once max_differences differences were collected"""
+
+
+class BudgetedDifferencesCollector(DifferencesCollector):
+    """
+    Passes differences on to another collector and raises DifferenceBudgetExhausted as soon as
+    max_differences of them were added, which unwinds the comparison at the point it found the last one.
+    """
+
+    def __init__(self, collector: DifferencesCollector, max_differences: int):
+        if max_differences < 1:
+            raise ValueError(f"max_differences must be at least 1, got {max_differences}")
+        self.collector = collector
+        self.max_differences = max_differences
+        self.difference_count = 0
+
+    def add_difference(self, title, val1, val2):
+        self.collector.add_difference(title, val1, val2)
+        self.difference_count += 1
+        if self.difference_count >= self.max_differences:
+            raise DifferenceBudgetExhausted(f"Reached the budget of {self.max_differences} differences")
+
+    def get_differences(self):
+        return self.collector.get_differences()
+
+    def clear(self):
+        self.collector.clear()
+        self.difference_count = 0
+
+    def close(self):
+        self.collector.close()
@@ -1,10 +1,18 @@
+import argparse
 import dataclasses
+import mmap
 import os
-import sys
+import re
 from collections import defaultdict
 from typing import Tuple, Dict
 
 import ifcopenshell
+import ifcopenshell.ifcopenshell_wrapper
+
+FILE_SCHEMA = re.compile(rb"FILE_SCHEMA\s*\(\s*\(\s*'([^']+)'")
+DATA_SECTION = re.compile(rb"^\s*DATA\s*;", re.MULTILINE)
+# an instance at the start of a line: its type keyword and, if the first argument is a string, that string
+ENTITY_INSTANCE = re.compile(rb"^\s*#\d+\s*=\s*([A-Za-z0-9_]+)\s*\(\s*(?:'([^']*)')?", re.MULTILINE)
 
 
 def load_ifc_entities_by_type(ifc_path) -> dict:
@@ -23,6 +31,49 @@ def load_ifc_entities_by_type(ifc_path) -> dict:
     return entities
 
 
+def scan_ifc_entities_by_type(ifc_path) -> dict:
+    """
+    Same result as load_ifc_entities_by_type, read from the DATA section of the STEP file through a memory map
+    instead of loading the model. The GlobalId of IfcRoot subtypes is their first argument.
+    Instances are expected to start on a new line, as every IFC exporter writes them.
+    The GlobalIds of a type are in file order, the order of the full load is that of the ifcopenshell instance map.
+    """
+    if not os.path.isfile(ifc_path):
+        raise FileNotFoundError(f"File not found: {ifc_path}")
+
+    entities = defaultdict(list)
+    with open(ifc_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        data_section = DATA_SECTION.search(data)
+        if not data_section:
+            raise ValueError(f"No DATA section in {ifc_path}")
+        schema_name = FILE_SCHEMA.search(data, 0, data_section.start())
+        if not schema_name:
+            raise ValueError(f"No FILE_SCHEMA in {ifc_path}")
+        schema = ifcopenshell.ifcopenshell_wrapper.schema_by_name(schema_name.group(1).decode())
+
+        # keyword -> (type name, is IfcRoot subtype), resolved once per type
+        entity_types: Dict[bytes, Tuple[str, bool]] = {}
+        for instance in ENTITY_INSTANCE.finditer(data, data_section.end()):
+            keyword, first_string = instance.groups()
+            entity_type = entity_types.get(keyword)
+            if entity_type is None:
+                entity_type = entity_types[keyword] = resolve_entity_type(schema, keyword.decode())
+            name, is_rooted = entity_type
+            entities[name].append(first_string.decode() if is_rooted and first_string is not None else None)
+
+    return entities
+
+
+def resolve_entity_type(schema, keyword: str) -> Tuple[str, bool]:
+    declaration = schema.declaration_by_name(keyword)
+    name = declaration.name()
+    while declaration:
+        if declaration.name() == "IfcRoot":
+            return name, True
+        declaration = declaration.supertype()
+    return name, False
+
+
 def compare_entity_counts(entities1, entities2) -> Dict[str, Tuple[int, int]]:
     all_types = union_entity_types(entities1, entities2)
     comparison: Dict[str, Tuple[int, int]] = {}
@@ -74,12 +125,13 @@ def compare_entity_ids(entities1: FileEntities, entities2: FileEntities):
                     print(f"{'':12}{guid}")
 
 
-def main(file1, file2):
+def main(file1, file2, full_load=False):
     print(f"Comparing:\n  File 1: {file1}\n  File 2: {file2}\n")
     print(f"Comparing:\n  File 1: {os.path.basename(file1)}\n  File 2: {os.path.basename(file2)}\n")
 
-    entities1 = load_ifc_entities_by_type(file1)
-    entities2 = load_ifc_entities_by_type(file2)
+    load_entities = load_ifc_entities_by_type if full_load else scan_ifc_entities_by_type
+    entities1 = load_entities(file1)
+    entities2 = load_entities(file2)
 
     print("=== Entity Count Differences ===")
     count_diffs = compare_entity_counts(entities1, entities2)
@@ -93,8 +145,11 @@ def main(file1, file2):
 
 
 if __name__ == "__main__":
-    if len(sys.argv) != 3:
-        print("Usage: python compare_ifc_entities.py file1.ifc file2.ifc")
-        sys.exit(1)
-
-    main(sys.argv[1], sys.argv[2])
+    parser = argparse.ArgumentParser(description="Compare the entity counts and GlobalIds of two IFC files.")
+    parser.add_argument("file1", help="Path to the first IFC file")
+    parser.add_argument("file2", help="Path to the second IFC file")
+    parser.add_argument("--full-load", action="store_true",
+                        help="Load the models with ifcopenshell instead of scanning the STEP files")
+    args = parser.parse_args()
+
+    main(args.file1, args.file2, args.full_load)
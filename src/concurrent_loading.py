@@ -0,0 +1,31 @@
+import dataclasses
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Generic, List, Sequence, Tuple, TypeVar
+
+T = TypeVar('T')
+
+
+@dataclasses.dataclass
+class LoadResult(Generic[T]):
+    name: str
+    value: T
+    seconds: float
+
+
+def load_concurrently(loaders: Sequence[Tuple[str, Callable[[], T]]]) -> List[LoadResult[T]]:
+    """
+    Run every (name, loader) in a thread of its own and return the loaded values with their timings, in order.
+    ifcopenshell releases the GIL while it parses a file, so an IFC file is parsed while the other loader runs.
+    Collecting the entity dictionaries and parsing JSON are pure Python and hold it, those steps of two loaders
+    take turns. Processes are not an option, the loaded ifcopenshell files cannot be passed between them.
+    An exception of a loader is raised here.
+    """
+    def timed(name: str, loader: Callable[[], T]) -> LoadResult[T]:
+        start = time.perf_counter()
+        value = loader()
+        return LoadResult(name, value, time.perf_counter() - start)
+
+    with ThreadPoolExecutor(max_workers=max(1, len(loaders))) as executor:
+        futures = [executor.submit(timed, name, loader) for name, loader in loaders]
+        return [future.result() for future in futures]
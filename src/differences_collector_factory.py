@@ -3,19 +3,27 @@ from enum import Enum
 from src.interfaces.differences_collector import DifferencesCollector
 from src.list_differences_collector import ListDifferencesCollector
 from src.set_differences_collector import SetDifferencesCollector
+from src.streaming_differences_collector import StreamingDifferencesCollector
 
 
 class CollectionType(Enum):
     LIST = 1
     SET = 2
+    JSONL = 3
+    JSONL_GZIP = 4
 
 class DifferencesCollectorFactory:
     @staticmethod
-    def create(collection_type: CollectionType) -> DifferencesCollector:
+    def create(collection_type: CollectionType, output_path: str = None) -> DifferencesCollector:
         match collection_type:
             case CollectionType.LIST:
                 return ListDifferencesCollector()
             case CollectionType.SET:
                 return SetDifferencesCollector()
+            case CollectionType.JSONL | CollectionType.JSONL_GZIP:
+                if not output_path:
+                    raise ValueError(f"{collection_type} requires an output path")
+                return StreamingDifferencesCollector(output_path,
+                                                     compress=collection_type == CollectionType.JSONL_GZIP)
             case _:
                 raise ValueError(f"Unsupported file type: {collection_type}")
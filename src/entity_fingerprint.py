@@ -0,0 +1,60 @@
+import hashlib
+import math
+from collections.abc import Mapping
+from typing import Tuple
+
+# offsets of the two quantization grids, in units of the tolerance
+GRID_OFFSETS = (0.0, 0.5)
+
+EntityFingerprint = Tuple[bytes, ...]
+
+
+class _Token(bytes):
+    """Bytes pushed on the walk stack to be hashed as they are, e.g. dictionary keys"""
+
+
+def fingerprint(data, tolerance: float = 1e-5, offset: float = 0.0) -> bytes:
+    """
+    Hash of a nested structure of dictionaries, lists, tuples and scalars in which floats are quantized
+    into cells of size tolerance, shifted by offset cells. Two floats in the same cell differ by less
+    than the tolerance, so equal fingerprints imply that FuzzyHashmap considers the structures equal.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    update = digest.update
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        value_type = type(value)
+        if value_type is _Token:
+            update(value)
+        elif value_type is float:
+            if math.isfinite(value):
+                update(b"f%d;" % math.floor(value / tolerance + offset))
+            else:
+                update(b"F%s;" % repr(value).encode())
+        elif isinstance(value, Mapping):
+            items = sorted(value.items(), key=lambda item: repr(item[0]))
+            update(b"d%d;" % len(items))
+            for key, item in reversed(items):
+                stack.append(item)
+                stack.append(_Token(b"k%s;" % repr(key).encode()))
+        elif value_type is list or value_type is tuple:
+            update(b"%s%d;" % (value_type.__name__.encode(), len(value)))
+            stack.extend(reversed(value))
+        elif value_type is set or value_type is frozenset:
+            update(b"%s%s;" % (value_type.__name__.encode(), repr(sorted(map(repr, value))).encode()))
+        else:
+            update(b"%s:%s;" % (value_type.__name__.encode(), repr(value).encode()))
+    return digest.digest()
+
+
+def fingerprint_entity(data, tolerance: float = 1e-5) -> EntityFingerprint:
+    """
+    Fingerprints of the data on two quantization grids shifted by half a cell. Two values closer than
+    half the tolerance that straddle a cell boundary of one grid lie in the same cell of the other.
+    """
+    return tuple(fingerprint(data, tolerance, offset) for offset in GRID_OFFSETS)
+
+
+def fingerprints_match(lhs: EntityFingerprint, rhs: EntityFingerprint) -> bool:
+    return any(a == b for a, b in zip(lhs, rhs))
@@ -1,5 +1,6 @@
 from src.interfaces.differences_collector import DifferencesCollector
 from src.ifc_comparator import IFCComparator
+from src.snapshot_comparator import SnapshotComparator
 from src.interfaces.file_comparator import FileComparator
 from src.interfaces.file_comparator_factory import FileComparatorFactory, FileType
 
@@ -9,5 +10,7 @@ class IfcFileComparatorFactoryImpl(FileComparatorFactory):
         match file_type:
             case FileType.IFC:
                 return IFCComparator(self.file1_path, self.file2_path, collector)
+            case FileType.SNAPSHOT:
+                return SnapshotComparator(self.file1_path, self.file2_path, collector)
             case _:
                 raise ValueError(f"Unsupported file type: {file_type}")
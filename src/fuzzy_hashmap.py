@@ -1,5 +1,7 @@
 import math
 from collections.abc import Mapping, Sequence
+from enum import Enum
+from typing import Optional, Tuple
 
 
 def is_sequence_but_not_str(obj):
@@ -18,10 +20,142 @@ def equals_float(lhs, rhs, tolerance=1e-5):
     return False if abs(lhs - rhs) > tolerance else True
 
 
+class DifferenceKind(Enum):
+    TOLERANCE = "> as tolerance"
+    VALUE = "Value mismatch"
+    TYPE = "Type mismatch"
+    KEYS = "Keys mismatch"
+    LENGTH = "Length mismatch"
+    SET = "Set mismatch"
+
+
+# kind, key path, left and right value of the first difference found
+Difference = Tuple[DifferenceKind, str, object, object]
+
+
+def _key_path(stack) -> str:
+    path = "".join(f".{frame[3]}" if isinstance(frame[0], Mapping) else f"[{frame[3]}]" for frame in stack)
+    return path.lstrip(".")
+
+
+def find_difference(lhs, rhs, tolerance: float = 1e-5, memo=None) -> Optional[Difference]:
+    """
+    First difference between two containers with the same keys, mappings or sequences of equal length, in
+    depth-first order. Nested values are walked with an explicit stack, each frame holds the containers, the
+    iterator over their keys and the current key. Returns None if every value is equal within the tolerance.
+    """
+    stack = [[lhs, rhs, iter(lhs.items()) if isinstance(lhs, Mapping) else enumerate(lhs), None]]
+    while stack:
+        frame = stack[-1]
+        rhs_container = frame[1]
+        for key, a in frame[2]:
+            frame[3] = key
+            b = rhs_container[key]
+            if type(a) is not type(b):
+                return DifferenceKind.TYPE, _key_path(stack), a, b
+            if isinstance(a, float):
+                if abs(a - b) > tolerance:
+                    return DifferenceKind.TOLERANCE, _key_path(stack), a, b
+            elif isinstance(a, dict):
+                if memo is not None and memo.is_known_equal(a, b):
+                    continue
+                if a.keys() != b.keys():
+                    return DifferenceKind.KEYS, _key_path(stack), a, b
+                stack.append([a, b, iter(a.items()), None])
+                break
+            elif isinstance(a, (tuple, list)):
+                if len(a) != len(b):
+                    return DifferenceKind.LENGTH, _key_path(stack), a, b
+                stack.append([a, b, enumerate(a), None])
+                break
+            elif isinstance(a, (set, frozenset)):
+                if not sets_equal(a, b, tolerance):
+                    return DifferenceKind.SET, _key_path(stack), a, b
+            elif a != b:
+                return DifferenceKind.VALUE, _key_path(stack), a, b
+        else:
+            # every value of the frame is equal, continue with the parent
+            stack.pop()
+            if memo is not None and isinstance(frame[0], dict):
+                memo.record_equal(frame[0], frame[1])
+    return None
+
+
+def _partition_set(values):
+    """Floats, elements that can only be equal exactly and elements with nested values like tuples of floats"""
+    floats, exact, nested = [], set(), []
+    for value in values:
+        if type(value) is float:
+            floats.append(value)
+        elif isinstance(value, (tuple, frozenset)):
+            nested.append(value)
+        else:
+            exact.add(value)
+    return sorted(floats), exact, sorted(nested, key=repr)
+
+
+def _perfect_matching(lhs, rhs, tolerance: float) -> bool:
+    """Whether the elements of lhs and rhs can be paired one to one, found with augmenting paths"""
+    adjacency = [[j for j, b in enumerate(rhs) if type(a) is type(b) and find_difference((a,), (b,), tolerance) is None]
+                 for a in lhs]
+    match_of_lhs = [None] * len(lhs)
+    match_of_rhs = [None] * len(rhs)
+    for start in range(len(lhs)):
+        # breadth-first search of a path from start to an unmatched element of rhs, alternating between
+        # unmatched and matched pairs
+        reached_from = {}
+        queue = [start]
+        end = None
+        for i in queue:
+            for j in adjacency[i]:
+                if j in reached_from:
+                    continue
+                reached_from[j] = i
+                if match_of_rhs[j] is None:
+                    end = j
+                    break
+                queue.append(match_of_rhs[j])
+            if end is not None:
+                break
+        if end is None:
+            return False
+        # pair along the path, every element of lhs on it moves on to the next element of rhs
+        j = end
+        while j is not None:
+            i = reached_from[j]
+            next_j = match_of_lhs[i]
+            match_of_lhs[i] = j
+            match_of_rhs[j] = i
+            j = next_j
+    return True
+
+
+def sets_equal(lhs, rhs, tolerance: float = 1e-5) -> bool:
+    """Whether every element of lhs can be paired with its own element of rhs that is equal within the tolerance"""
+    if len(lhs) != len(rhs):
+        return False
+    if lhs == rhs:
+        return True
+    lhs_floats, lhs_exact, lhs_nested = _partition_set(lhs)
+    rhs_floats, rhs_exact, rhs_nested = _partition_set(rhs)
+    if len(lhs_floats) != len(rhs_floats) or len(lhs_nested) != len(rhs_nested) or lhs_exact != rhs_exact:
+        return False
+    # the i-th smallest floats of both sets are paired
+    if any(abs(a - b) > tolerance for a, b in zip(lhs_floats, rhs_floats)):
+        return False
+    return _perfect_matching(lhs_nested, rhs_nested, tolerance)
+
+
+def _json_value(value):
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=repr)
+    return value
+
+
 class FuzzyHashmap:
     """
     A dictionary-like structure for approximate comparisons of numerical values and strings.
-    Supports nested structures with floats, lists, and dictionaries.
+    Supports nested structures with floats, lists, tuples, sets and dictionaries.
     """
 
     def __init__(self, data: Mapping, tolerance: float = 1e-5, collector=None):
@@ -30,49 +164,44 @@ class FuzzyHashmap:
         self.data = data
         self.tolerance = tolerance
         self.mod = - int(round(math.log10(tolerance * 100)))
-        self._hash = self._calculate_hash()
+        # calculated when it is first needed, comparisons do not use it
+        self._hash: Optional[int] = None
         self.collector = collector
         self.parent_entity_guid: str = ""
+        # optional SharedSubgraphMemo of nested dictionaries already shown to be equal
+        self.equality_memo = None
 
     def __hash__(self):
+        if self._hash is None:
+            self._hash = self._calculate_hash()
         return self._hash
 
     def __eq__(self, other):
-
-        def equal(lhs, rhs):
-            if type(lhs) != type(rhs):
-                return False
-            if is_float_type(lhs):
-                if abs(lhs - rhs) > self.tolerance:
-                    self.collector.add_difference(
-                        f"Guid {self.parent_entity_guid} > as tolerance: {type(lhs)} != {type(rhs)}", lhs, rhs)
-                    return False
-            elif isinstance(lhs, dict):
-                fuzzy1, fuzzy2 = self.setup_fuzzy_hashmap_from_dict(lhs, rhs)
-                if not (fuzzy1 == fuzzy2):
-                    return False
-            elif isinstance(lhs, (tuple, list)):
-                if len(lhs) != len(rhs):
-                    return False
-                for a, b in zip(lhs, rhs):
-                    if not equal(a, b):
-                        return False
-            else:
-                if lhs != rhs:
-                    self.collector.add_difference(
-                        f"Guid {self.parent_entity_guid} Value mismatch: {type(lhs)} != {type(rhs)}", lhs, rhs)
-                    return False
+        if self.data.keys() != other.data.keys():
+            difference = DifferenceKind.KEYS, "", self.data, other.data
+        else:
+            difference = find_difference(self.data, other.data, self.tolerance, self.equality_memo)
+        if difference is None:
             return True
-
-        if set(self.data.keys()) != set(other.data.keys()):
-            return False
-
-        data_gen = ((self.data[k], other.data[k]) for k in self.data)
-        for v1, v2 in data_gen:
-            if not equal(v1, v2):
-                return False
-
-        return True
+        if self.collector is not None:
+            self.add_difference(*difference)
+        return False
+
+    def add_difference(self, kind: DifferenceKind, path: str, lhs, rhs):
+        title = f"Guid {self.parent_entity_guid} {kind.value} at {path or 'the top level'}"
+        match kind:
+            case DifferenceKind.KEYS:
+                self.collector.add_difference(title, [key for key in lhs if key not in rhs],
+                                              [key for key in rhs if key not in lhs])
+            case DifferenceKind.LENGTH:
+                self.collector.add_difference(title, len(lhs), len(rhs))
+            case DifferenceKind.SET:
+                self.collector.add_difference(title, _json_value(lhs - rhs), _json_value(rhs - lhs))
+            case DifferenceKind.TYPE:
+                self.collector.add_difference(title, type(lhs).__name__, type(rhs).__name__)
+            case _:
+                self.collector.add_difference(f"{title}: {type(lhs)} != {type(rhs)}", _json_value(lhs),
+                                              _json_value(rhs))
 
     def get_differences(self):
         return self.collector.get_differences()
@@ -86,7 +215,10 @@ class FuzzyHashmap:
                 return round(value, self.mod)
             elif isinstance(value, dict):
                 return tuple(sorted((k, _round_value(v)) for k, v in value.items()))
-            elif isinstance(value, (tuple, list, set)):
+            elif isinstance(value, (set, frozenset)):
+                # independent of the iteration order of the set
+                return frozenset(map(_round_value, value))
+            elif isinstance(value, (tuple, list)):
                 return tuple(map(_round_value, value))
             else:
                 return value
@@ -96,9 +228,5 @@ class FuzzyHashmap:
     def set_parent_entity_guid(self, guid: str):
         self.parent_entity_guid = guid
 
-    def setup_fuzzy_hashmap_from_dict(self, lhs, rhs):
-        fuzzy1 = FuzzyHashmap(lhs, self.tolerance, self.collector)
-        fuzzy1.set_parent_entity_guid(self.parent_entity_guid)
-        fuzzy2 = FuzzyHashmap(rhs, self.tolerance, self.collector)
-        fuzzy2.set_parent_entity_guid(self.parent_entity_guid)
-        return fuzzy1, fuzzy2
+    def set_equality_memo(self, memo):
+        self.equality_memo = memo
@@ -0,0 +1,121 @@
+import hashlib
+import logging
+import os
+from typing import Dict, Optional
+
+import ifcopenshell
+import numpy as np
+
+from src.mesh_comparison import Mesh
+
+logger = logging.getLogger(__name__)
+
+# bump when the layout of the cache entries changes
+CACHE_FORMAT_VERSION = 2
+DEFAULT_MAX_CACHE_SIZE = 1024 * 1024 * 1024
+# vertices are stored as integer multiples of tolerance / QUANTIZATION_STEPS,
+# the rounding error stays far below the comparison tolerance
+QUANTIZATION_STEPS = 100
+
+
+def hash_file_content(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def mesh_digest(vertices: np.ndarray, faces: np.ndarray) -> str:
+    digest = hashlib.sha256()
+    digest.update(vertices.tobytes())
+    digest.update(faces.tobytes())
+    return digest.hexdigest()
+
+
+class GeometryCache:
+    """
+    Persistent on-disk cache of tessellated element geometry.
+
+    Entries live in one directory per IFC file content hash, geometry settings and tolerance, with one
+    file per GUID holding the quantized vertices, the faces and a digest of both. When the cache grows
+    beyond max_size bytes the least recently used entries are evicted.
+    """
+
+    def __init__(self, cache_dir: str, max_size: int = DEFAULT_MAX_CACHE_SIZE, tolerance: float = 1e-5,
+                 settings_key: str = "use-world-coords"):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.tolerance = tolerance
+        self.quantum = tolerance / QUANTIZATION_STEPS
+        self.settings_key = settings_key
+        self._namespaces: Dict[str, str] = {}
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def namespace(self, file_path: str) -> str:
+        """Cache key of an IFC file, the content hash is computed once per path"""
+        path = os.path.abspath(file_path)
+        if path not in self._namespaces:
+            key = "|".join([hash_file_content(path), self.settings_key, repr(self.tolerance),
+                            ifcopenshell.version, str(CACHE_FORMAT_VERSION)])
+            self._namespaces[path] = hashlib.sha256(key.encode()).hexdigest()
+        return self._namespaces[path]
+
+    def _entry_path(self, namespace: str, guid: str) -> str:
+        # GUIDs are case-sensitive, file systems may not be
+        return os.path.join(self.cache_dir, namespace, f"{guid.encode().hex()}.npz")
+
+    def load(self, namespace: str, guid: str) -> Optional[Mesh]:
+        path = self._entry_path(namespace, guid)
+        try:
+            with np.load(path, allow_pickle=False) as entry:
+                vertices = entry["vertices"]
+                faces = entry["faces"]
+                digest = str(entry["digest"])
+        except (OSError, KeyError, ValueError):
+            return None
+        if digest != mesh_digest(vertices, faces):
+            logger.warning(f"Discarding corrupt geometry cache entry {path}")
+            return None
+
+        os.utime(path)
+        return Mesh(vertices * self.quantum, faces.astype(np.int64))
+
+    def store(self, namespace: str, guid: str, mesh: Mesh):
+        vertices = np.rint(mesh.vertices / self.quantum).astype(np.int64)
+        faces = mesh.faces.astype(np.int32)
+
+        path = self._entry_path(namespace, guid)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # write to a temporary file first, concurrent readers never see a partial entry
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, vertices=vertices, faces=faces, digest=np.array(mesh_digest(vertices, faces)))
+        os.replace(tmp_path, path)
+
+    def evict(self):
+        """Remove the least recently used entries until the cache fits into max_size"""
+        entries = []
+        total_size = 0
+        for namespace in os.scandir(self.cache_dir):
+            if not namespace.is_dir():
+                continue
+            for entry in os.scandir(namespace.path):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total_size += stat.st_size
+
+        if total_size <= self.max_size:
+            return
+        entries.sort()
+        evicted = 0
+        for _, size, path in entries:
+            if total_size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total_size -= size
+            evicted += 1
+        logger.info(f"Evicted {evicted} geometry cache entries")
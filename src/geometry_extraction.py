@@ -0,0 +1,80 @@
+import logging
+import os
+from typing import Dict, Iterable, List, Optional
+
+import ifcopenshell
+import ifcopenshell.geom
+import numpy as np
+
+from src.geometry_cache import GeometryCache
+from src.mesh_comparison import Mesh, canonicalize_mesh
+
+logger = logging.getLogger(__name__)
+
+
+def create_geometry_settings():
+    settings = ifcopenshell.geom.settings()
+    settings.set(settings.USE_WORLD_COORDS, True)
+    return settings
+
+
+def default_geometry_threads() -> int:
+    return os.cpu_count() or 1
+
+
+def shape_to_geometry(shape, tolerance: float = 1e-5) -> Optional[Mesh]:
+    if not shape:
+        return None
+    # each vertex consists of 3 values (X, Y, Z), reshaping it into (-1, 3)
+    # organizes it into an array where each row represents a vertex with three coordinates
+    vertices = np.array(shape.geometry.verts, dtype=np.float64).reshape(-1, 3)
+    faces = np.array(shape.geometry.faces, dtype=np.int64).reshape(-1, 3)
+    return canonicalize_mesh(vertices, faces, tolerance)
+
+
+def extract_geometries(ifc_file, elements: Iterable, num_threads: int = 1, cache: Optional[GeometryCache] = None,
+                       namespace: Optional[str] = None, tolerance: float = 1e-5) -> Dict[str, Mesh]:
+    """
+    Tessellate the given elements in one batch with the multi-threaded geometry iterator.
+    Returns {GlobalId: geometry}, elements the kernel fails to process are missing in the result.
+    With a cache, only the elements missing in the cache namespace are tessellated and then stored.
+    """
+    elements = list(elements)
+    if cache is None:
+        return tessellate(ifc_file, elements, num_threads, tolerance)
+
+    geometries = {}
+    misses = []
+    for element in elements:
+        geometry = cache.load(namespace, element.GlobalId)
+        if geometry is None:
+            misses.append(element)
+        else:
+            geometries[element.GlobalId] = geometry
+    logger.info(f"Loaded {len(geometries)} of {len(elements)} geometries from the cache")
+
+    tessellated = tessellate(ifc_file, misses, num_threads, tolerance)
+    for guid, geometry in tessellated.items():
+        if geometry is not None:
+            cache.store(namespace, guid, geometry)
+    geometries.update(tessellated)
+    return geometries
+
+
+def tessellate(ifc_file, elements: List, num_threads: int = 1, tolerance: float = 1e-5) -> Dict[str, Mesh]:
+    if not elements:
+        return {}
+
+    guids = {element.GlobalId for element in elements}
+    geometries = {}
+    iterator = ifcopenshell.geom.iterator(create_geometry_settings(), ifc_file, num_threads, include=elements)
+    if iterator.initialize():
+        while True:
+            shape = iterator.get()
+            if shape.guid in guids:
+                geometries[shape.guid] = shape_to_geometry(shape, tolerance)
+            if not iterator.next():
+                break
+
+    logger.info(f"Tessellated {len(geometries)} of {len(elements)} elements with {num_threads} threads")
+    return geometries
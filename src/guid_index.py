@@ -0,0 +1,68 @@
+from collections import defaultdict
+from typing import Dict, Iterable, List, Mapping
+
+
+class GuidGroup:
+    """
+    GUIDs of one kind (added, removed or shared) grouped by entity type and
+    split into excluded and compared entity types.
+    """
+
+    def __init__(self):
+        self.compared: Dict[str, List[str]] = defaultdict(list)
+        self.excluded: Dict[str, List[str]] = defaultdict(list)
+        # GUIDs in file order, independent of their entity type
+        self._compared_guids: List[str] = []
+        self._excluded_guids: List[str] = []
+
+    def add(self, entity_type: str, guid: str, is_excluded: bool):
+        if is_excluded:
+            self.excluded[entity_type].append(guid)
+            self._excluded_guids.append(guid)
+        else:
+            self.compared[entity_type].append(guid)
+            self._compared_guids.append(guid)
+
+    def compared_guids(self) -> List[str]:
+        return self._compared_guids
+
+    def excluded_guids(self) -> List[str]:
+        return self._excluded_guids
+
+    def __len__(self):
+        return len(self._compared_guids) + len(self._excluded_guids)
+
+
+class GuidIndex:
+    """
+    Added, removed and shared GUIDs of two entity maps, computed in a single pass.
+    """
+
+    def __init__(self, old_entities: Mapping, new_entities: Mapping, excluded_entity_types: Iterable[str]):
+        self.excluded_entity_types = frozenset(excluded_entity_types)
+        self.entity_types: Dict[str, str] = {}
+
+        self.removed = GuidGroup()
+        self.added = GuidGroup()
+        self.shared = GuidGroup()
+
+        for guid, entity in old_entities.items():
+            entity_type = entity.is_a()
+            self.entity_types[guid] = entity_type
+            group = self.shared if guid in new_entities else self.removed
+            group.add(entity_type, guid, entity_type in self.excluded_entity_types)
+
+        for guid, entity in new_entities.items():
+            if guid in old_entities:
+                continue
+            entity_type = entity.is_a()
+            self.entity_types[guid] = entity_type
+            self.added.add(entity_type, guid, entity_type in self.excluded_entity_types)
+
+    def is_excluded(self, guid: str) -> bool:
+        return self.entity_types.get(guid) in self.excluded_entity_types
+
+    @property
+    def has_only_excluded_unmatched(self) -> bool:
+        """True if every GUID present in only one of the files belongs to an excluded entity type"""
+        return not self.removed.compared and not self.added.compared
@@ -1,14 +1,25 @@
 import logging
 import sys
-from typing import List
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
 import ifcopenshell
 import ifcopenshell.geom
 import ifcopenshell.util
 import ifcopenshell.util.element
-import numpy as np
 
+from src.attribute_extraction import AttributeExtractor, SharedSubgraphMemo
+from src.concurrent_loading import load_concurrently
+from src.budgeted_differences_collector import BudgetedDifferencesCollector, DifferenceBudgetExhausted
+from src.entity_fingerprint import fingerprint_entity, fingerprints_match
 from src.fuzzy_hashmap import FuzzyHashmap
+from src.geometry_extraction import create_geometry_settings, default_geometry_threads, extract_geometries, \
+    shape_to_geometry
+from src.geometry_cache import GeometryCache
+from src.guid_index import GuidIndex
+from src.mesh_comparison import GeometryComparisonMode, Mesh, compare_mesh_invariants, compare_meshes
+from src.parallel_comparison import compare_shared_elements
+from src.profiling import NULL_PROFILER, Profiler
 from src.interfaces.differences_collector import DifferencesCollector
 from src.interfaces.file_comparator import FileComparator
 
@@ -21,53 +32,52 @@ logger.addHandler(handler)
 logger.setLevel(logging.DEBUG)
 
 
-def find_different_keys(dict1: dict, dict2: dict):
-    keys1 = set(dict1.keys())
-    keys2 = set(dict2.keys())
-
-    keys_only_in_dict1 = keys1 - keys2
-    keys_only_in_dict2 = keys2 - keys1
-
-    return keys_only_in_dict1, keys_only_in_dict2
-
-
 def get_entity_properties(element):
     return ifcopenshell.util.element.get_psets(element)
 
 
-def get_entity_materials(element):
+def get_entity_materials(element, extractor: Optional[AttributeExtractor] = None):
     if material := ifcopenshell.util.element.get_material(element):
+        if extractor:
+            return extractor.get_info(material)
         return material.get_info(recursive=True, include_identifier=False, ignore={"OwnerHistory"})
     return None
 
 
-def get_entity_geometry(element):
-    settings = ifcopenshell.geom.settings()
-    settings.set(settings.USE_WORLD_COORDS, True)
-    shape = ifcopenshell.geom.create_shape(settings, element)
-    if shape:
-        # each vertex consists of 3 values (X, Y, Z), reshaping it into (-1, 3)
-        # organizes it into an array where each row represents a vertex with three coordinates
-        vertices = np.array(shape.geometry.verts).reshape(-1, 3)
-        faces = np.array(shape.geometry.faces).reshape(-1, 3)
-        return {"vertices": sorted(vertices.tolist()), "faces": sorted(faces.tolist())}
-    return None
+def get_entity_geometry(element, tolerance: float = 1e-5):
+    shape = ifcopenshell.geom.create_shape(create_geometry_settings(), element)
+    return shape_to_geometry(shape, tolerance)
 
 
-def get_entity_attributes(element, ignore_attributes):
-    attributes = element.get_info(recursive=True, include_identifier=False,
-                                  ignore=ignore_attributes)
-    attributes["Properties"] = get_entity_properties(element)
+def get_entity_attributes(element, ignore_attributes, geometries: Optional[Dict[str, Mesh]] = None,
+                          extractors: Optional['EntityExtractors'] = None, profiler: Profiler = NULL_PROFILER,
+                          tolerance: float = 1e-5):
+    entity_type = element.is_a() if profiler.enabled else None
+    with profiler.timer("get_info", entity_type):
+        if extractors:
+            attributes = extractors.attributes.get_info(element)
+        else:
+            attributes = element.get_info(recursive=True, include_identifier=False,
+                                          ignore=ignore_attributes)
+    with profiler.timer("get_psets", entity_type):
+        attributes["Properties"] = get_entity_properties(element)
     if element.is_a("IfcBuildingElement"):
-        attributes["Materials"] = get_entity_materials(element)
-        get_entity_geometry_handle_exception(attributes, element)
+        with profiler.timer("get_entity_materials", entity_type):
+            attributes["Materials"] = get_entity_materials(element, extractors.materials if extractors else None)
+        if geometries is not None and element.GlobalId in geometries:
+            attributes["Geometry"] = geometries[element.GlobalId]
+        else:
+            # elements the batch tessellation skipped, one by one
+            with profiler.timer("get_entity_geometry", entity_type):
+                get_entity_geometry_handle_exception(attributes, element, tolerance)
 
     return attributes
 
 
-def get_entity_geometry_handle_exception(attributes, element):
+def get_entity_geometry_handle_exception(attributes, element, tolerance: float = 1e-5):
     try:
-        attributes["Geometry"] = get_entity_geometry(element)
+        # the same tolerance as the batch tessellation, both canonicalize the vertices alike
+        attributes["Geometry"] = get_entity_geometry(element, tolerance)
     except RuntimeError as e:
         logger.error(f"Failed to extract geometry for {element.GlobalId}: {e}")
 
@@ -79,110 +89,335 @@ def get_entities_dict_from_file(file, entity_types: List[str]):
     return entities
 
 
+class EntityExtractors:
+    """Memoizing extractors of one file for the element attributes and the materials"""
+
+    def __init__(self, ifc_file, ignore_attributes):
+        self.attributes = AttributeExtractor(ifc_file, ignore_attributes)
+        self.materials = AttributeExtractor(ifc_file, {"OwnerHistory"})
+
+
+# marks an element whose geometry could not be extracted, as opposed to one without geometry (None)
+NO_GEOMETRY = object()
+
+
 class IFCComparator(FileComparator):
+    ENTITY_TYPES = ['IfcSpace', 'IfcBuildingElement']
     EXCLUDED_ENTITY_TYPES = ["IfcStair", "IfcDoor", "IfcWindow"]
+    TOLERANCE = 1e-5
+    # shared elements are tessellated in batches of this size right before they are compared
+    GEOMETRY_BATCH_SIZE = 256
 
     def __init__(self, file1_path, file2_path, collector: DifferencesCollector = None):
-        self.file1 = ifcopenshell.open(file1_path)
-        self.file2 = ifcopenshell.open(file2_path)
-        logger.info(f"Opened files {file1_path} and {file2_path}")
+        self.file1_path = file1_path
+        self.file2_path = file2_path
+        # seconds spent in ifcopenshell.open per file, reported to the profiler once it is set
+        self.open_timings: Dict[str, float] = {}
+        self.open_files()
         self.collector = collector
 
-        entity_types = ['IfcSpace', 'IfcBuildingElement']
-
-        self.old_file_entities = get_entities_dict_from_file(self.file1, entity_types)
-        self.new_file_entities = get_entities_dict_from_file(self.file2, entity_types)
-
         self.keys_to_ignore: List[str] = []
+        self.jobs = 1
+        self.geometry_threads = default_geometry_threads()
+        self.geometry_cache: Optional[GeometryCache] = None
+        self.geometry_mode = GeometryComparisonMode.STRICT
+        self.fingerprint_mode = False
+        self.fingerprint_matches = 0
+        self.max_differences: Optional[int] = None
+        # set when the comparison stopped early because max_differences was reached
+        self.truncated = False
+        # shared elements found to differ by compare_files
+        self.differing_elements = 0
+        # created for the current attributes to ignore, see extractors_for
+        self.old_file_extractors: Optional[EntityExtractors] = None
+        self.new_file_extractors: Optional[EntityExtractors] = None
+        self.equality_memo: Optional[SharedSubgraphMemo] = None
+        # geometries tessellated up front, read by compare_elements
+        self.old_file_geometries: Dict[str, Mesh] = {}
+        self.new_file_geometries: Dict[str, Mesh] = {}
+        self.profiler: Profiler = NULL_PROFILER
         self.excluded_entity_types = self.EXCLUDED_ENTITY_TYPES
+        self.guid_index = GuidIndex(self.old_file_entities, self.new_file_entities, self.excluded_entity_types)
 
         self.added_in_new = set()
         self.deleted_from_old = set()
         self.unchanged_in_new = set()
 
+    def open_files(self):
+        # each file is parsed while the entities of the other one are collected
+        old_file, new_file = load_concurrently([(self.file1_path, lambda: self.load_file(self.file1_path)),
+                                                (self.file2_path, lambda: self.load_file(self.file2_path))])
+        self.file1, self.old_file_entities = old_file.value
+        self.file2, self.new_file_entities = new_file.value
+        self.load_timings = {"old": old_file.seconds, "new": new_file.seconds}
+        logger.info(f"Opened files {self.file1_path} in {old_file.seconds:.2f} s "
+                    f"and {self.file2_path} in {new_file.seconds:.2f} s")
+
+    def load_file(self, file_path: str):
+        start = time.perf_counter()
+        ifc_file = ifcopenshell.open(file_path)
+        self.open_timings[file_path] = time.perf_counter() - start
+        return ifc_file, get_entities_dict_from_file(ifc_file, self.ENTITY_TYPES)
+
     def compare_elements(self, entity_lhs, entity_rhs):
         attributes_to_ignore = {"OwnerHistory"}
         if self.keys_to_ignore:
             attributes_to_ignore.update(self.keys_to_ignore)
 
-        fuzzy_attrs1 = self.create_fuzzy_hashmap(attributes_to_ignore, entity_lhs)
-        fuzzy_attrs2 = self.create_fuzzy_hashmap(attributes_to_ignore, entity_rhs)
-
-        keys_only_in_dict1, keys_only_in_dict2 = find_different_keys(self.old_file_entities, self.new_file_entities)
-
-        return self.compare_fuzzy_hashmaps_and_validate_equality(entity_lhs,
-                                                                 entity_rhs,
-                                                                 fuzzy_attrs1,
-                                                                 fuzzy_attrs2,
-                                                                 keys_only_in_dict1,
-                                                                 keys_only_in_dict2)
-
-    def compare_fuzzy_hashmaps_and_validate_equality(self,
-                                                     entity_lhs,
-                                                     entity_rhs,
-                                                     fuzzy_attrs1,
-                                                     fuzzy_attrs2,
-                                                     keys_only_in_dict1,
-                                                     keys_only_in_dict2):
-        if fuzzy_attrs1 != fuzzy_attrs2:
+        self.extractors_for(attributes_to_ignore)
+        attributes1, geometry1 = self.old_element_data(entity_lhs, attributes_to_ignore)
+        attributes2 = get_entity_attributes(entity_rhs, attributes_to_ignore, self.new_file_geometries,
+                                            self.new_file_extractors, self.profiler, self.TOLERANCE)
+        # meshes are compared separately from the other attributes, on their arrays
+        geometry2 = attributes2.pop("Geometry", NO_GEOMETRY)
+
+        equal = self.compare_attributes(entity_lhs, attributes1, attributes2)
+        if equal:
+            with self.profiler.timer("compare_geometries", entity_lhs.is_a() if self.profiler.enabled else None):
+                equal = self.compare_geometries(entity_lhs.GlobalId, geometry1, geometry2)
+        return self.validate_equality(entity_lhs, entity_rhs, equal)
+
+    def old_element_data(self, entity, attributes_to_ignore):
+        """Attributes and geometry of an element of the first file"""
+        attributes = get_entity_attributes(entity, attributes_to_ignore, self.old_file_geometries,
+                                           self.old_file_extractors, self.profiler, self.TOLERANCE)
+        return attributes, attributes.pop("Geometry", NO_GEOMETRY)
+
+    def old_element_fingerprint(self, entity, attributes: dict):
+        return fingerprint_entity(attributes, self.TOLERANCE)
+
+    def extractors_for(self, attributes_to_ignore):
+        if self.old_file_extractors and self.old_file_extractors.attributes.ignore == attributes_to_ignore:
+            return
+        self.old_file_extractors = EntityExtractors(self.file1, attributes_to_ignore)
+        self.new_file_extractors = EntityExtractors(self.file2, attributes_to_ignore)
+        self.equality_memo = SharedSubgraphMemo(self.old_file_extractors.attributes,
+                                                self.new_file_extractors.attributes)
+
+    def validate_equality(self, entity_lhs, entity_rhs, equal: bool):
+        if not equal:
             logger.warning(f"Attributes differ between GUID {entity_lhs.GlobalId} and GUID {entity_rhs.GlobalId}")
             self.added_in_new.add(entity_rhs.GlobalId)
             return False
 
-        entities_file_1 = [self.file1.by_guid(guid).is_a() for guid in keys_only_in_dict1]
-        entities_file_2 = [self.file2.by_guid(guid).is_a() for guid in keys_only_in_dict2]
-        if (all(entity in self.excluded_entity_types for entity in entities_file_1) and
-                all(entity in self.excluded_entity_types for entity in entities_file_2)):
+        if self.guid_index.has_only_excluded_unmatched:
             # Stairs, doors, and windows are not compared - GUID is not consistent from cadwork
             return True
 
-        if keys_only_in_dict1 - keys_only_in_dict2:
+        if len(self.guid_index.removed):
             logger.warning(f"Attributes missing in {entity_rhs.GlobalId}")
             self.added_in_new.add(entity_rhs.GlobalId)
             return False
-        if keys_only_in_dict2 - keys_only_in_dict1:
+        if len(self.guid_index.added):
             logger.warning(f"Attributes missing in {entity_lhs.GlobalId}")
             self.deleted_from_old.add(entity_lhs.GlobalId)
             return False
         return True
 
-    def create_fuzzy_hashmap(self, attributes_to_ignore, entity_lhs):
-        fuzzy_attrs1 = FuzzyHashmap(get_entity_attributes(entity_lhs, attributes_to_ignore), tolerance=1e-5,
-                                    collector=self.collector)
-        fuzzy_attrs1.set_parent_entity_guid(entity_lhs.GlobalId)
+    def compare_attributes(self, entity_lhs, attributes1: dict, attributes2: dict) -> bool:
+        if self.fingerprint_mode:
+            # equal fingerprints imply fuzzy equality, only mismatches need the detailed walk
+            if fingerprints_match(self.old_element_fingerprint(entity_lhs, attributes1),
+                                  fingerprint_entity(attributes2, self.TOLERANCE)):
+                self.fingerprint_matches += 1
+                self.profiler.count("fingerprint matches")
+                return True
+        guid = entity_lhs.GlobalId
+        fuzzy_attrs1 = self.create_fuzzy_hashmap(attributes1, guid)
+        fuzzy_attrs2 = self.create_fuzzy_hashmap(attributes2, guid)
+        with self.profiler.timer("FuzzyHashmap.__eq__", entity_lhs.is_a() if self.profiler.enabled else None):
+            return fuzzy_attrs1 == fuzzy_attrs2
+
+    def create_fuzzy_hashmap(self, attributes: dict, guid: str):
+        fuzzy_attrs1 = FuzzyHashmap(attributes, tolerance=self.TOLERANCE, collector=self.collector)
+        fuzzy_attrs1.set_parent_entity_guid(guid)
+        fuzzy_attrs1.set_equality_memo(self.equality_memo)
         return fuzzy_attrs1
 
-    def compare_files(self):
+    def compare_geometries(self, guid: str, geometry1, geometry2) -> bool:
+        if geometry1 is NO_GEOMETRY or geometry2 is NO_GEOMETRY or geometry1 is None or geometry2 is None:
+            return geometry1 is geometry2
+
+        invariants = compare_mesh_invariants(geometry1.invariants, geometry2.invariants, self.TOLERANCE)
+        if not invariants.equal:
+            if self.collector:
+                self.collector.add_difference(f"Guid {guid} Geometry mismatch: {invariants.describe()}",
+                                              invariants.lhs_value, invariants.rhs_value)
+            return False
+        if self.geometry_mode != GeometryComparisonMode.STRICT:
+            return True
+
+        result = compare_meshes(geometry1, geometry2, self.TOLERANCE)
+        if not result.equal and self.collector:
+            self.collector.add_difference(f"Guid {guid} Geometry mismatch: {result.describe()}",
+                                          result.vertex_counts[0], result.vertex_counts[1])
+        return result.equal
+
+    def prepare_geometries(self, guids: Iterable[str]):
+        """Tessellate the building elements with the given GUIDs of both files in one batch per file"""
+        guids = list(guids)
+        with self.profiler.timer("tessellation"):
+            self.old_file_geometries = extract_geometries(
+                self.file1, self.building_elements(self.old_file_entities, guids), self.geometry_threads,
+                self.geometry_cache, self.geometry_cache_namespace(self.file1_path), self.TOLERANCE)
+            self.new_file_geometries = extract_geometries(
+                self.file2, self.building_elements(self.new_file_entities, guids), self.geometry_threads,
+                self.geometry_cache, self.geometry_cache_namespace(self.file2_path), self.TOLERANCE)
+        self.profiler.count("tessellated elements", len(self.old_file_geometries) + len(self.new_file_geometries))
+
+    def geometry_cache_namespace(self, file_path: str) -> Optional[str]:
+        return self.geometry_cache.namespace(file_path) if self.geometry_cache else None
+
+    @staticmethod
+    def building_elements(entities: dict, guids: List[str]):
+        return [entities[guid] for guid in guids if entities[guid].is_a("IfcBuildingElement")]
 
-        for global_id, element1 in self.old_file_entities.items():
-            if global_id in self.new_file_entities:
-                element2 = self.new_file_entities[global_id]
-                if not self.compare_elements(element1, element2):
-                    if not self.collector: break
-                    self.collector.add_difference(
-                        title=f"Attributes differ between GUID {element1.GlobalId} and GUID {element2.GlobalId}",
-                        val1=element1.GlobalId,
-                        val2=element2.GlobalId)
-            else:
-                # If the element is not in the new file, check if it is a stair, door, or window
-                if element1.is_a() in self.excluded_entity_types:
-                    pass
+    def compare_files(self):
+        shared_guids = [guid for guid in self.old_file_entities if guid in self.new_file_entities]
+        if self.jobs > 1:
+            shared_results = self.compare_shared_elements_in_parallel(shared_guids)
+        else:
+            shared_results = self.compare_shared_elements(shared_guids)
+
+        try:
+            for global_id, element1 in self.old_file_entities.items():
+                if global_id in self.new_file_entities:
+                    element2 = self.new_file_entities[global_id]
+                    shared_guid, equal = next(shared_results)
+                    assert shared_guid == global_id, f"Result for {shared_guid} merged as {global_id}"
+                    if not equal:
+                        self.differing_elements += 1
+                        if not self.collector: break
+                        self.collector.add_difference(
+                            title=f"Attributes differ between GUID {element1.GlobalId} and GUID {element2.GlobalId}",
+                            val1=element1.GlobalId,
+                            val2=element2.GlobalId)
                 else:
-                    if not self.collector: break
-                    self.collector.add_difference(
-                        title=f"Element Name [{element1.Name}] with GUID [{global_id}] is missing in the second file",
-                        val1=element1.GlobalId,
-                        val2=None)
-
-        for global_id in self.new_file_entities.keys():
-            if (global_id not in self.old_file_entities and self.file2.by_guid(global_id).is_a()
-                    not in self.excluded_entity_types):
+                    # If the element is not in the new file, check if it is a stair, door, or window
+                    if self.guid_index.is_excluded(global_id):
+                        pass
+                    else:
+                        if not self.collector: break
+                        self.collector.add_difference(
+                            title=f"Element Name [{element1.Name}] with GUID [{global_id}] "
+                                  f"is missing in the second file",
+                            val1=element1.GlobalId,
+                            val2=None)
+
+            for global_id in self.guid_index.added.compared_guids():
                 if not self.collector: break
                 self.collector.add_difference(title=f"Element Name [{global_id}] is missing in the second file",
                                               val1=None,
                                               val2=global_id)
+        except DifferenceBudgetExhausted:
+            self.truncated = True
+            logger.warning(f"Stopped the comparison after {self.max_differences} differences")
+        finally:
+            # drops pending geometry batches and shuts the worker pool down
+            shared_results.close()
+
+        if self.geometry_cache:
+            self.geometry_cache.evict()
+        if self.fingerprint_mode and self.jobs == 1:
+            logger.info(f"Accepted {self.fingerprint_matches} elements by their fingerprint")
 
         return True if len(self.collector.get_differences()) == 0 else False
 
+    def compare_shared_elements(self, guids: List[str]) -> Iterator[Tuple[str, bool]]:
+        """
+        Compare the elements with the given GUIDs, which exist in both files, and yield (GUID, equal) in order.
+        Geometry is tessellated batch by batch, closing the generator early skips the remaining batches.
+        """
+        for start in range(0, len(guids), self.GEOMETRY_BATCH_SIZE):
+            batch = guids[start:start + self.GEOMETRY_BATCH_SIZE]
+            self.prepare_geometries(batch)
+            for guid in batch:
+                yield guid, self.compare_element_pair(guid)
+
+    def compare_element_pair(self, guid: str) -> bool:
+        entity_lhs = self.old_file_entities[guid]
+        if not self.profiler.enabled:
+            return self.compare_elements(entity_lhs, self.new_file_entities[guid])
+        start = time.perf_counter()
+        equal = self.compare_elements(entity_lhs, self.new_file_entities[guid])
+        self.profiler.record_element(guid, entity_lhs.is_a(), time.perf_counter() - start)
+        return equal
+
+    def compare_shared_elements_in_parallel(self, guids: List[str]) -> Iterator[Tuple[str, bool]]:
+        """Like compare_shared_elements, in a pool of jobs worker processes"""
+        if self.geometry_cache:
+            # hash the files once here instead of once per worker
+            self.geometry_cache_namespace(self.file1_path)
+            self.geometry_cache_namespace(self.file2_path)
+        shard_results = compare_shared_elements(type(self), self.file1_path, self.file2_path, guids,
+                                                self.worker_settings(), self.jobs, self.profiler)
+        try:
+            for shard_result in shard_results:
+                yield self.merge_shared_result(shard_result)
+        finally:
+            # stops the workers when the comparison ends early
+            shard_results.close()
+
+    def worker_settings(self) -> dict:
+        """Settings the worker processes of a parallel run are configured with, see apply_settings"""
+        return {
+            "keys_to_ignore": self.keys_to_ignore,
+            "geometry_threads": max(1, self.geometry_threads // self.jobs),
+            "geometry_cache": self.geometry_cache,
+            "geometry_mode": self.geometry_mode,
+            "fingerprint_mode": self.fingerprint_mode,
+            # workers profile when the parent does, their profiles are merged into its one
+            "profile_slowest_count": self.profiler.slowest_count if self.profiler.enabled else None,
+        }
+
+    def apply_settings(self, settings: dict):
+        self.set_keys_to_ignore(settings["keys_to_ignore"])
+        self.set_geometry_threads(settings["geometry_threads"])
+        self.set_geometry_cache(settings["geometry_cache"])
+        self.set_geometry_mode(settings["geometry_mode"])
+        self.set_fingerprint_mode(settings["fingerprint_mode"])
+        slowest_count = settings.get("profile_slowest_count")
+        self.set_profiler(Profiler(slowest_count) if slowest_count is not None else NULL_PROFILER)
+
+    def merge_shared_result(self, shard_result) -> Tuple[str, bool]:
+        guid, equal, differences = shard_result
+        if self.collector:
+            for title, val1, val2 in differences:
+                self.collector.add_difference(title, val1, val2)
+        return guid, equal
+
     def set_keys_to_ignore(self, keys: List[str]):
         self.keys_to_ignore = keys
+
+    def set_geometry_threads(self, threads: int):
+        if threads < 1:
+            raise ValueError(f"threads must be at least 1, got {threads}")
+        self.geometry_threads = threads
+
+    def set_geometry_cache(self, cache: Optional[GeometryCache]):
+        self.geometry_cache = cache
+
+    def set_geometry_mode(self, mode: GeometryComparisonMode):
+        self.geometry_mode = mode
+
+    def set_fingerprint_mode(self, enabled: bool):
+        self.fingerprint_mode = enabled
+
+    def set_profiler(self, profiler: Profiler):
+        """Time the phases of the comparison with the profiler, the opening of the files is added right away"""
+        self.profiler = profiler
+        for seconds in self.open_timings.values():
+            profiler.add_time("ifcopenshell.open", seconds)
+
+    def set_max_differences(self, max_differences: Optional[int]):
+        """Stop comparing as soon as max_differences differences were collected, None compares everything"""
+        if isinstance(self.collector, BudgetedDifferencesCollector):
+            self.collector = self.collector.collector
+        self.max_differences = max_differences
+        if max_differences is not None and self.collector:
+            self.collector = BudgetedDifferencesCollector(self.collector, max_differences)
+
+    def set_jobs(self, jobs: int):
+        if jobs < 1:
+            raise ValueError(f"jobs must be at least 1, got {jobs}")
+        self.jobs = jobs
@@ -11,4 +11,8 @@ class DifferencesCollector(ABC):
 
     @abstractmethod
     def clear(self):
-        pass
\ No newline at end of file
+        pass
+
+    def close(self):
+        """Release resources held by the collector, e.g. an output file"""
+        pass
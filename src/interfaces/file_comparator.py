@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import List, Optional
 
 
 class FileComparator(ABC):
@@ -14,3 +14,11 @@ class FileComparator(ABC):
     @abstractmethod
     def set_keys_to_ignore(self, keys: List[str]):
         pass
+
+    @abstractmethod
+    def set_jobs(self, jobs: int):
+        pass
+
+    @abstractmethod
+    def set_max_differences(self, max_differences: Optional[int]):
+        pass
@@ -8,6 +8,8 @@ from src.interfaces.differences_collector import DifferencesCollector
 class FileType(Enum):
     IFC = 1
     BTL = 2
+    # a baseline snapshot as the first file, see baseline_snapshot
+    SNAPSHOT = 3
 
 
 class FileComparatorFactory(ABC):
@@ -0,0 +1,211 @@
+import dataclasses
+import functools
+from enum import Enum
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+class GeometryComparisonMode(Enum):
+    # invariants only, enough to tell a changed element from an unchanged one in smoke runs
+    INVARIANTS = "invariants"
+    # invariants first, full vertex and face comparison when they match
+    STRICT = "strict"
+
+
+@dataclasses.dataclass(eq=False)
+class Mesh:
+    """Triangulated element geometry, vertices as (n, 3) floats and faces as (m, 3) vertex indices"""
+    vertices: np.ndarray
+    faces: np.ndarray
+
+    @property
+    def vertex_count(self) -> int:
+        return len(self.vertices)
+
+    @property
+    def face_count(self) -> int:
+        return len(self.faces)
+
+    @functools.cached_property
+    def invariants(self) -> 'MeshInvariants':
+        return compute_mesh_invariants(self)
+
+
+@dataclasses.dataclass(eq=False)
+class MeshInvariants:
+    vertex_count: int
+    face_count: int
+    bbox_min: np.ndarray
+    bbox_max: np.ndarray
+    centroid: np.ndarray
+    volume: float
+    area: float
+    # sum of the triangle perimeters, bounds how much the area may change when vertices move
+    perimeter: float
+
+
+def compute_mesh_invariants(mesh: Mesh) -> MeshInvariants:
+    if not mesh.vertex_count:
+        empty = np.zeros(3)
+        return MeshInvariants(0, mesh.face_count, empty, empty, empty, 0.0, 0.0, 0.0)
+
+    bbox_min = mesh.vertices.min(axis=0)
+    bbox_max = mesh.vertices.max(axis=0)
+    centroid = mesh.vertices.mean(axis=0)
+
+    volume = area = perimeter = 0.0
+    if mesh.face_count:
+        # relative to the bounding box, world coordinates are large enough to cancel out the volume terms
+        triangles = (mesh.vertices - bbox_min)[mesh.faces]
+        v0, v1, v2 = triangles[:, 0], triangles[:, 1], triangles[:, 2]
+        volume = float(np.einsum('ij,ij->i', v0, np.cross(v1, v2)).sum() / 6.0)
+        area = float(np.linalg.norm(np.cross(v1 - v0, v2 - v0), axis=1).sum() / 2.0)
+        perimeter = float((np.linalg.norm(v1 - v0, axis=1) +
+                           np.linalg.norm(v2 - v1, axis=1) +
+                           np.linalg.norm(v0 - v2, axis=1)).sum())
+
+    return MeshInvariants(mesh.vertex_count, mesh.face_count, bbox_min, bbox_max, centroid, volume, area, perimeter)
+
+
+@dataclasses.dataclass
+class InvariantComparisonResult:
+    equal: bool
+    invariant: Optional[str] = None
+    lhs_value: object = None
+    rhs_value: object = None
+
+    def describe(self) -> str:
+        return f"{self.invariant} {self.lhs_value} != {self.rhs_value}"
+
+
+def compare_mesh_invariants(lhs: MeshInvariants, rhs: MeshInvariants,
+                            tolerance: float = 1e-5) -> InvariantComparisonResult:
+    """
+    Compare the invariants of two meshes, cheapest first, and stop at the first one that differs.
+    Moving every vertex by at most tolerance changes the area by roughly tolerance * perimeter
+    and the volume by tolerance * area, these bounds are used for the two scalar invariants.
+    """
+    if lhs.vertex_count != rhs.vertex_count:
+        return InvariantComparisonResult(False, "vertex count", lhs.vertex_count, rhs.vertex_count)
+    if lhs.face_count != rhs.face_count:
+        return InvariantComparisonResult(False, "face count", lhs.face_count, rhs.face_count)
+
+    for name, lhs_value, rhs_value in (("bounding box min", lhs.bbox_min, rhs.bbox_min),
+                                       ("bounding box max", lhs.bbox_max, rhs.bbox_max),
+                                       ("centroid", lhs.centroid, rhs.centroid)):
+        if np.abs(lhs_value - rhs_value).max() > tolerance:
+            return InvariantComparisonResult(False, name, lhs_value.tolist(), rhs_value.tolist())
+
+    area_tolerance = 2 * tolerance * max(lhs.perimeter, rhs.perimeter) + tolerance
+    if abs(lhs.area - rhs.area) > area_tolerance:
+        return InvariantComparisonResult(False, "surface area", lhs.area, rhs.area)
+    volume_tolerance = 2 * tolerance * max(lhs.area, rhs.area) + tolerance
+    if abs(lhs.volume - rhs.volume) > volume_tolerance:
+        return InvariantComparisonResult(False, "volume", lhs.volume, rhs.volume)
+
+    return InvariantComparisonResult(True)
+
+
+def canonicalize_mesh(vertices: np.ndarray, faces: np.ndarray, tolerance: float = 1e-5) -> Mesh:
+    """
+    Bring a mesh into an order independent of the tessellation order: vertices sorted by their coordinates
+    quantized to the tolerance, every face rotated to start with its smallest vertex index (keeping the
+    orientation) and faces sorted by their vertex indices.
+    """
+    vertices = np.asarray(vertices, dtype=np.float64).reshape(-1, 3)
+    faces = np.asarray(faces, dtype=np.int64).reshape(-1, 3)
+
+    quantized = np.rint(vertices / tolerance)
+    order = np.lexsort((quantized[:, 2], quantized[:, 1], quantized[:, 0]))
+    vertices = vertices[order]
+    new_index = np.empty_like(order)
+    new_index[order] = np.arange(len(order))
+    return Mesh(vertices, _canonical_faces(new_index[faces]))
+
+
+def _canonical_faces(faces: np.ndarray) -> np.ndarray:
+    """Every face rotated to start with its smallest vertex index, faces sorted by their vertex indices"""
+    if not len(faces):
+        return faces
+    rotation = (np.argmin(faces, axis=1)[:, None] + np.arange(3)) % 3
+    faces = np.take_along_axis(faces, rotation, axis=1)
+    return faces[np.lexsort((faces[:, 2], faces[:, 1], faces[:, 0]))]
+
+
+def _match_vertices(lhs: np.ndarray, rhs: np.ndarray, tolerance: float) -> Optional[np.ndarray]:
+    """
+    For every vertex of rhs the index of its own vertex of lhs with no coordinate deviating by more than
+    tolerance, the closest one still free. None if a vertex of rhs has no such vertex. Vertices are looked up in
+    a grid of cells as large as the tolerance, a match lies in the same or a neighbouring cell.
+    """
+    cells = {}
+    for index, cell in enumerate(map(tuple, np.floor(lhs / tolerance).astype(np.int64).tolist())):
+        cells.setdefault(cell, []).append(index)
+    neighbours = [(dx, dy, dz) for dx in (-1, 0, 1) for dy in (-1, 0, 1) for dz in (-1, 0, 1)]
+
+    lhs_coordinates = lhs.tolist()
+    matched = [False] * len(lhs)
+    matching = np.empty(len(rhs), dtype=np.int64)
+    for rhs_index, ((x, y, z), vertex) in enumerate(zip(np.floor(rhs / tolerance).astype(np.int64).tolist(),
+                                                        rhs.tolist())):
+        best, best_deviation = None, tolerance
+        for dx, dy, dz in neighbours:
+            for index in cells.get((x + dx, y + dy, z + dz), ()):
+                if matched[index]:
+                    continue
+                deviation = max(abs(a - b) for a, b in zip(lhs_coordinates[index], vertex))
+                if deviation < best_deviation or (deviation == best_deviation and (best is None or index < best)):
+                    best, best_deviation = index, deviation
+        if best is None:
+            return None
+        matched[best] = True
+        matching[rhs_index] = best
+    return matching
+
+
+@dataclasses.dataclass
+class MeshComparisonResult:
+    equal: bool
+    vertex_counts: Tuple[int, int]
+    face_counts: Tuple[int, int]
+    differing_vertex_count: Optional[int] = None
+    max_deviation: Optional[float] = None
+    faces_equal: bool = False
+
+    def describe(self) -> str:
+        if self.vertex_counts[0] != self.vertex_counts[1]:
+            return f"vertex count {self.vertex_counts[0]} != {self.vertex_counts[1]}"
+        if self.differing_vertex_count:
+            return f"{self.differing_vertex_count} vertices differ, max deviation {self.max_deviation}"
+        if self.face_counts[0] != self.face_counts[1]:
+            return f"face count {self.face_counts[0]} != {self.face_counts[1]}"
+        return "face connectivity differs"
+
+
+def compare_meshes(lhs: Mesh, rhs: Mesh, tolerance: float = 1e-5) -> MeshComparisonResult:
+    """Compare two canonical meshes, a vertex differs if any of its coordinates deviates by more than tolerance"""
+    vertex_counts = (lhs.vertex_count, rhs.vertex_count)
+    face_counts = (lhs.face_count, rhs.face_count)
+    if vertex_counts[0] != vertex_counts[1]:
+        return MeshComparisonResult(False, vertex_counts, face_counts)
+
+    deviation = np.abs(lhs.vertices - rhs.vertices).max(axis=1) if vertex_counts[0] else np.zeros(0)
+    differing_vertex_count = int(np.count_nonzero(deviation > tolerance))
+    max_deviation = float(deviation.max()) if len(deviation) else 0.0
+    faces_equal = face_counts[0] == face_counts[1] and bool(np.array_equal(lhs.faces, rhs.faces))
+
+    if face_counts[0] == face_counts[1] and not (differing_vertex_count == 0 and faces_equal):
+        # vertices close to a quantization boundary may be sorted differently in the two meshes, pair them
+        # within the tolerance instead of by position and compare the faces through that pairing
+        matching = _match_vertices(lhs.vertices, rhs.vertices, tolerance)
+        if matching is not None and np.array_equal(lhs.faces, _canonical_faces(matching[rhs.faces])):
+            max_deviation = float(np.abs(lhs.vertices[matching] - rhs.vertices).max()) if len(matching) else 0.0
+            return MeshComparisonResult(True, vertex_counts, face_counts, 0, max_deviation, True)
+
+    return MeshComparisonResult(differing_vertex_count == 0 and faces_equal,
+                                vertex_counts,
+                                face_counts,
+                                differing_vertex_count,
+                                max_deviation,
+                                faces_equal)
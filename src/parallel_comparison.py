@@ -0,0 +1,93 @@
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from src.list_differences_collector import ListDifferencesCollector
+from src.profiling import NULL_PROFILER, Profiler
+
+logger = logging.getLogger(__name__)
+
+# result of comparing one shared GUID in a worker: (GUID, equal, differences reported while comparing)
+ShardResult = Tuple[str, bool, List]
+
+SHARDS_PER_JOB = 4
+
+_worker_comparator = None
+# set by the parent when it stops consuming results, workers then skip the rest of their shard
+_stop_event = None
+
+
+def split_into_shards(guids: Sequence[str], shard_count: int) -> List[List[str]]:
+    """Split GUIDs into at most shard_count contiguous shards of nearly equal size, keeping their order"""
+    shard_count = max(1, min(shard_count, len(guids)))
+    size, remainder = divmod(len(guids), shard_count)
+    shards = []
+    start = 0
+    for i in range(shard_count):
+        end = start + size + (1 if i < remainder else 0)
+        shards.append(list(guids[start:end]))
+        start = end
+    return [shard for shard in shards if shard]
+
+
+def _init_worker(comparator_type, file1_path: str, file2_path: str, settings: dict, stop_event):
+    # every worker opens both files itself, IFC models cannot be shared between processes
+    global _worker_comparator, _stop_event
+    _worker_comparator = comparator_type(file1_path, file2_path, ListDifferencesCollector())
+    _worker_comparator.apply_settings(settings)
+    _stop_event = stop_event
+
+
+def _compare_shard(guids: List[str]) -> Tuple[List[ShardResult], Optional[Dict]]:
+    comparator = _worker_comparator
+    comparator.collector.clear()
+    results = []
+    shared_results = comparator.compare_shared_elements(guids)
+    for guid, equal in shared_results:
+        results.append((guid, equal, list(comparator.collector.get_differences())))
+        comparator.collector.clear()
+        if _stop_event.is_set():
+            shared_results.close()
+            break
+    # the parent merges the profile of every shard, the next shard starts with an empty one
+    profile = comparator.profiler.to_dict() if comparator.profiler.enabled else None
+    comparator.profiler.reset()
+    return results, profile
+
+
+def compare_shared_elements(comparator_type,
+                            file1_path: str,
+                            file2_path: str,
+                            guids: Sequence[str],
+                            settings: dict,
+                            jobs: int,
+                            profiler: Profiler = NULL_PROFILER) -> Iterator[ShardResult]:
+    """
+    Compare the elements of both files with the given GUIDs in a pool of jobs worker processes,
+    each configured with the comparator settings.
+    Yields (GUID, equal, differences) in the order of guids as soon as the shard of a GUID is done.
+    The profiles of the workers, if the settings enable profiling, are merged into profiler.
+    Closing the generator cancels the shards not started yet and stops the running ones after their current element.
+    """
+    shards = split_into_shards(guids, jobs * SHARDS_PER_JOB)
+    logger.info(f"Comparing {len(guids)} elements in {len(shards)} shards with {jobs} processes")
+
+    stop_event = multiprocessing.Event()
+    with ProcessPoolExecutor(max_workers=jobs,
+                             initializer=_init_worker,
+                             initargs=(comparator_type, file1_path, file2_path, settings, stop_event)) as executor:
+        futures = [executor.submit(_compare_shard, shard) for shard in shards]
+        try:
+            for i, future in enumerate(futures):
+                results, profile = future.result()
+                if profile:
+                    profiler.merge(profile)
+                yield from results
+                # drop the finished shard, only shards still in flight are kept in memory
+                futures[i] = None
+        finally:
+            stop_event.set()
+            for future in futures:
+                if future is not None:
+                    future.cancel()
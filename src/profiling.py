@@ -0,0 +1,142 @@
+import heapq
+import json
+import time
+from typing import Dict, List, Optional, Tuple
+
+# calls and seconds of a timer
+TimerEntry = List[float]
+
+
+class _Timer:
+    __slots__ = ("profiler", "name", "entity_type", "start")
+
+    def __init__(self, profiler: 'Profiler', name: str, entity_type: Optional[str]):
+        self.profiler = profiler
+        self.name = name
+        self.entity_type = entity_type
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler.add_time(self.name, time.perf_counter() - self.start, self.entity_type)
+
+
+def _add_to(timers: Dict[str, TimerEntry], name: str, seconds: float, calls: int = 1):
+    entry = timers.get(name)
+    if entry is None:
+        timers[name] = [calls, seconds]
+    else:
+        entry[0] += calls
+        entry[1] += seconds
+
+
+def _timers_to_dict(timers: Dict[str, TimerEntry]) -> Dict[str, Dict]:
+    return {name: {"calls": calls, "seconds": seconds} for name, (calls, seconds) in timers.items()}
+
+
+class Profiler:
+    """
+    Named timers and counters of the phases of a comparison, with a breakdown per entity type and the slowest
+    elements. Timers are context managers: with profiler.timer("get_psets", entity_type): ...
+    """
+    enabled = True
+
+    def __init__(self, slowest_count: int = 20):
+        self.slowest_count = slowest_count
+        self.reset()
+
+    def reset(self):
+        self.timers: Dict[str, TimerEntry] = {}
+        self.counters: Dict[str, int] = {}
+        self.entity_types: Dict[str, Dict[str, TimerEntry]] = {}
+        # min-heap of (seconds, GUID, entity type), the fastest of the slowest elements is replaced first
+        self._slowest: List[Tuple[float, str, str]] = []
+
+    def timer(self, name: str, entity_type: Optional[str] = None) -> _Timer:
+        return _Timer(self, name, entity_type)
+
+    def add_time(self, name: str, seconds: float, entity_type: Optional[str] = None, calls: int = 1):
+        _add_to(self.timers, name, seconds, calls)
+        if entity_type is not None:
+            _add_to(self.entity_types.setdefault(entity_type, {}), name, seconds, calls)
+
+    def count(self, name: str, value: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def record_element(self, guid: str, entity_type: str, seconds: float):
+        """Time of the whole comparison of one element, the slowest_count slowest elements are kept"""
+        self.add_time("compare_elements", seconds, entity_type)
+        self._add_slowest(seconds, guid, entity_type)
+
+    def _add_slowest(self, seconds: float, guid: str, entity_type: str):
+        if len(self._slowest) < self.slowest_count:
+            heapq.heappush(self._slowest, (seconds, guid, entity_type))
+        elif self._slowest and seconds > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, (seconds, guid, entity_type))
+
+    def to_dict(self) -> Dict:
+        return {
+            "timers": _timers_to_dict(self.timers),
+            "counters": dict(self.counters),
+            "entity_types": {entity_type: _timers_to_dict(timers)
+                             for entity_type, timers in sorted(self.entity_types.items())},
+            "slowest_elements": [{"guid": guid, "entity_type": entity_type, "seconds": seconds}
+                                 for seconds, guid, entity_type in sorted(self._slowest, reverse=True)],
+        }
+
+    def merge(self, profile: Dict):
+        """Add a profile in the form of to_dict, e.g. of a worker process"""
+        for name, entry in profile["timers"].items():
+            _add_to(self.timers, name, entry["seconds"], entry["calls"])
+        for name, value in profile["counters"].items():
+            self.count(name, value)
+        for entity_type, timers in profile["entity_types"].items():
+            for name, entry in timers.items():
+                _add_to(self.entity_types.setdefault(entity_type, {}), name, entry["seconds"], entry["calls"])
+        for element in profile["slowest_elements"]:
+            self._add_slowest(element["seconds"], element["guid"], element["entity_type"])
+
+    def write(self, path: str):
+        with open(path, 'w') as json_file:
+            json.dump(self.to_dict(), json_file, indent=4)
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class NullProfiler(Profiler):
+    """Profiler that records nothing, the default of the comparators. Check enabled before costly arguments."""
+    enabled = False
+
+    def __init__(self):
+        super().__init__(0)
+
+    def timer(self, name: str, entity_type: Optional[str] = None) -> _NullTimer:
+        return _NULL_TIMER
+
+    def add_time(self, name: str, seconds: float, entity_type: Optional[str] = None, calls: int = 1):
+        pass
+
+    def count(self, name: str, value: int = 1):
+        pass
+
+    def record_element(self, guid: str, entity_type: str, seconds: float):
+        pass
+
+    def merge(self, profile: Dict):
+        pass
+
+
+NULL_PROFILER = NullProfiler()
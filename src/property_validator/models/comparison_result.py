@@ -36,34 +36,49 @@ class PropertyComparisonResult:
 
 
 class EntityComparisonResult:
-    def __init__(self, guid: str):
+    """
+    Results of one entity with counts per status, kept up to date by add_result and add_matches.
+    In compact mode only results that are not matches are kept, matches are only counted.
+    """
+
+    def __init__(self, guid: str, compact: bool = False):
         self.guid = guid
+        self.compact = compact
         self.property_results: List[PropertyComparisonResult] = []
+        # positions of the results that are not matches in property_results
+        self.mismatch_indices: List[int] = []
+        self.match_count = 0
+        self.mismatch_count = 0
+        self.missing_ifc_count = 0
+        self.missing_json_count = 0
 
     def add_result(self, result: PropertyComparisonResult):
+        status = result.status
+        if status is ComparisonStatus.MATCH:
+            self.match_count += 1
+            if self.compact:
+                return
+        else:
+            if status is ComparisonStatus.MISMATCH:
+                self.mismatch_count += 1
+            elif status is ComparisonStatus.MISSING_IFC:
+                self.missing_ifc_count += 1
+            else:
+                self.missing_json_count += 1
+            self.mismatch_indices.append(len(self.property_results))
         self.property_results.append(result)
 
-    @property
-    def has_mismatches(self) -> bool:
-        return any(r.status != ComparisonStatus.MATCH for r in self.property_results)
-
-    @property
-    def match_count(self) -> int:
-        return sum(1 for r in self.property_results if r.status == ComparisonStatus.MATCH)
+    def add_matches(self, count: int):
+        """Count matches without keeping a result for them"""
+        self.match_count += count
 
     @property
-    def mismatch_count(self) -> int:
-        return sum(1 for r in self.property_results if r.status == ComparisonStatus.MISMATCH)
+    def mismatch_results(self) -> List[PropertyComparisonResult]:
+        return [self.property_results[i] for i in self.mismatch_indices]
 
     @property
-    def missing_ifc_count(self) -> int:
-        return sum(1 for r in self.property_results
-                   if r.status == ComparisonStatus.MISSING_IFC)
-
-    @property
-    def missing_json_count(self) -> int:
-        return sum(1 for r in self.property_results
-                   if r.status == ComparisonStatus.MISSING_JSON)
+    def has_mismatches(self) -> bool:
+        return bool(self.mismatch_indices)
 
     def __str__(self):
         result = f"Entity: {self.guid}\n"
@@ -72,33 +87,51 @@ class EntityComparisonResult:
 
         if self.has_mismatches:
             result += "  Details:\n"
-            for prop_result in self.property_results:
-                if prop_result.status != ComparisonStatus.MATCH:
-                    result += f"    {prop_result}\n"
+            for prop_result in self.mismatch_results:
+                result += f"    {prop_result}\n"
 
         return result
 
 
 class ComparisonSummary:
-    def __init__(self):
+    """
+    Entity results with the number of entities with mismatches, entity results are added once complete.
+    In compact mode entities without mismatches are only counted, each entity must then be added once.
+    """
+
+    def __init__(self, compact: bool = False):
+        self.compact = compact
         self.entity_results: Dict[str, EntityComparisonResult] = {}
+        self._matched_entity_count = 0
+        self._mismatched_entity_count = 0
 
     def add_entity_result(self, entity_result: EntityComparisonResult):
+        replaced = self.entity_results.pop(entity_result.guid, None)
+        if replaced is not None:
+            if replaced.has_mismatches:
+                self._mismatched_entity_count -= 1
+            else:
+                self._matched_entity_count -= 1
+
+        if entity_result.has_mismatches:
+            self._mismatched_entity_count += 1
+        else:
+            self._matched_entity_count += 1
+            if self.compact:
+                return
         self.entity_results[entity_result.guid] = entity_result
 
     @property
     def entity_count(self) -> int:
-        return len(self.entity_results)
+        return self._matched_entity_count + self._mismatched_entity_count
 
     @property
     def matched_entity_count(self) -> int:
-        return sum(1 for result in self.entity_results.values()
-                   if not result.has_mismatches)
+        return self._matched_entity_count
 
     @property
     def mismatched_entity_count(self) -> int:
-        return sum(1 for result in self.entity_results.values()
-                   if result.has_mismatches)
+        return self._mismatched_entity_count
 
     def __str__(self):
         result = f"Comparison Summary:\n"
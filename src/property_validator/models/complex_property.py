@@ -1,9 +1,12 @@
-from typing import Dict, List, Optional, Union, Any
+from typing import Any, Dict, KeysView, List, Optional, Union
 
 
 class PropertyValue:
     """Represents a single property value (e.g., X, Y, Z coordinates)"""
 
+    # no instance dictionary, there is one of these for every X, Y and Z of every entity
+    __slots__ = ("name", "value", "unit")
+
     def __init__(self, name: str, value: Any, unit: Optional[str] = None):
         self.name = name
         self.value = value
@@ -22,23 +25,54 @@ class PropertyValue:
                 self.unit == other.unit)
 
 
+class _PropertyLayout:
+    """
+    Position of the last property of each name, shared by all complex properties whose properties have
+    the same names in the same order, e.g. every X, Y, Z point. Adding a property moves a complex property
+    on to the layout with the name appended, those transitions are cached.
+    """
+
+    __slots__ = ("index", "_extended")
+
+    def __init__(self, index: Dict[str, int]):
+        self.index = index
+        self._extended: Dict[str, '_PropertyLayout'] = {}
+
+    def extended(self, name: str, position: int) -> '_PropertyLayout':
+        layout = self._extended.get(name)
+        if layout is None:
+            layout = self._extended.setdefault(name, _PropertyLayout({**self.index, name: position}))
+        return layout
+
+
+_EMPTY_LAYOUT = _PropertyLayout({})
+
+
 class ComplexProperty:
     """Represents a complex IFC property with nested properties"""
 
+    __slots__ = ("name", "description", "properties", "_layout")
+
     def __init__(self, name: str, description: Optional[str] = None):
         self.name = name
         self.description = description
         self.properties: List[Union[PropertyValue, 'ComplexProperty']] = []
+        self._layout = _EMPTY_LAYOUT
 
     def add_property(self, prop: Union[PropertyValue, 'ComplexProperty']):
+        self._layout = self._layout.extended(prop.name, len(self.properties))
         self.properties.append(prop)
 
     def find_property_by_name(self, name: str) -> Optional[Union[PropertyValue, 'ComplexProperty']]:
         """Find a property by name (non-recursive search)"""
-        for prop in self.properties:
-            if prop.name == name:
-                return prop
-        return None
+        position = self._layout.index.get(name)
+        if position is None:
+            return None
+        return self.properties[position]
+
+    @property
+    def property_names(self) -> KeysView[str]:
+        return self._layout.index.keys()
 
     def to_dict(self) -> Dict:
         """Convert to dictionary representation"""
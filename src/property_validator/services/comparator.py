@@ -1,5 +1,9 @@
+import heapq
 import logging
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
 from ..models.complex_property import ComplexProperty, PropertyValue
 from ..models.comparison_result import (
     ComparisonStatus,
@@ -11,18 +15,54 @@ from ..models.comparison_result import (
 logger = logging.getLogger(__name__)
 
 
+class _AlignedValues:
+    """
+    Property values found at the same path on both sides, collected over a batch of entities.
+    Numbers go into columns compared with one array operation, other values are compared one by one.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.paths: List[str] = []
+        self.ifc_values: List = []
+        self.json_values: List = []
+        self.numeric_positions: List[int] = []
+        self.ifc_numbers: List = []
+        self.json_numbers: List = []
+        self.other_positions: List[int] = []
+        # per entity, results found while aligning the property trees with the number of values added before them
+        self.structural_results: List[List[Tuple[int, PropertyComparisonResult]]] = []
+
+    def add(self, path: str, ifc_value, json_value):
+        if isinstance(ifc_value, (int, float)) and isinstance(json_value, (int, float)):
+            self.numeric_positions.append(self.count)
+            self.ifc_numbers.append(ifc_value)
+            self.json_numbers.append(json_value)
+        else:
+            self.other_positions.append(self.count)
+        self.paths.append(path)
+        self.ifc_values.append(ifc_value)
+        self.json_values.append(json_value)
+        self.count += 1
+
+    def add_result(self, result: PropertyComparisonResult):
+        self.structural_results[-1].append((self.count, result))
+
+
 class PropertyComparator:
     """Compare complex properties from IFC and JSON"""
 
-    def __init__(self, float_tolerance: float = 0.001):
+    def __init__(self, float_tolerance: float = 0.001, compact: bool = False):
         self.float_tolerance = float_tolerance
+        # only count matches in the entity results
+        self.compact = compact
 
     def compare_entities(self,
                          entity_guid: str,
                          ifc_properties: Dict[str, ComplexProperty],
                          json_properties: Dict[str, ComplexProperty]) -> EntityComparisonResult:
 
-        result = EntityComparisonResult(entity_guid)
+        result = EntityComparisonResult(entity_guid, compact=self.compact)
 
         all_pset_names = set(ifc_properties.keys()) | set(json_properties.keys())
 
@@ -62,6 +102,149 @@ class PropertyComparator:
 
         return result
 
+    def compare_entities_batch(
+            self,
+            entities: Iterable[Tuple[str, Dict[str, ComplexProperty], Dict[str, ComplexProperty]]]
+    ) -> List[EntityComparisonResult]:
+        """
+        Compare the properties of many entities at once. Gives the same results as compare_entities,
+        except that matches are only counted, results are kept for mismatches and missing properties.
+        """
+        aligned = _AlignedValues()
+        guids = []
+        value_ends = []
+        for guid, ifc_properties, json_properties in entities:
+            guids.append(guid)
+            aligned.structural_results.append([])
+            self._align_entity(ifc_properties, json_properties, aligned)
+            value_ends.append(aligned.count)
+
+        mismatch_positions = self._mismatch_positions(aligned)
+        mismatch_ends = np.searchsorted(mismatch_positions, value_ends).tolist()
+
+        results = []
+        value_start = mismatch_start = 0
+        for guid, structural_results, value_end, mismatch_end in zip(
+                guids, aligned.structural_results, value_ends, mismatch_ends):
+            result = EntityComparisonResult(guid, compact=True)
+            mismatches = mismatch_positions[mismatch_start:mismatch_end].tolist()
+            result.add_matches(value_end - value_start - len(mismatches))
+            # results in the order compare_entities produces them, a structural result comes before the
+            # values added after it
+            ordered = heapq.merge(structural_results,
+                                  ((position, None) for position in mismatches),
+                                  key=lambda entry: entry[0])
+            for position, prop_result in ordered:
+                if prop_result is None:
+                    ifc_value = aligned.ifc_values[position]
+                    prop_result = PropertyComparisonResult(
+                        property_path=aligned.paths[position],
+                        status=ComparisonStatus.MISMATCH,
+                        ifc_value=ifc_value,
+                        json_value=aligned.json_values[position],
+                        tolerance=self.float_tolerance if isinstance(ifc_value, float) else None
+                    )
+                result.add_result(prop_result)
+            results.append(result)
+            value_start, mismatch_start = value_end, mismatch_end
+
+        return results
+
+    def _mismatch_positions(self, aligned: _AlignedValues) -> np.ndarray:
+        numeric_positions = np.array(aligned.numeric_positions, dtype=np.int64)
+        if aligned.numeric_positions:
+            deviation = np.abs(np.array(aligned.ifc_numbers, dtype=np.float64) -
+                               np.array(aligned.json_numbers, dtype=np.float64))
+            # written as a negation, NaN deviations are mismatches
+            numeric_positions = numeric_positions[~(deviation <= self.float_tolerance)]
+        other_positions = [position for position in aligned.other_positions
+                           if not self._values_equal(aligned.ifc_values[position], aligned.json_values[position])]
+        return np.sort(np.concatenate([numeric_positions, np.array(other_positions, dtype=np.int64)]))
+
+    def _align_entity(self,
+                      ifc_properties: Dict[str, ComplexProperty],
+                      json_properties: Dict[str, ComplexProperty],
+                      aligned: _AlignedValues):
+        all_pset_names = set(ifc_properties.keys()) | set(json_properties.keys())
+
+        for pset_name in all_pset_names:
+            if pset_name in ifc_properties and pset_name in json_properties:
+                self._align_complex_properties(ifc_properties[pset_name], json_properties[pset_name],
+                                               pset_name, aligned)
+            elif pset_name in ifc_properties:
+                aligned.add_result(
+                    PropertyComparisonResult(
+                        property_path=pset_name,
+                        status=ComparisonStatus.MISSING_JSON,
+                        ifc_value=str(ifc_properties[pset_name]),
+                        json_value=None
+                    )
+                )
+            else:
+                aligned.add_result(
+                    PropertyComparisonResult(
+                        property_path=pset_name,
+                        status=ComparisonStatus.MISSING_IFC,
+                        ifc_value=None,
+                        json_value=str(json_properties[pset_name])
+                    )
+                )
+
+    def _align_complex_properties(self,
+                                  ifc_cp: ComplexProperty,
+                                  json_cp: ComplexProperty,
+                                  property_path: str,
+                                  aligned: _AlignedValues):
+        """Walk both trees like _compare_complex_properties, values on both sides are added for comparison"""
+        if ifc_cp.name != json_cp.name:
+            aligned.add_result(
+                PropertyComparisonResult(
+                    property_path=f"{property_path}.name",
+                    status=ComparisonStatus.MISMATCH,
+                    ifc_value=ifc_cp.name,
+                    json_value=json_cp.name
+                )
+            )
+
+        all_prop_names = set(ifc_cp.property_names) | set(json_cp.property_names)
+
+        for prop_name in all_prop_names:
+            ifc_prop = ifc_cp.find_property_by_name(prop_name)
+            json_prop = json_cp.find_property_by_name(prop_name)
+            nested_path = f"{property_path}.{prop_name}"
+            if ifc_prop is not None and json_prop is not None:
+                if isinstance(ifc_prop, ComplexProperty) and isinstance(json_prop, ComplexProperty):
+                    self._align_complex_properties(ifc_prop, json_prop, nested_path, aligned)
+                elif isinstance(ifc_prop, PropertyValue) and isinstance(json_prop, PropertyValue):
+                    aligned.add(nested_path, ifc_prop.value, json_prop.value)
+                else:
+                    aligned.add_result(
+                        PropertyComparisonResult(
+                            property_path=nested_path,
+                            status=ComparisonStatus.MISMATCH,
+                            ifc_value=type(ifc_prop).__name__,
+                            json_value=type(json_prop).__name__
+                        )
+                    )
+            elif ifc_prop is not None:
+                aligned.add_result(
+                    PropertyComparisonResult(
+                        property_path=nested_path,
+                        status=ComparisonStatus.MISSING_JSON,
+                        ifc_value=ifc_prop.value if isinstance(ifc_prop, PropertyValue) else str(ifc_prop),
+                        json_value=None
+                    )
+                )
+            else:
+                aligned.add_result(
+                    PropertyComparisonResult(
+                        property_path=nested_path,
+                        status=ComparisonStatus.MISSING_IFC,
+                        ifc_value=None,
+                        json_value=json_prop.value if isinstance(json_prop, PropertyValue) else str(json_prop)
+                    )
+                )
+
     def _compare_complex_properties(self,
                                     ifc_cp: ComplexProperty,
                                     json_cp: ComplexProperty,
@@ -78,14 +261,12 @@ class PropertyComparator:
                 )
             )
 
-        ifc_props = {p.name: p for p in ifc_cp.properties}
-        json_props = {p.name: p for p in json_cp.properties}
-        all_prop_names = set(ifc_props.keys()) | set(json_props.keys())
+        all_prop_names = set(ifc_cp.property_names) | set(json_cp.property_names)
 
         for prop_name in all_prop_names:
-            if prop_name in ifc_props and prop_name in json_props:
-                ifc_prop = ifc_props[prop_name]
-                json_prop = json_props[prop_name]
+            ifc_prop = ifc_cp.find_property_by_name(prop_name)
+            json_prop = json_cp.find_property_by_name(prop_name)
+            if ifc_prop is not None and json_prop is not None:
 
                 if isinstance(ifc_prop, ComplexProperty) and isinstance(json_prop, ComplexProperty):
                     nested_results = self._compare_complex_properties(
@@ -125,8 +306,7 @@ class PropertyComparator:
                         )
                     )
 
-            elif prop_name in ifc_props:
-                ifc_prop = ifc_props[prop_name]
+            elif ifc_prop is not None:
                 results.append(
                     PropertyComparisonResult(
                         property_path=f"{property_path}.{prop_name}",
@@ -138,7 +318,6 @@ class PropertyComparator:
 
             else:  # prop_name in json_props
                 # Property in JSON but not in IFC
-                json_prop = json_props[prop_name]
                 results.append(
                     PropertyComparisonResult(
                         property_path=f"{property_path}.{prop_name}",
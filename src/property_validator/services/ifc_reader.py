@@ -1,5 +1,6 @@
 import ifcopenshell
-from typing import Dict, List, Optional, Tuple
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
 import logging
 from ..models.complex_property import ComplexProperty, PropertyValue
 
@@ -13,6 +14,35 @@ class IfcReader:
         self.ifc_file_path = ifc_file_path
         self.ifc_file = ifcopenshell.open(ifc_file_path)
         logger.info(f"Loaded IFC file: {ifc_file_path}")
+        # built on first use by _build_property_index
+        self._property_definitions_by_entity: Optional[Dict[int, List]] = None
+        self._entities_by_pset: Optional[Dict[int, List]] = None
+        self._pset_has_complex_properties: Optional[Dict[int, bool]] = None
+
+    def _build_property_index(self):
+        """
+        Index the IfcRelDefinesByProperties in one pass: entity id -> property definitions defining it and
+        pset id -> entities it defines, both in relationship order, and pset id -> has complex properties.
+        """
+        if self._property_definitions_by_entity is not None:
+            return
+        definitions_by_entity = defaultdict(list)
+        entities_by_pset = defaultdict(list)
+        for rel in self.ifc_file.by_type("IfcRelDefinesByProperties"):
+            definition = rel.RelatingPropertyDefinition
+            # IFC4 also allows a set of psets here, which is not looked into
+            if not isinstance(definition, ifcopenshell.entity_instance):
+                continue
+            entities_by_pset[definition.id()].extend(rel.RelatedObjects)
+            for entity in rel.RelatedObjects:
+                definitions_by_entity[entity.id()].append(definition)
+
+        self._pset_has_complex_properties = {
+            pset.id(): any(prop.is_a("IfcComplexProperty") for prop in pset.HasProperties)
+            for pset in self.ifc_file.by_type("IfcPropertySet")
+        }
+        self._property_definitions_by_entity = dict(definitions_by_entity)
+        self._entities_by_pset = dict(entities_by_pset)
 
     def get_entity_guids(self) -> List[str]:
         guids = []
@@ -21,53 +51,109 @@ class IfcReader:
         return guids
 
     def get_entities_with_complex_properties(self) -> List[Tuple[str, str]]:
+        self._build_property_index()
         results = []
         entity_guids = set()
 
-        all_psets = self.ifc_file.by_type("IfcPropertySet")
-        for pset in all_psets:
-            for prop in pset.HasProperties:
-                if prop.is_a("IfcComplexProperty"):
-                    for rel in self.ifc_file.by_type("IfcRelDefinesByProperties"):
-                        if rel.RelatingPropertyDefinition == pset:
-                            for entity in rel.RelatedObjects:
-                                if hasattr(entity, 'GlobalId'):
-                                    guid = entity.GlobalId
-                                    entity_type = entity.is_a()
-                                    if guid not in entity_guids:
-                                        results.append((guid, entity_type))
-                                        entity_guids.add(guid)
+        for pset in self.ifc_file.by_type("IfcPropertySet"):
+            if not self._pset_has_complex_properties[pset.id()]:
+                continue
+            for entity in self._entities_by_pset.get(pset.id(), []):
+                if hasattr(entity, 'GlobalId'):
+                    guid = entity.GlobalId
+                    entity_type = entity.is_a()
+                    if guid not in entity_guids:
+                        results.append((guid, entity_type))
+                        entity_guids.add(guid)
 
         return results
 
     def get_complex_properties_by_guid(self, entity_guid: str) -> Dict[str, ComplexProperty]:
+        self._build_property_index()
         result = {}
-        entity = self.ifc_file.by_guid(entity_guid)
+        try:
+            entity = self.ifc_file.by_guid(entity_guid)
+        except RuntimeError:
+            # raised instead of returning None by recent ifcopenshell versions
+            entity = None
 
         if not entity:
             logger.warning(f"Entity with GUID {entity_guid} not found")
             return {}
 
-        for rel in self.ifc_file.by_type("IfcRelDefinesByProperties"):
-            if entity in rel.RelatedObjects:
-                pset = rel.RelatingPropertyDefinition
-
-                if not pset.is_a("IfcPropertySet"):
-                    continue
+        for pset in self._property_definitions_by_entity.get(entity.id(), []):
+            if not pset.is_a("IfcPropertySet") or not self._pset_has_complex_properties[pset.id()]:
+                continue
 
-                for prop in pset.HasProperties:
-                    if prop.is_a("IfcComplexProperty"):
-                        cp = self._process_complex_property(prop)
-                        result[f"{pset.Name}.{prop.Name}"] = cp
+            for prop in pset.HasProperties:
+                if prop.is_a("IfcComplexProperty"):
+                    cp = self._process_complex_property(prop)
+                    result[f"{pset.Name}.{prop.Name}"] = cp
 
         return result
 
-    def _process_complex_property(self, ifc_complex_prop) -> ComplexProperty:
+    def get_all_complex_properties(
+            self, entity_guids: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, ComplexProperty]]:
+        """
+        Complex properties of all entities in one walk over the index, or of the entities with the given GUIDs
+        looked up directly.
+        Returns: {GUID: {property_set_name.property_name: ComplexProperty}} for the entities that have any.
+        Every IfcComplexProperty is processed once, entities sharing a pset share its ComplexProperty objects.
+        """
+        self._build_property_index()
+        if entity_guids is None:
+            entities = ((self.ifc_file.by_id(entity_id), definitions)
+                        for entity_id, definitions in self._property_definitions_by_entity.items())
+        else:
+            entities = self._entities_with_definitions(dict.fromkeys(entity_guids))
+        processed: Dict[int, ComplexProperty] = {}
+        properties_by_pset: Dict[int, Dict[str, ComplexProperty]] = {}
+        results = {}
+
+        for entity, definitions in entities:
+            result = {}
+            for pset in definitions:
+                if not pset.is_a("IfcPropertySet") or not self._pset_has_complex_properties[pset.id()]:
+                    continue
+                pset_properties = properties_by_pset.get(pset.id())
+                if pset_properties is None:
+                    pset_properties = properties_by_pset[pset.id()] = {
+                        f"{pset.Name}.{prop.Name}": self._process_complex_property(prop, processed)
+                        for prop in pset.HasProperties if prop.is_a("IfcComplexProperty")
+                    }
+                result.update(pset_properties)
+            if result:
+                results[entity.GlobalId] = result
+
+        logger.info(f"Extracted {len(processed)} complex properties of {len(results)} entities")
+        return results
+
+    def _entities_with_definitions(self, entity_guids: Iterable[str]):
+        """The entities with the given GUIDs and their property definitions, looked up directly in the index"""
+        for entity_guid in entity_guids:
+            try:
+                entity = self.ifc_file.by_guid(entity_guid)
+            except RuntimeError:
+                entity = None
+            if not entity:
+                logger.warning(f"Entity with GUID {entity_guid} not found")
+                continue
+            yield entity, self._property_definitions_by_entity.get(entity.id(), [])
+
+    def _process_complex_property(self, ifc_complex_prop,
+                                  processed: Optional[Dict[int, ComplexProperty]] = None) -> ComplexProperty:
+        if processed is not None:
+            cp = processed.get(ifc_complex_prop.id())
+            if cp is not None:
+                return cp
+
         cp = ComplexProperty(ifc_complex_prop.Name, ifc_complex_prop.Description)
+        if processed is not None:
+            processed[ifc_complex_prop.id()] = cp
 
         for nested_prop in ifc_complex_prop.HasProperties:
             if nested_prop.is_a("IfcComplexProperty"):
-                nested_cp = self._process_complex_property(nested_prop)
+                nested_cp = self._process_complex_property(nested_prop, processed)
                 cp.add_property(nested_cp)
             elif nested_prop.is_a("IfcPropertySingleValue"):
                 name = nested_prop.Name
@@ -1,7 +1,7 @@
 import json
 import logging
 import os
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterator, List, Optional, Any, Tuple
 from ..models.complex_property import ComplexProperty, PropertyValue
 
 logger = logging.getLogger(__name__)
@@ -37,16 +37,30 @@ class JsonReader:
         """Get list of entity GUIDs in the JSON file"""
         return list(self.data.keys())
 
+    def close(self):
+        """Release the file held by streaming readers, the data of this reader is already in memory"""
+        pass
+
+    def _get_entity_data(self, entity_guid: str) -> Any:
+        """Raw JSON data of an entity, raises KeyError if the GUID is not in the file"""
+        return self.data[entity_guid]
+
+    def iter_complex_properties(self) -> Iterator[Tuple[str, Dict[str, ComplexProperty]]]:
+        """Complex properties of every entity in file order, as (GUID, get_complex_properties_by_guid(GUID))"""
+        for entity_guid in self.get_entities():
+            yield entity_guid, self.get_complex_properties_by_guid(entity_guid)
+
     def get_complex_properties_by_guid(self, entity_guid: str) -> Dict[str, ComplexProperty]:
         """
         Get all complex properties for an entity with the given GUID
         Returns: Dictionary of {property_set_name.property_name: ComplexProperty}
         """
-        if entity_guid not in self.data:
+        try:
+            entity_data = self._get_entity_data(entity_guid)
+        except KeyError:
             logger.warning(f"Entity with GUID {entity_guid} not found in JSON")
             return {}
 
-        entity_data = self.data[entity_guid]
         result = {}
 
         # Handle different JSON formats
@@ -0,0 +1,88 @@
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Sequence
+
+from src.parallel_comparison import SHARDS_PER_JOB, split_into_shards
+from ..models.comparison_result import EntityComparisonResult
+from .comparator import PropertyComparator
+from .ifc_reader import IfcReader
+from .json_reader import JsonReader
+
+logger = logging.getLogger(__name__)
+
+# entities compared together in batch mode
+BATCH_SIZE = 1024
+
+_worker_ifc_reader = None
+_worker_json_reader = None
+_worker_comparator = None
+_worker_batch = False
+
+
+def compare_chunk(ifc_reader: IfcReader,
+                  json_reader: JsonReader,
+                  comparator: PropertyComparator,
+                  guids: Sequence[str],
+                  batch: bool = False) -> Iterator[EntityComparisonResult]:
+    """Compare the complex properties of the entities with the given GUIDs, results are yielded in the order of guids"""
+    # shared psets are processed once for all entities of the chunk
+    all_ifc_properties = ifc_reader.get_all_complex_properties(guids)
+
+    entities = []
+    for guid in guids:
+        ifc_properties = all_ifc_properties.get(guid, {})
+        json_properties = json_reader.get_complex_properties_by_guid(guid)
+
+        if batch:
+            entities.append((guid, ifc_properties, json_properties))
+            if len(entities) == BATCH_SIZE:
+                yield from comparator.compare_entities_batch(entities)
+                entities = []
+        else:
+            yield comparator.compare_entities(guid, ifc_properties, json_properties)
+
+    if batch and entities:
+        yield from comparator.compare_entities_batch(entities)
+
+
+def _init_worker(ifc_path: str, json_path: str, json_reader_type, tolerance: float, compact: bool, batch: bool):
+    # every worker reads both files itself, the IFC model cannot be shared between processes
+    global _worker_ifc_reader, _worker_json_reader, _worker_comparator, _worker_batch
+    _worker_ifc_reader = IfcReader(ifc_path)
+    _worker_json_reader = json_reader_type(json_path)
+    _worker_comparator = PropertyComparator(float_tolerance=tolerance, compact=compact)
+    _worker_batch = batch
+
+
+def _compare_chunk_in_worker(guids: List[str]) -> List[EntityComparisonResult]:
+    return list(compare_chunk(_worker_ifc_reader, _worker_json_reader, _worker_comparator, guids, _worker_batch))
+
+
+def compare_chunks_in_parallel(ifc_path: str,
+                               json_path: str,
+                               guids: Sequence[str],
+                               jobs: int,
+                               json_reader_type=JsonReader,
+                               tolerance: float = 0.001,
+                               compact: bool = False,
+                               batch: bool = False) -> Iterator[EntityComparisonResult]:
+    """
+    Compare the entities with the given GUIDs in a pool of jobs worker processes, each with its own readers.
+    Yields the entity results in the order of guids as soon as the chunk of a GUID is done.
+    """
+    chunks = split_into_shards(guids, jobs * SHARDS_PER_JOB)
+    logger.info(f"Comparing {len(guids)} entities in {len(chunks)} chunks with {jobs} processes")
+
+    with ProcessPoolExecutor(max_workers=jobs,
+                             initializer=_init_worker,
+                             initargs=(ifc_path, json_path, json_reader_type, tolerance, compact, batch)) as executor:
+        futures = [executor.submit(_compare_chunk_in_worker, chunk) for chunk in chunks]
+        try:
+            for i, future in enumerate(futures):
+                yield from future.result()
+                # drop the finished chunk, only chunks still in flight are kept in memory
+                futures[i] = None
+        finally:
+            for future in futures:
+                if future is not None:
+                    future.cancel()
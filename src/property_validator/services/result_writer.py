@@ -0,0 +1,128 @@
+import json
+from abc import ABC, abstractmethod
+from enum import Enum
+from typing import Dict
+
+from ..models.comparison_result import EntityComparisonResult
+
+
+class OutputFormat(Enum):
+    # one indented JSON document with the totals first, written once all entities are compared
+    JSON = "json"
+    # one JSON line per entity as soon as it is compared, a line with the totals last
+    JSONL = "jsonl"
+    # one JSON document without indentation written entity by entity, the totals follow the entities
+    COMPACT_JSON = "compact-json"
+
+
+def entity_result_to_dict(entity_result: EntityComparisonResult, show_matches: bool = False) -> Dict:
+    prop_results = entity_result.property_results if show_matches else entity_result.mismatch_results
+    return {
+        "match_count": entity_result.match_count,
+        "mismatch_count": entity_result.mismatch_count,
+        "missing_ifc_count": entity_result.missing_ifc_count,
+        "missing_json_count": entity_result.missing_json_count,
+        "property_results": [{
+            "property_path": prop_result.property_path,
+            "status": prop_result.status.value,
+            "ifc_value": str(prop_result.ifc_value) if prop_result.ifc_value is not None else None,
+            "json_value": str(prop_result.json_value) if prop_result.json_value is not None else None,
+            "tolerance": prop_result.tolerance
+        } for prop_result in prop_results]
+    }
+
+
+class ResultWriter(ABC):
+    """
+    Writes the entity results to output_path as they are added, with running totals.
+    finish writes the totals and closes the file, close alone leaves a partial report behind.
+    """
+
+    def __init__(self, output_path: str, show_matches: bool = False):
+        self.output_path = output_path
+        self.show_matches = show_matches
+        self.entity_count = 0
+        self.mismatched_entity_count = 0
+        self.file = open(output_path, 'w', encoding='utf-8')
+
+    def write(self, entity_result: EntityComparisonResult):
+        self.entity_count += 1
+        if entity_result.has_mismatches:
+            self.mismatched_entity_count += 1
+        self._write_entity(entity_result.guid, entity_result_to_dict(entity_result, self.show_matches))
+
+    @property
+    def totals(self) -> Dict:
+        return {
+            "entity_count": self.entity_count,
+            "matched_entities": self.entity_count - self.mismatched_entity_count,
+            "mismatched_entities": self.mismatched_entity_count
+        }
+
+    @abstractmethod
+    def _write_entity(self, guid: str, entity_data: Dict):
+        pass
+
+    def finish(self):
+        self.close()
+
+    def close(self):
+        self.file.close()
+
+
+class JsonResultWriter(ResultWriter):
+    """Keeps the entities in memory, the totals come first in the document"""
+
+    def __init__(self, output_path: str, show_matches: bool = False):
+        super().__init__(output_path, show_matches)
+        self.entities: Dict[str, Dict] = {}
+
+    def _write_entity(self, guid: str, entity_data: Dict):
+        self.entities[guid] = entity_data
+
+    def finish(self):
+        json.dump({**self.totals, "entities": self.entities}, self.file, indent=2)
+        self.close()
+
+
+class JsonlResultWriter(ResultWriter):
+    def _write_entity(self, guid: str, entity_data: Dict):
+        self.file.write(json.dumps({"guid": guid, **entity_data}))
+        self.file.write("\n")
+        # a report of a run that is killed ends with the last entity compared
+        self.file.flush()
+
+    def finish(self):
+        self.file.write(json.dumps({"totals": self.totals}))
+        self.file.write("\n")
+        self.close()
+
+
+class CompactJsonResultWriter(ResultWriter):
+    def __init__(self, output_path: str, show_matches: bool = False):
+        super().__init__(output_path, show_matches)
+        self.file.write('{"entities": {')
+
+    def _write_entity(self, guid: str, entity_data: Dict):
+        if self.entity_count > 1:
+            self.file.write(", ")
+        self.file.write(f"{json.dumps(guid)}: {json.dumps(entity_data)}")
+        self.file.flush()
+
+    def finish(self):
+        totals = json.dumps(self.totals)
+        # the totals are added to the document object after the entities
+        self.file.write(f"}}, {totals[1:]}")
+        self.close()
+
+
+def create_result_writer(output_format: OutputFormat, output_path: str, show_matches: bool = False) -> ResultWriter:
+    match output_format:
+        case OutputFormat.JSON:
+            return JsonResultWriter(output_path, show_matches)
+        case OutputFormat.JSONL:
+            return JsonlResultWriter(output_path, show_matches)
+        case OutputFormat.COMPACT_JSON:
+            return CompactJsonResultWriter(output_path, show_matches)
+        case _:
+            raise ValueError(f"Unknown output format: {output_format}")
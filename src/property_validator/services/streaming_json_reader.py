@@ -0,0 +1,132 @@
+import json
+import logging
+import mmap
+import re
+from typing import Any, Dict, List, Tuple
+
+from .json_reader import JsonReader
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(rb'[ \t\n\r]*')
+_STRING = re.compile(rb'"(?:[^"\\]|\\.)*"', re.DOTALL)
+_SCALAR = re.compile(rb'[^,}\]\s]+')
+# the next bracket outside of a string that does not belong to an innermost object or array, e.g. {"value": 1.0};
+# strings and innermost values in between are skipped by the regular expression engine, possessive quantifiers
+# keep it from backtracking
+_FLAT = rb'(?:[^"{}\[\]]++|"(?:[^"\\]|\\.)*+")*+'
+_NEXT_BRACKET = re.compile(rb'(?:[^"{}\[\]]++|"(?:[^"\\]|\\.)*+"|\{' + _FLAT + rb'\}|\[' + _FLAT + rb'\])*+([{}\[\]])',
+                           re.DOTALL)
+
+
+class StreamingJsonReader(JsonReader):
+    """
+    Reads the same reference files as JsonReader without loading them.
+
+    One scan over the memory-mapped file records the byte range of every top-level GUID entry, in both the
+    {guid: data} and the [{guid: data}, ...] format. The data of an entity is only parsed when it is asked for,
+    so memory stays bounded by the index and the entities being compared.
+    """
+
+    def __init__(self, json_file_path: str):
+        self.json_file_path = json_file_path
+        self.data = {}
+        # GUID -> (start, end) of its data in the file, in file order
+        self.offsets: Dict[str, Tuple[int, int]] = {}
+        self._file = None
+        self._map = None
+
+        try:
+            self._file = open(json_file_path, 'rb')
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._index()
+            logger.info(f"Indexed JSON file: {json_file_path}")
+            logger.info(f"Found {len(self.offsets)} entities in JSON")
+        except Exception as e:
+            logger.error(f"Failed to index JSON file: {str(e)}")
+            self.offsets = {}
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+        if self._file is not None:
+            self._file.close()
+
+    def get_entities(self) -> List[str]:
+        return list(self.offsets.keys())
+
+    def _get_entity_data(self, entity_guid: str) -> Any:
+        start, end = self.offsets[entity_guid]
+        return json.loads(self._map[start:end])
+
+    def _index(self):
+        data = self._map
+        pos = self._skip_whitespace(0)
+        if pos >= len(data):
+            raise ValueError("Empty JSON file")
+        if data[pos:pos + 1] == b'{':
+            self._index_object(pos)
+        elif data[pos:pos + 1] == b'[':
+            pos = self._skip_whitespace(pos + 1)
+            while data[pos:pos + 1] != b']':
+                if data[pos:pos + 1] == b'{':
+                    pos = self._index_object(pos)
+                else:
+                    # like JsonReader, items that are no objects are ignored
+                    pos = self._skip_value(pos)
+                pos = self._skip_separator(pos, b']')
+        else:
+            logger.error(f"Unsupported JSON format in {self.json_file_path}")
+
+    def _index_object(self, pos: int) -> int:
+        """Record the GUID entries of the object starting at pos, returns the position after it"""
+        data = self._map
+        pos = self._skip_whitespace(pos + 1)
+        while data[pos:pos + 1] != b'}':
+            key = _STRING.match(data, pos)
+            if not key:
+                raise ValueError(f"Expected a GUID string at byte {pos}")
+            pos = self._skip_whitespace(key.end())
+            if data[pos:pos + 1] != b':':
+                raise ValueError(f"Expected ':' at byte {pos}")
+            start = self._skip_whitespace(pos + 1)
+            end = self._skip_value(start)
+            # a repeated GUID keeps its first position and its last data, like a dict built by json.load
+            self.offsets[json.loads(key.group())] = (start, end)
+            pos = self._skip_separator(end, b'}')
+        return pos + 1
+
+    def _skip_value(self, pos: int) -> int:
+        data = self._map
+        first = data[pos:pos + 1]
+        if first == b'"':
+            return _STRING.match(data, pos).end()
+        if first not in (b'{', b'['):
+            scalar = _SCALAR.match(data, pos)
+            if not scalar:
+                raise ValueError(f"Expected a value at byte {pos}")
+            return scalar.end()
+
+        # the opening bracket is counted here, the pattern would skip a value without nested brackets as a whole
+        depth = 1
+        pos += 1
+        while True:
+            match = _NEXT_BRACKET.match(data, pos)
+            if not match:
+                raise ValueError("Unexpected end of JSON file")
+            depth += 1 if match.group(1) in (b'{', b'[') else -1
+            pos = match.end()
+            if depth == 0:
+                return pos
+
+    def _skip_whitespace(self, pos: int) -> int:
+        return _WHITESPACE.match(self._map, pos).end()
+
+    def _skip_separator(self, pos: int, closing: bytes) -> int:
+        pos = self._skip_whitespace(pos)
+        separator = self._map[pos:pos + 1]
+        if separator == b',':
+            return self._skip_whitespace(pos + 1)
+        if separator != closing:
+            raise ValueError(f"Expected ',' or '{closing.decode()}' at byte {pos}")
+        return pos
@@ -0,0 +1,76 @@
+import logging
+from typing import Dict, Iterable
+
+from src.baseline_snapshot import SnapshotElement, read_snapshot
+from src.concurrent_loading import load_concurrently
+from src.geometry_extraction import extract_geometries
+from src.ifc_comparator import IFCComparator, EntityExtractors, NO_GEOMETRY
+from src.entity_fingerprint import fingerprint_entity
+
+logger = logging.getLogger(__name__)
+
+
+class SnapshotComparator(IFCComparator):
+    """
+    Compares a baseline snapshot, see baseline_snapshot.create_snapshot, with an IFC file.
+    The baseline IFC file is not opened, its elements, attributes and geometry are read from the snapshot.
+    """
+
+    def open_files(self):
+        snapshot, new_file = load_concurrently([(self.file1_path, lambda: read_snapshot(self.file1_path)),
+                                                (self.file2_path, lambda: self.load_file(self.file2_path))])
+        self.snapshot = snapshot.value
+        self.file1 = None
+        self.file2, self.new_file_entities = new_file.value
+        self.old_file_entities = self.snapshot.elements
+        self.load_timings = {"old": snapshot.seconds, "new": new_file.seconds}
+        logger.info(f"Opened snapshot {self.file1_path} in {snapshot.seconds:.2f} s "
+                    f"and file {self.file2_path} in {new_file.seconds:.2f} s")
+        # nested attribute dictionaries of the snapshot with the extra attributes to ignore removed, by id
+        self.stripped_attributes: Dict[int, dict] = {}
+
+    def extractors_for(self, attributes_to_ignore):
+        if self.new_file_extractors and self.new_file_extractors.attributes.ignore == attributes_to_ignore:
+            return
+        if not self.snapshot.ignore <= attributes_to_ignore:
+            missing = sorted(self.snapshot.ignore - attributes_to_ignore)
+            raise ValueError(f"The snapshot was taken ignoring {missing}, these attributes must be ignored as well")
+        self.new_file_extractors = EntityExtractors(self.file2, attributes_to_ignore)
+        self.stripped_attributes.clear()
+
+    def old_element_data(self, entity: SnapshotElement, attributes_to_ignore):
+        extra_keys = attributes_to_ignore - self.snapshot.ignore
+        attributes = {key: self.strip_keys(value, extra_keys) for key, value in entity.attributes.items()
+                      if key not in extra_keys}
+        attributes["Properties"] = entity.properties
+        if entity.is_a("IfcBuildingElement"):
+            attributes["Materials"] = entity.materials
+        return attributes, entity.geometry if entity.has_geometry else NO_GEOMETRY
+
+    def strip_keys(self, value, keys: Iterable[str]):
+        """Remove the keys from the nested dictionaries, like get_info with ignore; shared dictionaries stay shared"""
+        if isinstance(value, dict):
+            stripped = self.stripped_attributes.get(id(value))
+            if stripped is None:
+                stripped = {key: self.strip_keys(item, keys) for key, item in value.items() if key not in keys}
+                self.stripped_attributes[id(value)] = stripped
+            return stripped
+        if isinstance(value, tuple):
+            return tuple(self.strip_keys(item, keys) for item in value)
+        return value
+
+    def old_element_fingerprint(self, entity: SnapshotElement, attributes: dict):
+        # the stored fingerprint only holds for the attributes and tolerance the snapshot was taken with
+        ignore = self.new_file_extractors.attributes.ignore
+        if self.snapshot.tolerance == self.TOLERANCE and self.snapshot.ignore == ignore:
+            return entity.fingerprint
+        return fingerprint_entity(attributes, self.TOLERANCE)
+
+    def prepare_geometries(self, guids: Iterable[str]):
+        """Tessellate the building elements of the IFC file, the baseline geometry is part of the snapshot"""
+        guids = list(guids)
+        with self.profiler.timer("tessellation"):
+            self.new_file_geometries = extract_geometries(
+                self.file2, self.building_elements(self.new_file_entities, guids), self.geometry_threads,
+                self.geometry_cache, self.geometry_cache_namespace(self.file2_path), self.TOLERANCE)
+        self.profiler.count("tessellated elements", len(self.new_file_geometries))
@@ -0,0 +1,50 @@
+import gzip
+import json
+from typing import List
+
+from src.interfaces.differences_collector import DifferencesCollector
+
+
+class StreamingDifferencesCollector(DifferencesCollector):
+    """
+    Writes every difference as one JSON line to output_path, optionally gzip compressed.
+    Only the number of differences and the first sample_size of them are kept in memory.
+    """
+
+    def __init__(self, output_path: str, compress: bool = False, sample_size: int = 100):
+        self.output_path = output_path
+        self.compress = compress
+        self.sample_size = sample_size
+        self.difference_count = 0
+        self.sample: List[list] = []
+        self.file = self._open()
+
+    def _open(self):
+        if self.compress:
+            return gzip.open(self.output_path, 'wt', encoding='utf-8')
+        return open(self.output_path, 'w', encoding='utf-8')
+
+    def add_difference(self, title, val1, val2):
+        difference = [title, val1, val2]
+        self.file.write(json.dumps(difference, default=str))
+        self.file.write("\n")
+        self.difference_count += 1
+        if len(self.sample) < self.sample_size:
+            self.sample.append(difference)
+
+    def get_differences(self):
+        return self.sample
+
+    def write_trailer(self, data: dict):
+        """Write a final JSON object line, e.g. a marker for a truncated report, distinct from the difference lines"""
+        self.file.write(json.dumps(data))
+        self.file.write("\n")
+
+    def clear(self):
+        self.file.close()
+        self.file = self._open()
+        self.difference_count = 0
+        self.sample.clear()
+
+    def close(self):
+        self.file.close()
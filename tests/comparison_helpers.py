@@ -0,0 +1,16 @@
+import os
+
+from src.file_comparator_factory_impl import IfcFileComparatorFactoryImpl
+from src.interfaces.file_comparator_factory import FileType
+from src.list_differences_collector import ListDifferencesCollector
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def create_test_file_comparator(jobs: int = 1):
+    """Comparator of old.ifc and new.ifc with the given number of jobs and the ListDifferencesCollector it uses"""
+    factory = IfcFileComparatorFactoryImpl(os.path.join(TESTS_DIR, 'old.ifc'), os.path.join(TESTS_DIR, 'new.ifc'))
+    collector = ListDifferencesCollector()
+    comparator = factory.create(FileType.IFC, collector)
+    comparator.set_jobs(jobs)
+    return comparator, collector
@@ -0,0 +1,57 @@
+import os
+import unittest
+
+import ifcopenshell
+
+from src.attribute_extraction import AttributeExtractor, SharedSubgraphMemo
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class TestAttributeExtractor(unittest.TestCase):
+    def setUp(self):
+        self.model = ifcopenshell.open(os.path.join(TESTS_DIR, 'old.ifc'))
+        self.ignore = {"OwnerHistory"}
+        self.extractor = AttributeExtractor(self.model, self.ignore)
+
+    def test_equal_to_recursive_get_info(self):
+        for instance in self.model:
+            expected = instance.get_info(recursive=True, include_identifier=False, ignore=self.ignore)
+            self.assertEqual(self.extractor.get_info(instance), expected)
+
+    def test_shared_instances_are_converted_once(self):
+        member1, member2 = self.model.by_type("IfcMember")
+        context1 = self.extractor.get_info(member1)["Representation"]["Representations"][0]["ContextOfItems"]
+        context2 = self.extractor.get_info(member2)["Representation"]["Representations"][0]["ContextOfItems"]
+        self.assertIs(context1, context2)
+        self.assertTrue(self.extractor.is_shared(context1))
+
+    def test_top_level_dictionary_is_fresh(self):
+        member = self.model.by_type("IfcMember")[0]
+        info = self.extractor.get_info(member)
+        info["Properties"] = {}
+        self.assertNotIn("Properties", self.extractor.get_info(member))
+
+
+class TestSharedSubgraphMemo(unittest.TestCase):
+    def test_records_only_shared_pairs(self):
+        model1 = ifcopenshell.open(os.path.join(TESTS_DIR, 'old.ifc'))
+        model2 = ifcopenshell.open(os.path.join(TESTS_DIR, 'new.ifc'))
+        extractor1 = AttributeExtractor(model1, {"OwnerHistory"})
+        extractor2 = AttributeExtractor(model2, {"OwnerHistory"})
+        memo = SharedSubgraphMemo(extractor1, extractor2)
+
+        info1 = extractor1.get_info(model1.by_type("IfcMember")[0])
+        info2 = extractor2.get_info(model2.by_type("IfcMember")[0])
+        context1 = info1["Representation"]["Representations"][0]["ContextOfItems"]
+        context2 = info2["Representation"]["Representations"][0]["ContextOfItems"]
+
+        memo.record_equal(info1, info2)
+        memo.record_equal(context1, context2)
+        self.assertFalse(memo.is_known_equal(info1, info2))
+        self.assertTrue(memo.is_known_equal(context1, context2))
+        self.assertEqual(len(memo), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
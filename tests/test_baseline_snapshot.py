@@ -0,0 +1,94 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from src.baseline_snapshot import (BaselineSnapshot, SnapshotElement, create_snapshot, read_snapshot,
+                                   read_snapshot_metadata, write_snapshot)
+from src.file_comparator_factory_impl import IfcFileComparatorFactoryImpl
+from src.interfaces.file_comparator_factory import FileType
+from src.list_differences_collector import ListDifferencesCollector
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class TestBaselineSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.old_path = os.path.join(TESTS_DIR, 'old.ifc')
+        self.new_path = os.path.join(TESTS_DIR, 'new.ifc')
+        self.snapshot_path = os.path.join(self.temp_dir.name, 'old.snap')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def compare(self, file_type, file1_path, keys_to_ignore=None):
+        factory = IfcFileComparatorFactoryImpl(file1_path, self.new_path)
+        collector = ListDifferencesCollector()
+        comparator = factory.create(file_type, collector)
+        if keys_to_ignore:
+            comparator.set_keys_to_ignore(keys_to_ignore)
+        return comparator.compare_files(), collector.get_differences()
+
+    def test_round_trip(self):
+        snapshot = create_snapshot(self.old_path)
+        write_snapshot(snapshot, self.snapshot_path)
+        loaded = read_snapshot(self.snapshot_path)
+
+        self.assertEqual(loaded.metadata, snapshot.metadata)
+        self.assertEqual(read_snapshot_metadata(self.snapshot_path)["element_count"], len(snapshot.elements))
+        self.assertEqual(list(loaded.elements), list(snapshot.elements))
+        for guid, element in loaded.elements.items():
+            original = snapshot.elements[guid]
+            self.assertEqual(element.fingerprint, original.fingerprint)
+            self.assertTrue(element.is_a("IfcRoot"))
+            self.assertEqual((element.attributes, element.properties, element.materials),
+                             (original.attributes, original.properties, original.materials))
+            self.assertEqual(element.has_geometry, original.has_geometry)
+            if original.geometry is not None:
+                np.testing.assert_array_equal(element.geometry.vertices, original.geometry.vertices)
+                np.testing.assert_array_equal(element.geometry.faces, original.geometry.faces)
+                self.assertEqual(element.geometry.invariants.volume, original.geometry.invariants.volume)
+
+    def test_values_without_json_type(self):
+        shared = {"type": "IfcDirection", "DirectionRatios": (0.0, 0.0, 1.0)}
+        attributes = {"Axis": shared, "RefDirection": shared, "$ref": 1, "List": [1.5, "a"],
+                      "Set": {2.0, "b"}, "Frozen": frozenset({(1.0, 2.0)}), "Empty": (), "Flag": True, "None": None}
+        element = SnapshotElement("guid", None, ("IfcWall",), (b"\x00\x01",), attributes, {"Pset": {"A": 1}},
+                                  None, None, False)
+        write_snapshot(BaselineSnapshot({"source": "model.ifc"}, {"guid": element}), self.snapshot_path)
+
+        loaded = read_snapshot(self.snapshot_path).elements["guid"]
+        self.assertEqual(loaded.attributes, attributes)
+        self.assertIsInstance(loaded.attributes["List"], list)
+        self.assertIsInstance(loaded.attributes["Frozen"], frozenset)
+        self.assertIs(loaded.attributes["Axis"], loaded.attributes["RefDirection"])
+        self.assertEqual(loaded.fingerprint, (b"\x00\x01",))
+        self.assertEqual(loaded.properties, {"Pset": {"A": 1}})
+        self.assertIsNone(loaded.materials)
+
+    def test_rejects_values_that_are_no_data(self):
+        element = SnapshotElement("guid", None, ("IfcWall",), (), {"Value": object()}, {}, None, None, False)
+        with self.assertRaises(TypeError):
+            write_snapshot(BaselineSnapshot({}, {"guid": element}), self.snapshot_path)
+
+    def test_rejects_other_files(self):
+        with self.assertRaises(ValueError):
+            read_snapshot(self.old_path)
+
+    def test_same_differences_as_ifc_baseline(self):
+        write_snapshot(create_snapshot(self.old_path), self.snapshot_path)
+        for keys_to_ignore in (None, ['CoordList', 'ObjectPlacement']):
+            with self.subTest(keys_to_ignore=keys_to_ignore):
+                self.assertEqual(self.compare(FileType.SNAPSHOT, self.snapshot_path, keys_to_ignore),
+                                 self.compare(FileType.IFC, self.old_path, keys_to_ignore))
+
+    def test_requires_keys_ignored_by_snapshot(self):
+        write_snapshot(create_snapshot(self.old_path, ['CoordList']), self.snapshot_path)
+        with self.assertRaises(ValueError):
+            self.compare(FileType.SNAPSHOT, self.snapshot_path)
+
+
+if __name__ == '__main__':
+    unittest.main()
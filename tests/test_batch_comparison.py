@@ -0,0 +1,72 @@
+import json
+import os
+import tempfile
+import unittest
+
+from src.baseline_snapshot import create_snapshot, write_snapshot
+from src.batch_comparison import compare_candidates, report_paths, write_summary
+from src.mesh_comparison import GeometryComparisonMode
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class TestReportPaths(unittest.TestCase):
+    def test_one_directory_per_candidate(self):
+        paths = report_paths(["a/model.ifc", "b/model.ifc", "b/other.ifc"], "out")
+        self.assertEqual(paths, [os.path.join("out", "model", "differences.json"),
+                                 os.path.join("out", "model_2", "differences.json"),
+                                 os.path.join("out", "other", "differences.json")])
+
+    def test_suffix_does_not_collide_with_other_candidates(self):
+        paths = report_paths(["m_3.ifc", "m.ifc", "b/m.ifc", "c/m_3.ifc"], "out")
+        self.assertEqual(len(set(paths)), 4)
+        self.assertEqual(paths, [os.path.join("out", name, "differences.json")
+                                 for name in ("m_3", "m", "m_4", "m_3_4")])
+
+
+class TestCompareCandidates(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.snapshot_path = os.path.join(self.temp_dir.name, 'old.snap')
+        write_snapshot(create_snapshot(os.path.join(TESTS_DIR, 'old.ifc')), self.snapshot_path)
+        self.candidates = [os.path.join(TESTS_DIR, 'new.ifc'), os.path.join(TESTS_DIR, 'old.ifc'),
+                           os.path.join(TESTS_DIR, 'missing.ifc')]
+        self.settings = {
+            "keys_to_ignore": [],
+            "geometry_threads": 1,
+            "geometry_cache": None,
+            "geometry_mode": GeometryComparisonMode.STRICT,
+            "fingerprint_mode": False,
+        }
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_results_and_reports(self):
+        output_dir = os.path.join(self.temp_dir.name, 'out')
+        results = compare_candidates(self.snapshot_path, self.candidates, output_dir, self.settings, jobs=2)
+
+        changed, unchanged, missing = results
+        self.assertFalse(changed.equal)
+        self.assertEqual(changed.differing_elements, 2)
+        self.assertTrue(unchanged.equal)
+        self.assertEqual(unchanged.difference_count, 0)
+        self.assertIsNotNone(missing.error)
+        with open(changed.report_path) as f:
+            self.assertEqual(len(json.load(f)["errors"]), changed.difference_count)
+
+        summary_path = os.path.join(output_dir, 'summary.json')
+        write_summary('old.ifc', results, summary_path)
+        with open(summary_path) as f:
+            self.assertEqual([row["equal"] for row in json.load(f)["candidates"]], [False, True, False])
+
+    def test_sequential_matches_parallel(self):
+        sequential = compare_candidates(self.snapshot_path, self.candidates[:2],
+                                        os.path.join(self.temp_dir.name, 'sequential'), self.settings)
+        parallel = compare_candidates(self.snapshot_path, self.candidates[:2],
+                                      os.path.join(self.temp_dir.name, 'parallel'), self.settings, jobs=2)
+        self.assertEqual([r.difference_count for r in sequential], [r.difference_count for r in parallel])
+
+
+if __name__ == '__main__':
+    unittest.main()
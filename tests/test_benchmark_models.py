@@ -0,0 +1,65 @@
+import json
+import os
+import tempfile
+import unittest
+
+import ifcopenshell
+
+from benchmarks.generate_models import ChangeFractions, generate_model_pair
+
+
+class TestBenchmarkModels(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.fractions = ChangeFractions(moved=0.1, reattributed=0.1, remeshed=0.1, added=0.05, deleted=0.05)
+        self.pair = generate_model_pair(os.path.join(self.temp_dir.name, 'a'), 40, self.fractions, seed=3)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_change_counts(self):
+        counts = {kind: len(guids) for kind, guids in self.pair.changes.items()}
+        self.assertEqual(counts, {"unchanged": 26, "moved": 4, "reattributed": 4, "remeshed": 4, "deleted": 2,
+                                  "added": 2})
+
+        old_guids = {e.GlobalId for e in ifcopenshell.open(self.pair.old_path).by_type("IfcBuildingElement")}
+        new_guids = {e.GlobalId for e in ifcopenshell.open(self.pair.new_path).by_type("IfcBuildingElement")}
+        self.assertEqual(old_guids - new_guids, set(self.pair.changes["deleted"]))
+        self.assertEqual(new_guids - old_guids, set(self.pair.changes["added"]))
+        with open(self.pair.reference_path) as f:
+            self.assertEqual(set(json.load(f)), old_guids)
+
+    def test_changed_elements(self):
+        old_file = ifcopenshell.open(self.pair.old_path)
+        new_file = ifcopenshell.open(self.pair.new_path)
+
+        def location(ifc_file, guid):
+            return ifc_file.by_guid(guid).ObjectPlacement.RelativePlacement.Location.Coordinates
+
+        def width(ifc_file, guid):
+            return ifc_file.by_guid(guid).Representation.Representations[0].Items[0].SweptArea.XDim
+
+        for guid in self.pair.changes["unchanged"]:
+            self.assertEqual(old_file.by_guid(guid).get_info(recursive=True),
+                             new_file.by_guid(guid).get_info(recursive=True))
+        for guid in self.pair.changes["moved"]:
+            self.assertNotEqual(location(old_file, guid), location(new_file, guid))
+        for guid in self.pair.changes["remeshed"]:
+            self.assertNotEqual(width(old_file, guid), width(new_file, guid))
+        for guid in self.pair.changes["reattributed"]:
+            self.assertNotEqual(old_file.by_guid(guid).Name, new_file.by_guid(guid).Name)
+
+    def test_deterministic(self):
+        other = generate_model_pair(os.path.join(self.temp_dir.name, 'b'), 40, self.fractions, seed=3)
+        for path, other_path in ((self.pair.old_path, other.old_path), (self.pair.new_path, other.new_path),
+                                 (self.pair.reference_path, other.reference_path)):
+            with open(path, 'rb') as f, open(other_path, 'rb') as g:
+                self.assertEqual(f.read(), g.read())
+
+    def test_invalid_fractions(self):
+        with self.assertRaises(ValueError):
+            ChangeFractions(moved=0.6, deleted=0.6)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import os
+import tempfile
+import unittest
+
+from src.compare_entity_existance import load_ifc_entities_by_type, scan_ifc_entities_by_type
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def sorted_entities(entities):
+    return {entity_type: sorted(guids, key=str) for entity_type, guids in entities.items()}
+
+
+class TestScanIfcEntitiesByType(unittest.TestCase):
+    def test_same_entities_as_full_load(self):
+        for file_name in ['old.ifc', 'new.ifc', 'materialLayer1.ifc']:
+            with self.subTest(file_name=file_name):
+                path = os.path.join(TESTS_DIR, file_name)
+                self.assertEqual(sorted_entities(scan_ifc_entities_by_type(path)),
+                                 sorted_entities(load_ifc_entities_by_type(path)))
+
+    def test_guids_of_rooted_entities_only(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'model.ifc')
+            with open(path, 'w') as f:
+                f.write("ISO-10303-21;\nHEADER;\nFILE_SCHEMA(('IFC4'));\nENDSEC;\nDATA;\n"
+                        "#1= IFCPERSON($,'unknown','user',$,$,$,$,$);\n"
+                        "#2=IFCWALL('2xhZRRWMbBEgJbs7mKSY8E',$,'Wall; with a semicolon',\n$,$,$,$,$,$);\n"
+                        "ENDSEC;\nEND-ISO-10303-21;\n")
+            entities = scan_ifc_entities_by_type(path)
+        self.assertEqual(dict(entities), {'IfcPerson': [None], 'IfcWall': ['2xhZRRWMbBEgJbs7mKSY8E']})
+
+    def test_missing_file_schema(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'model.ifc')
+            with open(path, 'w') as f:
+                f.write("ISO-10303-21;\nHEADER;\nENDSEC;\nDATA;\n#1= IFCPERSON($,'unknown','user',$,$,$,$,$);\n"
+                        "ENDSEC;\nEND-ISO-10303-21;\n")
+            with self.assertRaisesRegex(ValueError, "No FILE_SCHEMA"):
+                scan_ifc_entities_by_type(path)
+
+
+if __name__ == '__main__':
+    unittest.main()
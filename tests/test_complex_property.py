@@ -0,0 +1,67 @@
+import unittest
+
+from src.property_validator.models.complex_property import ComplexProperty, PropertyValue
+
+
+def create_point(name: str, x: float, y: float, z: float) -> ComplexProperty:
+    point = ComplexProperty(name)
+    for coordinate, value in zip("XYZ", (x, y, z)):
+        point.add_property(PropertyValue(coordinate, value, "m"))
+    return point
+
+
+class TestComplexProperty(unittest.TestCase):
+    def test_find_property_by_name(self):
+        point = create_point("Location", 1.0, 2.0, 3.0)
+        self.assertEqual(point.find_property_by_name("Y"), PropertyValue("Y", 2.0, "m"))
+        self.assertIsNone(point.find_property_by_name("W"))
+        self.assertEqual(list(point.property_names), ["X", "Y", "Z"])
+
+    def test_points_share_their_layout(self):
+        location = create_point("Location", 1.0, 2.0, 3.0)
+        axis = create_point("Axis", 0.0, 0.0, 1.0)
+        self.assertIs(location._layout, axis._layout)
+        self.assertEqual(axis.find_property_by_name("Z").value, 1.0)
+
+    def test_layouts_diverge_on_different_names(self):
+        point = create_point("Location", 1.0, 2.0, 3.0)
+        other = ComplexProperty("Other")
+        other.add_property(PropertyValue("X", 4.0))
+        other.add_property(PropertyValue("W", 5.0))
+        self.assertIsNone(other.find_property_by_name("Y"))
+        self.assertEqual(other.find_property_by_name("W").value, 5.0)
+        self.assertEqual(point.find_property_by_name("Y").value, 2.0)
+
+    def test_last_of_duplicate_names_is_found(self):
+        cp = ComplexProperty("Duplicates")
+        cp.add_property(PropertyValue("X", 1.0))
+        cp.add_property(PropertyValue("X", 2.0))
+        cp.add_property(PropertyValue("Y", 3.0))
+        self.assertEqual(cp.find_property_by_name("X").value, 2.0)
+        self.assertEqual(cp.find_property_by_name("Y").value, 3.0)
+        self.assertEqual(list(cp.property_names), ["X", "Y"])
+        self.assertEqual(len(cp.properties), 3)
+
+        # the layout after the duplicate is shared, the position of X is still the second property
+        other = ComplexProperty("Duplicates")
+        for name, value in (("X", 4.0), ("X", 5.0), ("Y", 6.0)):
+            other.add_property(PropertyValue(name, value))
+        self.assertEqual(other.find_property_by_name("X").value, 5.0)
+
+    def test_nested_to_dict(self):
+        system = ComplexProperty("Local coordinate system", "placement")
+        system.add_property(create_point("Location", 1.0, 2.0, 3.0))
+        self.assertEqual(system.to_dict(), {
+            "name": "Local coordinate system",
+            "description": "placement",
+            "properties": [{
+                "name": "Location",
+                "description": None,
+                "properties": [{"name": c, "value": v, "unit": "m"} for c, v in zip("XYZ", (1.0, 2.0, 3.0))],
+            }],
+        })
+        self.assertFalse(hasattr(system, "__dict__"))
+
+
+if __name__ == '__main__':
+    unittest.main()
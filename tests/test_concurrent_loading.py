@@ -0,0 +1,68 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+import ifcopenshell
+
+from src.concurrent_loading import load_concurrently
+
+
+class TestLoadConcurrently(unittest.TestCase):
+    def test_loaders_run_at_the_same_time(self):
+        # each loader waits for the other one, this only finishes if they run concurrently
+        barrier = threading.Barrier(2, timeout=5)
+
+        def loader(value):
+            barrier.wait()
+            return value
+
+        results = load_concurrently([("first", lambda: loader(1)), ("second", lambda: loader(2))])
+        self.assertEqual([(result.name, result.value) for result in results], [("first", 1), ("second", 2)])
+        self.assertTrue(all(result.seconds >= 0 for result in results))
+
+    def test_raises_loader_exception(self):
+        def failing():
+            raise FileNotFoundError("missing.ifc")
+
+        with self.assertRaises(FileNotFoundError):
+            load_concurrently([("ok", lambda: 1), ("failing", failing)])
+
+    def test_python_loader_runs_while_ifc_file_is_parsed(self):
+        # only holds if ifcopenshell releases the GIL while parsing, a loader holding it would block the other one
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'points.ifc')
+            with open(path, 'w') as f:
+                f.write("ISO-10303-21;\nHEADER;\nFILE_DESCRIPTION((''),'2;1');\n"
+                        "FILE_NAME('','',(''),(''),'','','');\nFILE_SCHEMA(('IFC4'));\nENDSEC;\nDATA;\n")
+                f.writelines(f"#{i}=IFCCARTESIANPOINT(({i}.,2.,3.));\n" for i in range(1, 100001))
+                f.write("ENDSEC;\nEND-ISO-10303-21;\n")
+
+            parsed = threading.Event()
+            parse_interval = []
+
+            def parse():
+                start = time.perf_counter()
+                try:
+                    return ifcopenshell.open(path)
+                finally:
+                    parse_interval.extend((start, time.perf_counter()))
+                    parsed.set()
+
+            def spin():
+                timestamps = []
+                while not parsed.is_set():
+                    timestamps.append(time.perf_counter())
+                return timestamps
+
+            ifc_load, spin_load = load_concurrently([("ifc", parse), ("spin", spin)])
+
+        start, end = parse_interval
+        margin = (end - start) / 4
+        self.assertEqual(len(ifc_load.value.by_type("IfcCartesianPoint")), 100000)
+        self.assertTrue(any(start + margin < t < end - margin for t in spin_load.value))
+
+
+if __name__ == '__main__':
+    unittest.main()
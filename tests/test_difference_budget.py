@@ -0,0 +1,43 @@
+import unittest
+
+from src.budgeted_differences_collector import BudgetedDifferencesCollector, DifferenceBudgetExhausted
+from src.list_differences_collector import ListDifferencesCollector
+from tests.comparison_helpers import create_test_file_comparator
+
+
+class TestBudgetedDifferencesCollector(unittest.TestCase):
+    def test_raises_when_budget_is_reached(self):
+        collector = BudgetedDifferencesCollector(ListDifferencesCollector(), 2)
+        collector.add_difference("first", 1, 2)
+        with self.assertRaises(DifferenceBudgetExhausted):
+            collector.add_difference("second", 3, 4)
+        self.assertEqual(collector.get_differences(), [["first", 1, 2], ["second", 3, 4]])
+
+    def test_rejects_empty_budget(self):
+        with self.assertRaises(ValueError):
+            BudgetedDifferencesCollector(ListDifferencesCollector(), 0)
+
+
+class TestCompareFilesWithBudget(unittest.TestCase):
+    def compare(self, jobs, max_differences):
+        comparator, collector = create_test_file_comparator(jobs)
+        comparator.set_max_differences(max_differences)
+        result = comparator.compare_files()
+        return result, comparator.truncated, collector.get_differences()
+
+    def test_fail_fast_stops_at_first_difference(self):
+        for jobs in (1, 2):
+            with self.subTest(jobs=jobs):
+                result, truncated, differences = self.compare(jobs, 1)
+                self.assertFalse(result)
+                self.assertTrue(truncated)
+                self.assertEqual(len(differences), 1)
+
+    def test_large_budget_is_not_truncated(self):
+        _, truncated, differences = self.compare(1, 1000)
+        self.assertFalse(truncated)
+        self.assertEqual(differences, self.compare(1, None)[2])
+
+
+if __name__ == '__main__':
+    unittest.main()
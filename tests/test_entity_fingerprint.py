@@ -0,0 +1,45 @@
+import random
+import unittest
+
+from src.entity_fingerprint import fingerprint, fingerprint_entity, fingerprints_match
+
+
+class TestEntityFingerprint(unittest.TestCase):
+    def setUp(self):
+        self.tolerance = 1e-5
+        self.data = {'Name': 'Balken', 'Coordinates': (1.000001, 2.5, 409.4519938964844),
+                     'Placement': {'type': 'IfcCartesianPoint', 'Tag': None, 'Count': 3}}
+
+    def test_key_order_is_irrelevant(self):
+        reordered = {'Placement': {'Count': 3, 'Tag': None, 'type': 'IfcCartesianPoint'},
+                     'Coordinates': (1.000001, 2.5, 409.4519938964844), 'Name': 'Balken'}
+        self.assertEqual(fingerprint_entity(self.data), fingerprint_entity(reordered))
+
+    def test_sequence_type_and_order_matter(self):
+        as_list = dict(self.data, Coordinates=list(self.data['Coordinates']))
+        reversed_tuple = dict(self.data, Coordinates=self.data['Coordinates'][::-1])
+        self.assertFalse(fingerprints_match(fingerprint_entity(self.data), fingerprint_entity(as_list)))
+        self.assertFalse(fingerprints_match(fingerprint_entity(self.data), fingerprint_entity(reversed_tuple)))
+
+    def test_int_and_float_differ(self):
+        self.assertNotEqual(fingerprint({'a': 1}), fingerprint({'a': 1.0}))
+
+    def test_straddling_values_match_on_shifted_grid(self):
+        lhs = {'a': 0.99999 * self.tolerance * 10}
+        rhs = {'a': 1.00001 * self.tolerance * 10}
+        self.assertNotEqual(fingerprint(lhs, self.tolerance), fingerprint(rhs, self.tolerance))
+        self.assertTrue(fingerprints_match(fingerprint_entity(lhs, self.tolerance),
+                                           fingerprint_entity(rhs, self.tolerance)))
+
+    def test_match_implies_values_within_tolerance(self):
+        rng = random.Random(42)
+        for _ in range(2000):
+            value = rng.uniform(-1e3, 1e3)
+            other = value + rng.uniform(-3, 3) * self.tolerance
+            if fingerprints_match(fingerprint_entity({'a': value}, self.tolerance),
+                                  fingerprint_entity({'a': other}, self.tolerance)):
+                self.assertLessEqual(abs(value - other), self.tolerance)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,13 @@
+import os
 import unittest
 
+import ifcopenshell
+
+from src.attribute_extraction import AttributeExtractor, SharedSubgraphMemo
 from src.differences_collector_factory import DifferencesCollectorFactory, CollectionType
-from src.fuzzy_hashmap import FuzzyHashmap
+from src.fuzzy_hashmap import FuzzyHashmap, sets_equal
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
 
 
 class TestFuzzyHashmap(unittest.TestCase):
@@ -40,5 +46,87 @@ class TestFuzzyHashmap(unittest.TestCase):
         fmap2 = FuzzyHashmap(nested_data2, self.tolerance, self.collector)
         self.assertEqual(fmap1, fmap2)
 
+    def compare(self, data1, data2):
+        fmap1 = FuzzyHashmap(data1, self.tolerance, self.collector)
+        fmap1.set_parent_entity_guid("guid")
+        return fmap1 == FuzzyHashmap(data2, self.tolerance, self.collector)
+
+    def test_sets_within_tolerance(self):
+        self.assertTrue(self.compare({'s': {1.000001, 2.0, "a"}}, {'s': {2.000004, 0.999999, "a"}}))
+        self.assertTrue(self.compare({'s': frozenset({(1.0, 2.0), (3.0, 4.0)})},
+                                     {'s': frozenset({(3.000001, 4.0), (1.0, 1.999999)})}))
+        self.assertEqual(self.collector.get_differences(), [])
+
+    def test_sets_out_of_tolerance(self):
+        self.assertFalse(self.compare({'s': {1.0, 2.0}}, {'s': {1.0, 2.1}}))
+        self.assertFalse(self.compare({'s': {1.0, 2.0}}, {'s': {1.0}}))
+        self.assertFalse(self.compare({'s': {(1.0, 2.0)}}, {'s': {(1.0, 2.1)}}))
+        self.assertEqual(self.collector.get_differences()[0], ["Guid guid Set mismatch at s", [2.0], [2.1]])
+
+    def test_sets_need_a_pairing_of_all_elements(self):
+        # exact matches must not be taken out first, 9e-6 is needed to pair 1.8e-5
+        self.assertTrue(sets_equal({0.0, 9e-6}, {9e-6, 1.8e-5}))
+        # the first close pair found is not the one that pairs all elements, in any iteration order
+        x = 1.0
+        lhs = [(x + 5e-6, 'x'), (x - 4e-6, 'x')]
+        rhs = [(x, 'x'), (x + 1.4e-5, 'x')]
+        for lhs_order in (lhs, lhs[::-1]):
+            for rhs_order in (rhs, rhs[::-1]):
+                self.assertTrue(sets_equal(set(lhs_order), set(rhs_order)))
+                self.assertTrue(sets_equal(set(rhs_order), set(lhs_order)))
+        self.assertFalse(sets_equal({(x, 'x'), (x + 3e-5, 'x')}, {(x, 'x'), (x + 1e-5, 'x')}))
+        self.assertFalse(sets_equal({1.0, "a"}, {1.0, "b"}))
+
+    def test_differences_hold_the_key_path(self):
+        data1 = {'a': {'b': ({'c': 1.0}, {'c': 2.0})}, 'd': "x"}
+        self.assertFalse(self.compare(data1, {'a': {'b': ({'c': 1.0}, {'c': 2.5})}, 'd': "x"}))
+        self.assertFalse(self.compare(data1, {'a': {'b': ({'c': 1.0}, {'c': 2.0})}, 'd': "y"}))
+        self.assertFalse(self.compare(data1, {'a': {'b': ({'c': 1.0},)}, 'd': "x"}))
+        self.assertFalse(self.compare(data1, {'a': {'b': ({'c': 1.0}, {'e': 2.0})}, 'd': "x"}))
+        self.assertFalse(self.compare(data1, {'a': {'b': ({'c': 1.0}, {'c': 2})}, 'd': "x"}))
+        self.assertFalse(self.compare(data1, {'a': {}}))
+        self.assertEqual(self.collector.get_differences(), [
+            ["Guid guid > as tolerance at a.b[1].c: <class 'float'> != <class 'float'>", 2.0, 2.5],
+            ["Guid guid Value mismatch at d: <class 'str'> != <class 'str'>", "x", "y"],
+            ["Guid guid Length mismatch at a.b", 2, 1],
+            ["Guid guid Keys mismatch at a.b[1]", ['c'], ['e']],
+            ["Guid guid Type mismatch at a.b[1].c", "float", "int"],
+            ["Guid guid Keys mismatch at the top level", ['d'], []],
+        ])
+
+    def test_deep_nesting(self):
+        def nested(depth, value):
+            data = {'v': value}
+            for _ in range(depth):
+                data = {'a': [data]}
+            return data
+
+        self.assertTrue(self.compare(nested(5000, 1.0), nested(5000, 1.000001)))
+        self.assertFalse(self.compare(nested(5000, 1.0), nested(5000, 1.1)))
+        path = self.collector.get_differences()[0][0]
+        self.assertTrue(path.startswith("Guid guid > as tolerance at a[0].a[0]."))
+        self.assertEqual(path.count("a[0]"), 5000)
+
+    def test_hash_of_sets(self):
+        fmap1 = FuzzyHashmap({'s': {0.5, 1.5, 2.5, 3.5}})
+        fmap2 = FuzzyHashmap({'s': {3.5, 2.5, 1.5, 0.5}})
+        self.assertEqual(hash(fmap1), hash(fmap2))
+
+    def test_equality_memo(self):
+        model = ifcopenshell.open(os.path.join(TESTS_DIR, 'old.ifc'))
+        extractor1 = AttributeExtractor(model, {"OwnerHistory"})
+        extractor2 = AttributeExtractor(model, {"OwnerHistory"})
+        memo = SharedSubgraphMemo(extractor1, extractor2)
+        member = model.by_type("IfcMember")[0]
+        info1, info2 = extractor1.get_info(member), extractor2.get_info(member)
+
+        fmap1 = FuzzyHashmap(info1, self.tolerance, self.collector)
+        fmap1.set_equality_memo(memo)
+        self.assertEqual(fmap1, FuzzyHashmap(info2, self.tolerance, self.collector))
+        context1 = info1["Representation"]["Representations"][0]["ContextOfItems"]
+        context2 = info2["Representation"]["Representations"][0]["ContextOfItems"]
+        self.assertTrue(memo.is_known_equal(context1, context2))
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
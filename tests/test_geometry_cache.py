@@ -0,0 +1,66 @@
+import os
+import tempfile
+import time
+import unittest
+
+import numpy as np
+
+from src.geometry_cache import GeometryCache
+from src.mesh_comparison import Mesh
+
+
+class TestGeometryCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.temp_dir.name, 'cache')
+        self.ifc_path = os.path.join(self.temp_dir.name, 'model.ifc')
+        with open(self.ifc_path, 'w') as f:
+            f.write("ISO-10303-21;")
+        self.geometry = Mesh(np.array([[0.0, 0.0, 0.0], [1.000001, 2.5, 2682613.3055]]), np.array([[0, 1, 0]]))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_round_trip_within_tolerance(self):
+        cache = GeometryCache(self.cache_dir, tolerance=1e-5)
+        namespace = cache.namespace(self.ifc_path)
+        cache.store(namespace, "2xhZRRWMbBEgJbs7mKSY8E", self.geometry)
+
+        loaded = cache.load(namespace, "2xhZRRWMbBEgJbs7mKSY8E")
+        np.testing.assert_array_equal(loaded.faces, self.geometry.faces)
+        np.testing.assert_allclose(loaded.vertices, self.geometry.vertices, rtol=0, atol=1e-7)
+
+    def test_guids_differing_in_case_do_not_collide(self):
+        cache = GeometryCache(self.cache_dir)
+        namespace = cache.namespace(self.ifc_path)
+        cache.store(namespace, "abc", self.geometry)
+        self.assertIsNone(cache.load(namespace, "ABC"))
+
+    def test_namespace_depends_on_content_and_tolerance(self):
+        namespace = GeometryCache(self.cache_dir).namespace(self.ifc_path)
+        self.assertNotEqual(namespace, GeometryCache(self.cache_dir, tolerance=1e-3).namespace(self.ifc_path))
+        with open(self.ifc_path, 'a') as f:
+            f.write("DATA;")
+        self.assertNotEqual(namespace, GeometryCache(self.cache_dir).namespace(self.ifc_path))
+
+    def test_evicts_least_recently_used(self):
+        cache = GeometryCache(self.cache_dir)
+        namespace = cache.namespace(self.ifc_path)
+        for guid in ["first", "second", "third"]:
+            cache.store(namespace, guid, self.geometry)
+        entry_size = os.path.getsize(cache._entry_path(namespace, "first"))
+        now = time.time()
+        os.utime(cache._entry_path(namespace, "first"), (now - 30, now - 30))
+        os.utime(cache._entry_path(namespace, "second"), (now - 20, now - 20))
+        os.utime(cache._entry_path(namespace, "third"), (now - 10, now - 10))
+        cache.load(namespace, "first")
+
+        cache.max_size = 2 * entry_size
+        cache.evict()
+        self.assertIsNotNone(cache.load(namespace, "first"))
+        self.assertIsNone(cache.load(namespace, "second"))
+        self.assertIsNotNone(cache.load(namespace, "third"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import os
+import unittest
+
+import ifcopenshell
+import numpy as np
+
+from src.geometry_extraction import extract_geometries
+from src.ifc_comparator import get_entity_attributes, get_entity_geometry
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class TestExtractGeometries(unittest.TestCase):
+    def setUp(self):
+        self.model = ifcopenshell.open(os.path.join(TESTS_DIR, 'old.ifc'))
+        self.elements = self.model.by_type("IfcBuildingElement")
+
+    def test_batch_matches_single_element_tessellation(self):
+        geometries = extract_geometries(self.model, self.elements, num_threads=2)
+        self.assertEqual(set(geometries), {element.GlobalId for element in self.elements})
+        for element in self.elements:
+            expected = get_entity_geometry(element)
+            np.testing.assert_array_equal(geometries[element.GlobalId].vertices, expected.vertices)
+            np.testing.assert_array_equal(geometries[element.GlobalId].faces, expected.faces)
+
+    def test_fallback_uses_the_batch_tolerance(self):
+        tolerance = 0.01
+        geometries = extract_geometries(self.model, self.elements, tolerance=tolerance)
+        for element in self.elements:
+            # no batch geometry given, the element is tessellated on its own
+            fallback = get_entity_attributes(element, {"OwnerHistory"}, {}, tolerance=tolerance)["Geometry"]
+            np.testing.assert_array_equal(fallback.vertices, geometries[element.GlobalId].vertices)
+            np.testing.assert_array_equal(fallback.faces, geometries[element.GlobalId].faces)
+
+    def test_only_included_elements(self):
+        geometries = extract_geometries(self.model, self.elements[:1])
+        self.assertEqual(list(geometries), [self.elements[0].GlobalId])
+
+    def test_no_elements(self):
+        self.assertEqual(extract_geometries(self.model, []), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+
+from src.guid_index import GuidIndex
+
+
+class FakeEntity:
+    def __init__(self, entity_type):
+        self.entity_type = entity_type
+
+    def is_a(self):
+        return self.entity_type
+
+
+class TestGuidIndex(unittest.TestCase):
+    def setUp(self):
+        self.old_entities = {
+            'shared_beam': FakeEntity('IfcBeam'),
+            'removed_wall': FakeEntity('IfcWall'),
+            'removed_door': FakeEntity('IfcDoor'),
+        }
+        self.new_entities = {
+            'added_window': FakeEntity('IfcWindow'),
+            'shared_beam': FakeEntity('IfcBeam'),
+            'added_beam': FakeEntity('IfcBeam'),
+        }
+        self.index = GuidIndex(self.old_entities, self.new_entities, ['IfcDoor', 'IfcWindow'])
+
+    def test_groups_by_kind_and_type(self):
+        self.assertEqual(self.index.shared.compared_guids(), ['shared_beam'])
+        self.assertEqual(self.index.removed.compared, {'IfcWall': ['removed_wall']})
+        self.assertEqual(self.index.removed.excluded, {'IfcDoor': ['removed_door']})
+        self.assertEqual(self.index.added.compared, {'IfcBeam': ['added_beam']})
+        self.assertEqual(self.index.added.excluded_guids(), ['added_window'])
+        self.assertEqual(len(self.index.removed), 2)
+
+    def test_is_excluded(self):
+        self.assertTrue(self.index.is_excluded('removed_door'))
+        self.assertTrue(self.index.is_excluded('added_window'))
+        self.assertFalse(self.index.is_excluded('shared_beam'))
+
+    def test_only_excluded_unmatched(self):
+        self.assertFalse(self.index.has_only_excluded_unmatched)
+        index = GuidIndex({'a': FakeEntity('IfcDoor'), 'b': FakeEntity('IfcBeam')},
+                          {'b': FakeEntity('IfcBeam'), 'c': FakeEntity('IfcStair')},
+                          ['IfcDoor', 'IfcStair'])
+        self.assertTrue(index.has_only_excluded_unmatched)
+
+
+if __name__ == '__main__':
+    unittest.main()
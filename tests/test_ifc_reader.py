@@ -0,0 +1,71 @@
+import os
+import tempfile
+import unittest
+
+import ifcopenshell
+import ifcopenshell.guid
+
+from src.property_validator.services.ifc_reader import IfcReader
+
+
+def create_model(path):
+    """Two beams sharing a pset with a complex property, a wall with a plain pset only"""
+    ifc_file = ifcopenshell.file(schema="IFC4")
+    beam1 = ifc_file.createIfcBeam(ifcopenshell.guid.new(), None, "B1")
+    beam2 = ifc_file.createIfcBeam(ifcopenshell.guid.new(), None, "B2")
+    wall = ifc_file.createIfcWall(ifcopenshell.guid.new(), None, "W")
+
+    values = [ifc_file.createIfcPropertySingleValue("Width", None, ifc_file.createIfcReal(0.2), None),
+              ifc_file.createIfcPropertySingleValue("Label", None, ifc_file.createIfcLabel("A"), None)]
+    complex_property = ifc_file.createIfcComplexProperty("Section", None, "usage", values)
+    shared_pset = ifc_file.createIfcPropertySet(ifcopenshell.guid.new(), None, "Pset_Shared", None,
+                                                [complex_property])
+    plain_pset = ifc_file.createIfcPropertySet(ifcopenshell.guid.new(), None, "Pset_Plain", None, [values[0]])
+    ifc_file.createIfcRelDefinesByProperties(ifcopenshell.guid.new(), None, None, None, [beam1, beam2], shared_pset)
+    ifc_file.createIfcRelDefinesByProperties(ifcopenshell.guid.new(), None, None, None, [beam1, wall], plain_pset)
+    ifc_file.write(path)
+    return beam1.GlobalId, beam2.GlobalId, wall.GlobalId
+
+
+class TestIfcReader(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        path = os.path.join(self.temp_dir.name, 'model.ifc')
+        self.beam1, self.beam2, self.wall = create_model(path)
+        self.reader = IfcReader(path)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_entities_with_complex_properties(self):
+        self.assertEqual(self.reader.get_entities_with_complex_properties(),
+                         [(self.beam1, 'IfcBeam'), (self.beam2, 'IfcBeam')])
+
+    def test_complex_properties_by_guid(self):
+        properties = self.reader.get_complex_properties_by_guid(self.beam2)
+        self.assertEqual(list(properties), ['Pset_Shared.Section'])
+        self.assertEqual([p.name for p in properties['Pset_Shared.Section'].properties], ['Width', 'Label'])
+        self.assertEqual(self.reader.get_complex_properties_by_guid(self.wall), {})
+
+    def test_all_complex_properties(self):
+        properties = self.reader.get_all_complex_properties()
+        self.assertEqual(set(properties), {self.beam1, self.beam2})
+        for guid in properties:
+            self.assertEqual(properties[guid]['Pset_Shared.Section'].to_dict(),
+                             self.reader.get_complex_properties_by_guid(guid)['Pset_Shared.Section'].to_dict())
+        # the pset is shared, its complex property is processed once
+        self.assertIs(properties[self.beam1]['Pset_Shared.Section'], properties[self.beam2]['Pset_Shared.Section'])
+
+    def test_all_complex_properties_of_some_guids(self):
+        with self.assertLogs('src.property_validator.services.ifc_reader', 'WARNING') as logs:
+            properties = self.reader.get_all_complex_properties([self.beam2, self.wall, '0000000000000000000000'])
+        self.assertEqual(list(properties), [self.beam2])
+        self.assertEqual(len(logs.records), 1)
+        self.assertIn('0000000000000000000000 not found', logs.output[0])
+
+    def test_unknown_guid(self):
+        self.assertEqual(self.reader.get_complex_properties_by_guid('0000000000000000000000'), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import unittest
+
+import numpy as np
+
+from src.mesh_comparison import canonicalize_mesh, compare_mesh_invariants, compare_meshes, compute_mesh_invariants
+
+
+class TestMeshComparison(unittest.TestCase):
+    def setUp(self):
+        self.vertices = np.array([[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]])
+        self.faces = np.array([[0, 2, 1], [0, 1, 3], [0, 3, 2], [1, 2, 3]])
+
+    def test_canonical_form_ignores_tessellation_order(self):
+        permutation = np.array([2, 0, 3, 1])
+        inverse = np.argsort(permutation)
+        # same mesh with shuffled vertices, faces rotated and listed in another order
+        vertices = self.vertices[permutation]
+        faces = np.roll(inverse[self.faces], 1, axis=1)[::-1]
+
+        lhs = canonicalize_mesh(self.vertices, self.faces)
+        rhs = canonicalize_mesh(vertices, faces)
+        np.testing.assert_array_equal(lhs.vertices, rhs.vertices)
+        np.testing.assert_array_equal(lhs.faces, rhs.faces)
+        self.assertTrue(compare_meshes(lhs, rhs).equal)
+
+    def test_orientation_is_kept(self):
+        lhs = canonicalize_mesh(self.vertices, self.faces)
+        rhs = canonicalize_mesh(self.vertices, self.faces[:, ::-1])
+        result = compare_meshes(lhs, rhs)
+        self.assertFalse(result.equal)
+        self.assertFalse(result.faces_equal)
+        self.assertEqual(result.differing_vertex_count, 0)
+
+    def test_vertex_deviation_within_and_beyond_tolerance(self):
+        lhs = canonicalize_mesh(self.vertices, self.faces)
+        close = canonicalize_mesh(self.vertices + 4e-6, self.faces)
+        self.assertTrue(compare_meshes(lhs, close, 1e-5).equal)
+
+        moved = self.vertices.copy()
+        moved[3, 2] += 0.5
+        result = compare_meshes(lhs, canonicalize_mesh(moved, self.faces), 1e-5)
+        self.assertFalse(result.equal)
+        self.assertEqual(result.differing_vertex_count, 1)
+        self.assertAlmostEqual(result.max_deviation, 0.5)
+        self.assertEqual(result.describe(), "1 vertices differ, max deviation 0.5")
+
+    def test_vertices_on_a_rounding_boundary(self):
+        # 1.5e-5 lies between two quantization steps, the jitter sorts the vertices differently
+        faces = np.array([[0, 1, 2]])
+        lhs = canonicalize_mesh(np.array([[1.5e-5 + 1e-10, 1.0, 0.0], [2e-5, 0.0, 0.0], [0.0, 0.0, 1.0]]), faces)
+        rhs = canonicalize_mesh(np.array([[1.5e-5 - 1e-10, 1.0, 0.0], [2e-5, 0.0, 0.0], [0.0, 0.0, 1.0]]), faces)
+        result = compare_meshes(lhs, rhs, 1e-5)
+        self.assertTrue(result.equal)
+        self.assertEqual(result.differing_vertex_count, 0)
+        self.assertLess(result.max_deviation, 1e-9)
+
+        flipped = canonicalize_mesh(np.array([[1.5e-5 - 1e-10, 1.0, 0.0], [2e-5, 0.0, 0.0], [0.0, 0.0, 1.0]]),
+                                    faces[:, ::-1])
+        self.assertFalse(compare_meshes(lhs, flipped, 1e-5).equal)
+
+    def test_vertex_count_mismatch(self):
+        lhs = canonicalize_mesh(self.vertices, self.faces)
+        rhs = canonicalize_mesh(self.vertices[:3], self.faces[:1])
+        result = compare_meshes(lhs, rhs)
+        self.assertFalse(result.equal)
+        self.assertEqual(result.describe(), "vertex count 4 != 3")
+
+
+class TestMeshInvariants(unittest.TestCase):
+    def setUp(self):
+        # unit cube, far away from the origin like meshes in world coordinates
+        corners = np.array([[x, y, z] for x in (0.0, 1.0) for y in (0.0, 1.0) for z in (0.0, 1.0)])
+        self.vertices = corners + np.array([2682613.3055, 1245168.8395, 409.45])
+        self.faces = np.array([[0, 1, 3], [0, 3, 2], [4, 6, 7], [4, 7, 5], [0, 4, 5], [0, 5, 1],
+                               [2, 3, 7], [2, 7, 6], [0, 2, 6], [0, 6, 4], [1, 5, 7], [1, 7, 3]])
+        self.cube = canonicalize_mesh(self.vertices, self.faces)
+
+    def test_cube_invariants(self):
+        invariants = compute_mesh_invariants(self.cube)
+        self.assertEqual((invariants.vertex_count, invariants.face_count), (8, 12))
+        self.assertAlmostEqual(abs(invariants.volume), 1.0)
+        self.assertAlmostEqual(invariants.area, 6.0)
+        np.testing.assert_allclose(invariants.bbox_max - invariants.bbox_min, [1.0, 1.0, 1.0])
+        np.testing.assert_allclose(invariants.centroid, self.vertices.mean(axis=0))
+
+    def test_equal_within_tolerance(self):
+        jittered = canonicalize_mesh(self.vertices + np.array([4e-6, -4e-6, 4e-6]), self.faces)
+        self.assertTrue(compare_mesh_invariants(self.cube.invariants, jittered.invariants, 1e-5).equal)
+
+    def test_stops_at_first_differing_invariant(self):
+        stretched = self.vertices.copy()
+        stretched[stretched[:, 2] > 409.5, 2] += 0.1
+        result = compare_mesh_invariants(self.cube.invariants,
+                                         canonicalize_mesh(stretched, self.faces).invariants)
+        self.assertFalse(result.equal)
+        self.assertEqual(result.invariant, "bounding box max")
+
+    def test_face_count_checked_before_geometry(self):
+        result = compare_mesh_invariants(self.cube.invariants,
+                                         canonicalize_mesh(self.vertices, self.faces[:-1]).invariants)
+        self.assertEqual(result.invariant, "face count")
+
+
+if __name__ == '__main__':
+    unittest.main()
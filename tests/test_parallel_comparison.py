@@ -0,0 +1,32 @@
+import unittest
+
+from src.parallel_comparison import split_into_shards
+from tests.comparison_helpers import create_test_file_comparator
+
+
+class TestSplitIntoShards(unittest.TestCase):
+    def test_keeps_order_and_balances(self):
+        shards = split_into_shards(list("abcdefg"), 3)
+        self.assertEqual(shards, [list("abc"), list("de"), list("fg")])
+
+    def test_more_shards_than_guids(self):
+        self.assertEqual(split_into_shards(["a", "b"], 8), [["a"], ["b"]])
+
+    def test_no_guids(self):
+        self.assertEqual(split_into_shards([], 4), [])
+
+
+class TestParallelCompareFiles(unittest.TestCase):
+    def compare(self, jobs):
+        comparator, collector = create_test_file_comparator(jobs)
+        return comparator.compare_files(), collector.get_differences()
+
+    def test_same_differences_as_sequential(self):
+        sequential = self.compare(1)
+        parallel = self.compare(2)
+        self.assertFalse(parallel[0])
+        self.assertEqual(sequential, parallel)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import json
+import os
+import tempfile
+import unittest
+
+from src.property_validator.services.comparator import PropertyComparator
+from src.property_validator.services.ifc_reader import IfcReader
+from src.property_validator.services.json_reader import JsonReader
+from src.property_validator.services.parallel_validation import compare_chunk, compare_chunks_in_parallel
+from src.property_validator.services.streaming_json_reader import StreamingJsonReader
+from tests.test_ifc_reader import create_model
+
+
+def section(width: float, label: str) -> dict:
+    return {"Pset_Shared": {"properties": {"Section": {"type": "complex", "properties": {
+        "Width": {"value": width}, "Label": {"value": label}}}}}}
+
+
+def describe(entity_result):
+    return (entity_result.guid, entity_result.match_count,
+            [str(prop_result) for prop_result in entity_result.property_results])
+
+
+class TestParallelValidation(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.ifc_path = os.path.join(self.temp_dir.name, 'model.ifc')
+        self.json_path = os.path.join(self.temp_dir.name, 'reference.json')
+        beam1, beam2, wall = create_model(self.ifc_path)
+        with open(self.json_path, 'w') as f:
+            json.dump({beam1: section(0.2, "A"), beam2: section(0.25, "A"), wall: section(0.2, "B")}, f)
+        self.guids = sorted([beam1, beam2, wall, "0000000000000000000000"])
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def compare_sequentially(self, compact: bool):
+        comparator = PropertyComparator(float_tolerance=0.001, compact=compact)
+        return [describe(result) for result in compare_chunk(IfcReader(self.ifc_path), JsonReader(self.json_path),
+                                                             comparator, self.guids)]
+
+    def test_same_results_as_sequential(self):
+        for compact, batch, json_reader_type in ((False, False, JsonReader), (True, True, StreamingJsonReader)):
+            with self.subTest(compact=compact, batch=batch):
+                results = compare_chunks_in_parallel(self.ifc_path, self.json_path, self.guids, jobs=2,
+                                                     json_reader_type=json_reader_type, tolerance=0.001,
+                                                     compact=compact, batch=batch)
+                self.assertEqual([describe(result) for result in results], self.compare_sequentially(compact))
+
+    def test_results_in_guid_order(self):
+        results = list(compare_chunks_in_parallel(self.ifc_path, self.json_path, self.guids, jobs=3))
+        self.assertEqual([result.guid for result in results], self.guids)
+        self.assertEqual([result.has_mismatches for result in results], [
+            describe_result[2] != [] for describe_result in self.compare_sequentially(compact=True)])
+
+
+if __name__ == '__main__':
+    unittest.main()
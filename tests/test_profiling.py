@@ -0,0 +1,95 @@
+import json
+import os
+import tempfile
+import unittest
+
+from src.profiling import NULL_PROFILER, Profiler
+from tests.comparison_helpers import create_test_file_comparator
+
+
+class TestProfiler(unittest.TestCase):
+    def test_timers_and_entity_types(self):
+        profiler = Profiler()
+        with profiler.timer("get_psets", "IfcBeam"):
+            pass
+        profiler.add_time("get_psets", 0.5, "IfcWall")
+        profiler.add_time("tessellation", 2.0)
+        profiler.count("tessellated elements", 3)
+        report = profiler.to_dict()
+
+        self.assertEqual(report["timers"]["get_psets"]["calls"], 2)
+        self.assertGreaterEqual(report["timers"]["get_psets"]["seconds"], 0.5)
+        self.assertEqual(report["timers"]["tessellation"], {"calls": 1, "seconds": 2.0})
+        self.assertEqual(report["counters"], {"tessellated elements": 3})
+        self.assertEqual(list(report["entity_types"]), ["IfcBeam", "IfcWall"])
+        self.assertEqual(report["entity_types"]["IfcWall"], {"get_psets": {"calls": 1, "seconds": 0.5}})
+
+    def test_keeps_slowest_elements(self):
+        profiler = Profiler(slowest_count=2)
+        for guid, seconds in (("a", 0.3), ("b", 0.1), ("c", 0.5), ("d", 0.2)):
+            profiler.record_element(guid, "IfcBeam", seconds)
+        report = profiler.to_dict()
+        self.assertEqual([element["guid"] for element in report["slowest_elements"]], ["c", "a"])
+        self.assertEqual(report["timers"]["compare_elements"]["calls"], 4)
+
+    def test_merge(self):
+        profiler = Profiler(slowest_count=2)
+        profiler.record_element("a", "IfcBeam", 0.3)
+        worker = Profiler()
+        worker.record_element("b", "IfcWall", 0.4)
+        worker.record_element("c", "IfcWall", 0.1)
+        worker.count("fingerprint matches")
+        profiler.merge(worker.to_dict())
+        report = profiler.to_dict()
+
+        self.assertEqual([element["guid"] for element in report["slowest_elements"]], ["b", "a"])
+        self.assertEqual(report["timers"]["compare_elements"]["calls"], 3)
+        self.assertEqual(report["entity_types"]["IfcWall"]["compare_elements"]["calls"], 2)
+        self.assertEqual(report["counters"], {"fingerprint matches": 1})
+
+    def test_null_profiler_records_nothing(self):
+        with NULL_PROFILER.timer("get_info", "IfcBeam"):
+            pass
+        NULL_PROFILER.count("tessellated elements")
+        NULL_PROFILER.record_element("a", "IfcBeam", 1.0)
+        self.assertEqual(NULL_PROFILER.to_dict(), {"timers": {}, "counters": {}, "entity_types": {},
+                                                   "slowest_elements": []})
+
+
+class TestCompareFilesWithProfiler(unittest.TestCase):
+    def compare(self, jobs):
+        comparator, _ = create_test_file_comparator(jobs)
+        comparator.set_profiler(Profiler())
+        comparator.compare_files()
+        return comparator.profiler
+
+    def test_phases_are_timed(self):
+        report = self.compare(1).to_dict()
+        shared_count = report["timers"]["compare_elements"]["calls"]
+        self.assertGreater(shared_count, 0)
+        self.assertEqual(report["timers"]["ifcopenshell.open"]["calls"], 2)
+        self.assertEqual(report["timers"]["get_info"]["calls"], 2 * shared_count)
+        self.assertEqual(report["timers"]["FuzzyHashmap.__eq__"]["calls"], shared_count)
+        self.assertIn("tessellation", report["timers"])
+        self.assertEqual(sum(timers["compare_elements"]["calls"] for timers in report["entity_types"].values()),
+                         shared_count)
+        self.assertEqual(len(report["slowest_elements"]), min(20, shared_count))
+
+    def test_worker_profiles_are_merged(self):
+        sequential = self.compare(1).to_dict()
+        parallel = self.compare(2)
+        report = parallel.to_dict()
+        for name in ("compare_elements", "get_info", "get_psets", "FuzzyHashmap.__eq__"):
+            self.assertEqual(report["timers"][name]["calls"], sequential["timers"][name]["calls"])
+        self.assertEqual({element["guid"] for element in report["slowest_elements"]},
+                         {element["guid"] for element in sequential["slowest_elements"]})
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "profile.json")
+            parallel.write(path)
+            with open(path) as f:
+                self.assertEqual(json.load(f), report)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+import unittest
+
+from src.property_validator.models.comparison_result import (
+    ComparisonStatus,
+    ComparisonSummary,
+    EntityComparisonResult,
+    PropertyComparisonResult
+)
+from src.property_validator.models.complex_property import ComplexProperty, PropertyValue
+from src.property_validator.services.comparator import PropertyComparator
+
+
+def create_complex_property(name: str, **values) -> ComplexProperty:
+    cp = ComplexProperty(name)
+    for prop_name, value in values.items():
+        if isinstance(value, ComplexProperty):
+            cp.add_property(value)
+        else:
+            cp.add_property(PropertyValue(prop_name, value))
+    return cp
+
+
+def create_system(x: float, label="Beam", axis_z=1.0) -> ComplexProperty:
+    location = create_complex_property("Location", X=x, Y=2.0, Z=3.0)
+    axis = create_complex_property("Axis", X=0.0, Y=0, Z=axis_z)
+    return create_complex_property("System", Location=location, Axis=axis, Label=label, Empty=None)
+
+
+def describe(result):
+    return [(r.property_path, r.status, r.ifc_value, r.json_value, r.tolerance) for r in result.property_results]
+
+
+class TestPropertyComparatorBatch(unittest.TestCase):
+    def setUp(self):
+        self.comparator = PropertyComparator(float_tolerance=0.001)
+        ifc_extra = create_system(1.0)
+        ifc_extra.add_property(PropertyValue("OnlyInIfc", 5))
+        json_nested = create_system(1.0, label=create_complex_property("Label", Text="Beam"))
+        self.entities = [
+            ("equal", {"P.System": create_system(1.0)}, {"P.System": create_system(1.0005, axis_z=1)}),
+            ("numbers", {"P.System": create_system(1.0)}, {"P.System": create_system(1.1, axis_z=float("nan"))}),
+            ("strings", {"P.System": create_system(1.0)}, {"P.System": create_system(1.0, label="Column")}),
+            ("missing", {"P.System": ifc_extra, "P.Other": create_system(1.0)}, {"P.System": create_system(1.0)}),
+            ("types", {"P.System": create_system(1.0)}, {"P.System": json_nested}),
+            ("json only", {}, {"P.System": create_system(1.0)}),
+        ]
+
+    def test_same_results_as_compare_entities(self):
+        batch_results = self.comparator.compare_entities_batch(self.entities)
+        self.assertEqual([result.guid for result in batch_results], [guid for guid, _, _ in self.entities])
+
+        for entity, batch_result in zip(self.entities, batch_results):
+            with self.subTest(entity[0]):
+                result = self.comparator.compare_entities(*entity)
+                mismatches = [r for r in describe(result) if r[1] != ComparisonStatus.MATCH]
+                self.assertEqual(describe(batch_result), mismatches)
+                self.assertEqual(batch_result.match_count, result.match_count)
+                self.assertEqual(batch_result.mismatch_count, result.mismatch_count)
+                self.assertEqual(batch_result.has_mismatches, result.has_mismatches)
+
+    def test_type_mismatch(self):
+        result = self.comparator.compare_entities_batch(self.entities[4:5])[0]
+        self.assertEqual(describe(result), [("P.System.Label", ComparisonStatus.MISMATCH,
+                                             "PropertyValue", "ComplexProperty", None)])
+
+    def test_numeric_mismatches(self):
+        result = self.comparator.compare_entities_batch(self.entities[1:2])[0]
+        self.assertEqual(sorted(r.property_path for r in result.property_results),
+                         ["P.System.Axis.Z", "P.System.Location.X"])
+        self.assertEqual(result.match_count, 6)
+        self.assertTrue(all(r.tolerance == 0.001 for r in result.property_results))
+
+    def test_empty_batch(self):
+        self.assertEqual(self.comparator.compare_entities_batch([]), [])
+
+
+class TestComparisonResult(unittest.TestCase):
+    def create_entity_result(self, guid: str, statuses, compact=False) -> EntityComparisonResult:
+        result = EntityComparisonResult(guid, compact=compact)
+        for i, status in enumerate(statuses):
+            result.add_result(PropertyComparisonResult(f"P.S.{i}", status, 1.0, 1.0))
+        return result
+
+    def test_counts(self):
+        statuses = [ComparisonStatus.MATCH, ComparisonStatus.MISSING_IFC, ComparisonStatus.MATCH,
+                    ComparisonStatus.MISMATCH, ComparisonStatus.MISSING_JSON]
+        for compact in (False, True):
+            with self.subTest(compact=compact):
+                result = self.create_entity_result("a", statuses, compact)
+                result.add_matches(3)
+                self.assertEqual((result.match_count, result.mismatch_count, result.missing_ifc_count,
+                                  result.missing_json_count), (5, 1, 1, 1))
+                self.assertEqual([r.property_path for r in result.mismatch_results], ["P.S.1", "P.S.3", "P.S.4"])
+                self.assertEqual(len(result.property_results), 3 if compact else 5)
+                self.assertTrue(result.has_mismatches)
+
+    def test_summary_counts(self):
+        summary = ComparisonSummary()
+        summary.add_entity_result(self.create_entity_result("a", [ComparisonStatus.MATCH]))
+        summary.add_entity_result(self.create_entity_result("b", [ComparisonStatus.MISMATCH]))
+        summary.add_entity_result(self.create_entity_result("c", []))
+        self.assertEqual((summary.entity_count, summary.matched_entity_count, summary.mismatched_entity_count),
+                         (3, 2, 1))
+
+        summary.add_entity_result(self.create_entity_result("b", [ComparisonStatus.MATCH]))
+        summary.add_entity_result(self.create_entity_result("c", [ComparisonStatus.MISSING_IFC]))
+        self.assertEqual((summary.entity_count, summary.matched_entity_count, summary.mismatched_entity_count),
+                         (3, 2, 1))
+        self.assertIn("Entity: c", str(summary))
+        self.assertNotIn("Entity: b", str(summary))
+
+    def test_compact_summary_keeps_entities_with_mismatches(self):
+        summary = ComparisonSummary(compact=True)
+        summary.add_entity_result(self.create_entity_result("a", [ComparisonStatus.MATCH]))
+        summary.add_entity_result(self.create_entity_result("b", [ComparisonStatus.MISMATCH]))
+        self.assertEqual((summary.entity_count, summary.matched_entity_count, summary.mismatched_entity_count),
+                         (2, 1, 1))
+        self.assertEqual(list(summary.entity_results), ["b"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import json
+import os
+import tempfile
+import unittest
+
+from src.property_validator.models.comparison_result import (
+    ComparisonStatus,
+    EntityComparisonResult,
+    PropertyComparisonResult
+)
+from src.property_validator.services.result_writer import OutputFormat, create_result_writer
+
+
+def create_entity_result(guid: str, statuses) -> EntityComparisonResult:
+    result = EntityComparisonResult(guid)
+    for i, status in enumerate(statuses):
+        result.add_result(PropertyComparisonResult(f"P.S.{i}", status, 1.5, 2 if i else None, 0.001))
+    return result
+
+
+class TestResultWriter(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, 'output.json')
+        self.entity_results = [
+            create_entity_result("b", [ComparisonStatus.MATCH, ComparisonStatus.MISMATCH]),
+            create_entity_result("a", [ComparisonStatus.MATCH]),
+            create_entity_result("c", [ComparisonStatus.MISSING_JSON, ComparisonStatus.MATCH]),
+        ]
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write(self, output_format: OutputFormat, show_matches=False, finish=True):
+        writer = create_result_writer(output_format, self.path, show_matches)
+        for entity_result in self.entity_results:
+            writer.write(entity_result)
+        if finish:
+            writer.finish()
+        writer.close()
+
+    def read_jsonl(self):
+        with open(self.path) as f:
+            return [json.loads(line) for line in f]
+
+    def test_formats_hold_the_same_report(self):
+        for show_matches in (False, True):
+            self.write(OutputFormat.JSON, show_matches)
+            with open(self.path) as f:
+                report = json.load(f)
+            self.assertEqual(report["entity_count"], 3)
+            self.assertEqual(report["mismatched_entities"], 2)
+            self.assertEqual(len(report["entities"]["b"]["property_results"]), 2 if show_matches else 1)
+
+            self.write(OutputFormat.COMPACT_JSON, show_matches)
+            with open(self.path) as f:
+                self.assertEqual(json.load(f), report)
+
+            self.write(OutputFormat.JSONL, show_matches)
+            lines = self.read_jsonl()
+            self.assertEqual(lines[-1], {"totals": {key: report[key] for key in
+                                                    ("entity_count", "matched_entities", "mismatched_entities")}})
+            self.assertEqual({line.pop("guid"): line for line in lines[:-1]}, report["entities"])
+
+    def test_values_are_written_as_strings(self):
+        self.write(OutputFormat.JSONL)
+        mismatch = self.read_jsonl()[0]["property_results"][0]
+        self.assertEqual(mismatch, {"property_path": "P.S.1", "status": "mismatch", "ifc_value": "1.5",
+                                    "json_value": "2", "tolerance": 0.001})
+
+    def test_partial_report_without_totals(self):
+        self.write(OutputFormat.JSONL, finish=False)
+        self.assertEqual([line["guid"] for line in self.read_jsonl()], ["b", "a", "c"])
+
+        self.write(OutputFormat.COMPACT_JSON, finish=False)
+        with open(self.path) as f:
+            report = f.read()
+        self.assertTrue(report.startswith('{"entities": {"b": '))
+        self.assertTrue(report.endswith('"missing_in_json", "ifc_value": "1.5", "json_value": null, '
+                                        '"tolerance": 0.001}]}'))
+        self.assertNotIn("entity_count", report)
+
+    def test_empty_compact_report(self):
+        self.entity_results = []
+        self.write(OutputFormat.COMPACT_JSON)
+        with open(self.path) as f:
+            self.assertEqual(json.load(f), {"entities": {}, "entity_count": 0, "matched_entities": 0,
+                                            "mismatched_entities": 0})
+
+
+if __name__ == '__main__':
+    unittest.main()
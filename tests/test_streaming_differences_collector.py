@@ -0,0 +1,68 @@
+import gzip
+import json
+import os
+import tempfile
+import unittest
+
+from src.differences_collector_factory import CollectionType, DifferencesCollectorFactory
+from src.streaming_differences_collector import StreamingDifferencesCollector
+
+
+class TestStreamingDifferencesCollector(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def read_lines(self, path, compress=False):
+        opener = gzip.open if compress else open
+        with opener(path, 'rt', encoding='utf-8') as f:
+            return [json.loads(line) for line in f]
+
+    def test_writes_one_line_per_difference(self):
+        path = os.path.join(self.temp_dir.name, 'differences.jsonl')
+        collector = StreamingDifferencesCollector(path)
+        collector.add_difference("Attributes differ", "a", "b")
+        collector.add_difference("Element missing", None, "c")
+        collector.close()
+
+        self.assertEqual(self.read_lines(path), [["Attributes differ", "a", "b"], ["Element missing", None, "c"]])
+        self.assertEqual(collector.difference_count, 2)
+
+    def test_gzip_round_trip(self):
+        path = os.path.join(self.temp_dir.name, 'differences.jsonl.gz')
+        collector = DifferencesCollectorFactory.create(CollectionType.JSONL_GZIP, path)
+        collector.add_difference("Geometry mismatch", 8, 9)
+        collector.close()
+
+        self.assertEqual(self.read_lines(path, compress=True), [["Geometry mismatch", 8, 9]])
+
+    def test_keeps_only_a_sample_in_memory(self):
+        path = os.path.join(self.temp_dir.name, 'differences.jsonl')
+        collector = StreamingDifferencesCollector(path, sample_size=2)
+        for i in range(5):
+            collector.add_difference(f"difference {i}", i, i + 1)
+        collector.close()
+
+        self.assertEqual(len(collector.get_differences()), 2)
+        self.assertEqual(collector.difference_count, 5)
+        self.assertEqual(len(self.read_lines(path)), 5)
+
+    def test_clear_truncates_the_file(self):
+        path = os.path.join(self.temp_dir.name, 'differences.jsonl')
+        collector = StreamingDifferencesCollector(path)
+        collector.add_difference("stale", 1, 2)
+        collector.clear()
+        collector.close()
+
+        self.assertEqual(self.read_lines(path), [])
+        self.assertEqual(collector.difference_count, 0)
+
+    def test_factory_requires_output_path(self):
+        with self.assertRaises(ValueError):
+            DifferencesCollectorFactory.create(CollectionType.JSONL)
+
+
+if __name__ == '__main__':
+    unittest.main()
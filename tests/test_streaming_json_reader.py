@@ -0,0 +1,77 @@
+import json
+import os
+import tempfile
+import unittest
+
+from src.property_validator.services.json_reader import JsonReader
+from src.property_validator.services.streaming_json_reader import StreamingJsonReader
+
+ENTITIES = {
+    "2xhZRRWMbBEgJbs7mKSY8E": {
+        "BIMWood_Common": {
+            "type": "complex",
+            "properties": {
+                "Location": {"type": "complex", "description": "a \"quoted\" {brace} [bracket]",
+                             "properties": {"X": {"value": 1.5, "unit": None}, "Y": {"value": -2e-3}}},
+                "Tags": {"value": [1, [2, {"3": "}"}]]},
+            }
+        }
+    },
+    "0LCecWEbD83Q1OxyAUmpWJ": {"Pset": {"properties": {"C": {"type": "complex", "properties": {"a": {"value": 1}}}}}},
+    "1111111111111111111111": None,
+}
+
+
+class TestStreamingJsonReader(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write(self, name, data, indent=None):
+        path = os.path.join(self.temp_dir.name, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=indent)
+        return path
+
+    def assert_same_as_json_reader(self, path):
+        expected = JsonReader(path)
+        reader = StreamingJsonReader(path)
+        try:
+            self.assertEqual(reader.get_entities(), expected.get_entities())
+            for guid in expected.get_entities():
+                self.assertEqual(reader._get_entity_data(guid), expected._get_entity_data(guid))
+                self.assertEqual({k: v.to_dict() for k, v in reader.get_complex_properties_by_guid(guid).items()},
+                                 {k: v.to_dict() for k, v in expected.get_complex_properties_by_guid(guid).items()})
+        finally:
+            reader.close()
+
+    def test_dict_format(self):
+        self.assert_same_as_json_reader(self.write('dict.json', ENTITIES, indent=2))
+
+    def test_list_format(self):
+        items = [{guid: data} for guid, data in ENTITIES.items()] + ["ignored", {"0LCecWEbD83Q1OxyAUmpWJ": {}}]
+        self.assert_same_as_json_reader(self.write('list.json', items))
+
+    def test_unknown_guid(self):
+        reader = StreamingJsonReader(self.write('dict.json', ENTITIES))
+        self.assertEqual(reader.get_complex_properties_by_guid("0000000000000000000000"), {})
+        reader.close()
+
+    def test_iterates_in_file_order(self):
+        reader = StreamingJsonReader(self.write('dict.json', ENTITIES))
+        self.assertEqual([guid for guid, _ in reader.iter_complex_properties()], list(ENTITIES))
+        reader.close()
+
+    def test_malformed_file(self):
+        path = os.path.join(self.temp_dir.name, 'broken.json')
+        with open(path, 'w') as f:
+            f.write('{"2xhZRRWMbBEgJbs7mKSY8E": {"a": 1}')
+        reader = StreamingJsonReader(path)
+        self.assertEqual(reader.get_entities(), [])
+        reader.close()
+
+
+if __name__ == '__main__':
+    unittest.main()